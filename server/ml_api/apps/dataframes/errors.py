@@ -77,6 +77,18 @@ class DataFrameIsPredictionError(HTTPException):
         )
 
 
+class PredictionScoresNotFoundError(HTTPException):
+    """
+    Exception raised when scores are requested for a prediction that
+    was made without score outputs.
+    """
+    def __init__(self, dataframe_id: PydanticObjectId):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataframe with id '{dataframe_id}' has no prediction scores."
+        )
+
+
 class DataFrameAlreadyRootError(HTTPException):
     """
     Exception raised when trying to make a dataframe root,
@@ -263,6 +275,21 @@ class ColumnNotFoundInDataFrameError(HTTPException):
         )
 
 
+class PipelineNotApplicableToRowsError(HTTPException):
+    """
+    Exception raised when a pipeline contains methods fitted on the whole
+    dataframe (fills, imputers) and can't be replayed on separate rows.
+    """
+    def __init__(self, dataframe_id: PydanticObjectId, methods: List[str]):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Pipeline of dataframe with id '{dataframe_id}' contains "
+                   f"methods computed over the whole dataframe: "
+                   f"{', '.join(methods)}. Apply the pipeline to a stored "
+                   f"dataframe and predict on it instead."
+        )
+
+
 class InvalidSelectorParamsError(HTTPException):
     """
     Exception raised when invalid parameters are provided to a selector method.
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Iterator, Tuple
 
 from bunnet import PydanticObjectId
 import pandas as pd
@@ -25,6 +25,10 @@ class DataframeServiceFacade:
                     pred_df, df_filename)
         return meta_created
 
+    def save_prediction_scores(self, prediction_id: PydanticObjectId,
+                               scores: pd.DataFrame) -> DataFrameMetadata:
+        return self.repository.save_prediction_scores(prediction_id, scores)
+
     def check_prediction_filename(self, filename: str):
         self.dataframe_service._check_filename_exists(filename)
 
@@ -34,6 +38,10 @@ class DataframeServiceFacade:
     def delete_prediction(self, prediction_id: PydanticObjectId):
         self.repository.delete_dataframe(prediction_id)
 
+    def get_parent_id(self, dataframe_id: PydanticObjectId
+                      ) -> Optional[PydanticObjectId]:
+        return self.repository.get_parent_id(dataframe_id)
+
     def get_feature_target_column_names(
             self, dataframe_id: PydanticObjectId) -> (List[str], Optional[str]):
         return self.dataframe_methods_service.get_feature_target_column_names(
@@ -50,6 +58,33 @@ class DataframeServiceFacade:
         return self.dataframe_methods_service.get_feature_target_df(
             dataframe_id)
 
+    def get_feature_target_chunks(
+            self, dataframe_id: PydanticObjectId, chunksize: int
+    ) -> Iterator[Tuple[pd.DataFrame, Optional[pd.Series]]]:
+        return self.dataframe_methods_service.get_feature_target_chunks(
+            dataframe_id, chunksize)
+
+    def save_predictions_dataframe_chunks(
+            self, df_filename: str, pred_chunks: Iterator,
+            with_scores: bool = False) -> DataFrameMetadata:
+        return self.repository.save_prediction_dataframe_chunks(
+            pred_chunks, df_filename, with_scores)
+
+    def can_copy_pipeline_by_chunks(self, id_from: PydanticObjectId) -> bool:
+        return self.dataframe_methods_service.can_copy_pipeline_by_chunks(
+            id_from)
+
+    def copy_pipeline_for_prediction_chunks(
+            self, id_from: PydanticObjectId, id_to: PydanticObjectId,
+            chunksize: int) -> Iterator[pd.DataFrame]:
+        return self.dataframe_methods_service.\
+            copy_pipeline_for_prediction_chunks(id_from, id_to, chunksize)
+
+    def apply_pipeline_to_rows(self, id_from: PydanticObjectId,
+                               df: pd.DataFrame) -> pd.DataFrame:
+        return self.dataframe_methods_service.apply_pipeline_to_rows(
+            id_from, df)
+
     def copy_pipeline_for_prediction(self, id_from: PydanticObjectId,
                             id_to: PydanticObjectId):
         df = self.dataframe_methods_service.copy_pipeline_for_prediction(
@@ -14,6 +14,7 @@ class DataFrameMetadata(Document):
     filename: str
     user_id: PydanticObjectId
     is_prediction: bool = False
+    has_scores: bool = False
     feature_columns_types: Optional[schemas.ColumnTypes] = schemas.ColumnTypes(
         numeric=[], categorical=[])
     target_feature: Optional[str] = None
@@ -1,6 +1,10 @@
+import shutil
 import tempfile
+import zipfile
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from fastapi.responses import FileResponse
 from bunnet import PydanticObjectId
@@ -10,6 +14,65 @@ from ml_api.config import ROOT_DIR
 from ml_api.apps.dataframes import errors
 
 
+class ScoresChunksWriter:
+    """
+    Записывает оценки модели по частям в npz-архив: столбцы каждой части
+    дописываются во временные файлы (по файлу на столбец), поэтому в памяти
+    находится только текущая часть. При выходе из контекста без ошибок
+    файлы потоком копируются в архив в формате np.savez.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.n_rows = 0
+        self._tmp_dir = None
+        self._files = {}
+
+    def __enter__(self):
+        self._tmp_dir = tempfile.TemporaryDirectory(dir=self.path.parent)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self._save()
+        finally:
+            for file, _ in self._files.values():
+                file.close()
+            self._tmp_dir.cleanup()
+
+    def append(self, scores: pd.DataFrame):
+        arrays = {'row_index': scores.index.to_numpy(dtype=np.int64)}
+        arrays.update({str(column): scores[column].to_numpy(dtype=np.float32)
+                       for column in scores.columns})
+        for name, array in arrays.items():
+            if name not in self._files:
+                self._files[name] = (
+                    open(Path(self._tmp_dir.name) / f"{len(self._files)}",
+                         'w+b'), array.dtype)
+            self._files[name][0].write(array.tobytes())
+        self.n_rows += len(scores)
+
+    def split(self, chunks: Iterator[Tuple[pd.DataFrame, pd.DataFrame]]
+              ) -> Iterator[pd.DataFrame]:
+        """Записывает оценки пар (предсказания, оценки), отдает предсказания"""
+        for predictions, scores in chunks:
+            self.append(scores)
+            yield predictions
+
+    def _save(self):
+        with zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_DEFLATED,
+                             allowZip64=True) as archive:
+            for name, (file, dtype) in self._files.items():
+                file.seek(0)
+                with archive.open(f"{name}.npy", 'w',
+                                  force_zip64=True) as entry:
+                    np.lib.format.write_array_header_1_0(entry, {
+                        'descr': np.lib.format.dtype_to_descr(dtype),
+                        'fortran_order': False,
+                        'shape': (self.n_rows,)})
+                    shutil.copyfileobj(file, entry)
+
+
 class DataFrameFileCRUD(FileCRUD):
     def __init__(self, user_id):
         self.user_id = user_id
@@ -19,6 +82,9 @@ class DataFrameFileCRUD(FileCRUD):
         user_path.mkdir(parents=True, exist_ok=True)
         return user_path / f"{file_id}.csv"
 
+    def _get_scores_path(self, file_id: PydanticObjectId):
+        return self._get_csv_path(file_id).with_suffix(".npz")
+
     def upload_csv(self, file_id: PydanticObjectId,
                    file: tempfile.SpooledTemporaryFile) -> FileResponse:
         csv_path = self._get_csv_path(file_id)
@@ -41,10 +107,61 @@ class DataFrameFileCRUD(FileCRUD):
             raise errors.DataFrameFileNotFoundError(file_id)
         return data
 
+    def read_csv_chunks(self, file_id: PydanticObjectId, chunksize: int,
+                        dtype: Optional[Dict[str, str]] = None
+                        ) -> Iterator[pd.DataFrame]:
+        """Read csv file by chunks of chunksize rows with fixed dtypes"""
+        csv_path = self._get_csv_path(file_id)
+        try:
+            reader = pd.read_csv(csv_path, chunksize=chunksize, dtype=dtype)
+        except FileNotFoundError:
+            raise errors.DataFrameFileNotFoundError(file_id)
+        with reader:
+            yield from reader
+
     def save_csv(self, file_id: PydanticObjectId, data: pd.DataFrame):
         csv_path = self._get_csv_path(file_id)
         data.to_csv(csv_path, index=False)
 
+    def save_csv_chunks(self, file_id: PydanticObjectId,
+                        chunks: Iterator[pd.DataFrame]):
+        """Save csv file chunk by chunk without holding it in memory"""
+        csv_path = self._get_csv_path(file_id)
+        with open(csv_path, 'w', newline='') as csv_file:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(csv_file, index=False, header=(i == 0))
+
+    def save_scores(self, file_id: PydanticObjectId, scores: pd.DataFrame):
+        """Save score columns as float32 arrays of a compressed npz file"""
+        with self.get_scores_writer(file_id) as scores_writer:
+            scores_writer.append(scores)
+
+    def get_scores_writer(self, file_id: PydanticObjectId
+                          ) -> ScoresChunksWriter:
+        """Writer of the scores npz file chunk by chunk"""
+        return ScoresChunksWriter(self._get_scores_path(file_id))
+
+    def download_scores(self, file_id: PydanticObjectId, filename: str
+                        ) -> FileResponse:
+        scores_path = self._get_scores_path(file_id)
+        file_response = self._download(path=scores_path,
+                                       filename=f"{filename}_scores.npz")
+        file_response.media_type = "application/octet-stream"
+        return file_response
+
+    def delete_scores_if_exists(self, file_id: PydanticObjectId):
+        self._get_scores_path(file_id).unlink(missing_ok=True)
+
     def delete_csv(self, file_id: PydanticObjectId):
         csv_path = self._get_csv_path(file_id)
         self._delete(csv_path)
+
+    def delete_csv_if_exists(self, file_id: PydanticObjectId):
+        self._get_csv_path(file_id).unlink(missing_ok=True)
+
+    def delete_files(self, file_ids: List[PydanticObjectId]):
+        """Delete csv and scores files of many dataframes in parallel"""
+        self._delete_many(
+            path for file_id in file_ids
+            for path in (self._get_csv_path(file_id),
+                         self._get_scores_path(file_id)))
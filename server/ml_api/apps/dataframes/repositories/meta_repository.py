@@ -1,10 +1,12 @@
 from typing import List, Dict
 
-from bunnet import PydanticObjectId
+from bunnet import PydanticObjectId, UpdateResponse
+from bunnet.operators import In
 from pymongo.errors import DuplicateKeyError
 
 from ml_api.apps.dataframes import schemas, errors
 from ml_api.apps.dataframes.model import DataFrameMetadata
+from ml_api.common.identity_map import identity_map
 
 
 class DataFrameMetaCRUD:
@@ -12,15 +14,21 @@ class DataFrameMetaCRUD:
         self.user_id = user_id
 
     def get(self, dataframe_id: PydanticObjectId) -> DataFrameMetadata:
+        dataframe_meta = identity_map.get_document(DataFrameMetadata,
+                                                   dataframe_id)
+        if dataframe_meta is not None:
+            return dataframe_meta
         dataframe_meta = DataFrameMetadata.get(dataframe_id).run()
         if dataframe_meta is None:
             raise errors.DataFrameNotFoundError(dataframe_id)
+        identity_map.put_document(dataframe_meta)
         return dataframe_meta
 
-    def get_active(self) -> List[DataFrameMetadata]:
+    def get_active(self) -> List[schemas.DataFrameSummary]:
         dataframe_metas = DataFrameMetadata.find(
             DataFrameMetadata.user_id == self.user_id).find(
-            DataFrameMetadata.is_prediction == False).to_list()
+            DataFrameMetadata.is_prediction == False).project(
+            schemas.DataFrameSummary).to_list()
         return dataframe_metas
 
     def get_predictions(self) -> List[DataFrameMetadata]:
@@ -36,6 +44,28 @@ class DataFrameMetaCRUD:
             DataFrameMetadata.parent_id == parent_id).to_list()
         return dataframe_metas
 
+    def get_subtree_ids(self, dataframe_id: PydanticObjectId
+                        ) -> List[PydanticObjectId]:
+        """ID датафрейма и всех его потомков одним запросом ($graphLookup)."""
+        result = DataFrameMetadata.find(
+            DataFrameMetadata.id == dataframe_id,
+            DataFrameMetadata.user_id == self.user_id).aggregate([
+                {"$graphLookup": {
+                    "from": DataFrameMetadata.get_motor_collection().name,
+                    "startWith": "$_id",
+                    "connectFromField": "_id",
+                    "connectToField": "parent_id",
+                    "as": "descendants",
+                    "restrictSearchWithMatch": {"user_id": self.user_id}}},
+                {"$project": {"descendant_ids": "$descendants._id"}},
+            ]).to_list()
+        if not result:
+            raise errors.DataFrameNotFoundError(dataframe_id)
+        descendant_ids = [descendant_id for descendant_id
+                          in result[0]["descendant_ids"]
+                          if descendant_id != dataframe_id]
+        return [dataframe_id, *descendant_ids]
+
     def get_by_filename(self, filename: str) -> DataFrameMetadata:
         dataframe_meta = DataFrameMetadata.find_one(
             DataFrameMetadata.filename == filename,
@@ -66,21 +96,33 @@ class DataFrameMetaCRUD:
             new_obj.insert()
         except DuplicateKeyError:
             raise errors.FilenameExistsUserError(filename)
+        identity_map.put_document(new_obj)
         return new_obj
 
     def update(self, dataframe_id: PydanticObjectId, query: Dict
                      ) -> DataFrameMetadata:
-        dataframe_meta = DataFrameMetadata.get(dataframe_id).run()
-        if not dataframe_meta:
+        # одно обращение к базе: обновление и возврат нового документа
+        dataframe_meta_updated = DataFrameMetadata.find_one(
+            DataFrameMetadata.id == dataframe_id).update(
+            query, response_type=UpdateResponse.NEW_DOCUMENT).run()
+        if dataframe_meta_updated is None:
+            identity_map.discard_document(DataFrameMetadata, dataframe_id)
             raise errors.DataFrameNotFoundError(dataframe_id)
-        dataframe_meta.update(query)
-        dataframe_meta_updated = DataFrameMetadata.get(dataframe_id).run()
+        identity_map.put_document(dataframe_meta_updated)
         return dataframe_meta_updated
 
     def delete(self,
                      dataframe_id: PydanticObjectId) -> DataFrameMetadata:
-        dataframe_meta = DataFrameMetadata.get(dataframe_id).run()
-        if not dataframe_meta:
+        dataframe_meta = DataFrameMetadata.get_motor_collection(
+        ).find_one_and_delete({"_id": dataframe_id})
+        identity_map.discard_document(DataFrameMetadata, dataframe_id)
+        if dataframe_meta is None:
             raise errors.DataFrameNotFoundError(dataframe_id)
-        dataframe_meta.delete()
-        return dataframe_meta
+        return DataFrameMetadata.parse_obj(dataframe_meta)
+
+    def delete_many(self, dataframe_ids: List[PydanticObjectId]):
+        DataFrameMetadata.find(
+            In(DataFrameMetadata.id, dataframe_ids),
+            DataFrameMetadata.user_id == self.user_id).delete().run()
+        for dataframe_id in dataframe_ids:
+            identity_map.discard_document(DataFrameMetadata, dataframe_id)
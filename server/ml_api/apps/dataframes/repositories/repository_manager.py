@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Iterator
 
 from bunnet import PydanticObjectId
 from fastapi.responses import FileResponse
@@ -7,7 +7,7 @@ import pandas as pd
 from ml_api.apps.dataframes.repositories.meta_repository import DataFrameMetaCRUD
 from ml_api.apps.dataframes.repositories.file_repository import DataFrameFileCRUD
 from ml_api.apps.dataframes.model import DataFrameMetadata
-from ml_api.apps.dataframes import schemas, errors
+from ml_api.apps.dataframes import schemas, errors, utils
 
 
 class DataframeRepositoryManager:
@@ -50,6 +50,42 @@ class DataframeRepositoryManager:
         self.file_repository.save_csv(dataframe_meta.id, df)
         return dataframe_meta
 
+    def save_prediction_dataframe_chunks(self, chunks: Iterator,
+                                         filename: str,
+                                         with_scores: bool = False
+                                         ) -> DataFrameMetadata:
+        """
+        with_scores - части приходят парами (предсказания, оценки), оценки
+        записываются в свой файл по мере записи предсказаний.
+        """
+        dataframe_meta = self.meta_repository.create(filename=filename,
+                                                      is_prediction=True)
+        try:
+            if with_scores:
+                with self.file_repository.get_scores_writer(
+                        dataframe_meta.id) as scores_writer:
+                    self.file_repository.save_csv_chunks(
+                        dataframe_meta.id, scores_writer.split(chunks))
+                query = {"$set": {DataFrameMetadata.has_scores: True}}
+                dataframe_meta = self.meta_repository.update(
+                    dataframe_meta.id, query)
+            else:
+                self.file_repository.save_csv_chunks(dataframe_meta.id,
+                                                     chunks)
+        except Exception:
+            # не оставляем метаданные с недописанным файлом
+            self.meta_repository.delete(dataframe_meta.id)
+            self.file_repository.delete_csv_if_exists(dataframe_meta.id)
+            self.file_repository.delete_scores_if_exists(dataframe_meta.id)
+            raise
+        return dataframe_meta
+
+    def save_prediction_scores(self, dataframe_id: PydanticObjectId,
+                               scores: pd.DataFrame) -> DataFrameMetadata:
+        self.file_repository.save_scores(dataframe_id, scores)
+        query = {"$set": {DataFrameMetadata.has_scores: True}}
+        return self.meta_repository.update(dataframe_id, query)
+
     def download_dataframe(self, dataframe_id: PydanticObjectId
                                  ) -> FileResponse:
         filename = self.get_filename(dataframe_id)
@@ -57,11 +93,26 @@ class DataframeRepositoryManager:
             file_id=dataframe_id, filename=filename)
         return response
 
+    def download_prediction_scores(self, dataframe_id: PydanticObjectId
+                                   ) -> FileResponse:
+        dataframe_meta = self.get_dataframe_meta(dataframe_id)
+        if not dataframe_meta.has_scores:
+            raise errors.PredictionScoresNotFoundError(dataframe_id)
+        return self.file_repository.download_scores(
+            file_id=dataframe_id, filename=dataframe_meta.filename)
+
     def read_pandas_dataframe(self, dataframe_id: PydanticObjectId
                                     ) -> pd.DataFrame:
         self.get_dataframe_meta(dataframe_id)
         return self.file_repository.read_csv(dataframe_id)
 
+    def read_pandas_dataframe_chunks(self, dataframe_id: PydanticObjectId,
+                                     chunksize: int
+                                     ) -> Iterator[pd.DataFrame]:
+        dataframe_meta = self.get_dataframe_meta(dataframe_id)
+        return self.file_repository.read_csv_chunks(
+            dataframe_id, chunksize, utils.get_feature_dtypes(dataframe_meta))
+
     def save_pandas_dataframe(self, dataframe_id: PydanticObjectId,
                                     df: pd.DataFrame) -> None:
         self.get_dataframe_meta(dataframe_id)
@@ -71,8 +122,13 @@ class DataframeRepositoryManager:
                                dataframe_id: PydanticObjectId) -> DataFrameMetadata:
         dataframe_meta = self.meta_repository.delete(dataframe_id)
         self.file_repository.delete_csv(dataframe_id)
+        self.file_repository.delete_scores_if_exists(dataframe_id)
         return dataframe_meta
 
+    def delete_dataframes(self, dataframe_ids: List[PydanticObjectId]):
+        self.meta_repository.delete_many(dataframe_ids)
+        self.file_repository.delete_files(dataframe_ids)
+
     # 2: GET METADATA OPERATIONS ----------------------------------------------
     def get_by_filename(self, filename: str) -> DataFrameMetadata:
         return self.meta_repository.get_by_filename(filename)
@@ -81,13 +137,18 @@ class DataframeRepositoryManager:
                                  ) -> DataFrameMetadata:
         return self.meta_repository.get(dataframe_id)
 
-    def get_active_dataframes_meta(self) -> List[DataFrameMetadata]:
+    def get_active_dataframes_summaries(self
+                                        ) -> List[schemas.DataFrameSummary]:
         return self.meta_repository.get_active()
 
     def get_dataframe_metas_by_parent_id(
             self, parent_id: PydanticObjectId) -> List[DataFrameMetadata]:
         return self.meta_repository.get_by_parent_id(parent_id)
 
+    def get_subtree_ids(self, dataframe_id: PydanticObjectId
+                        ) -> List[PydanticObjectId]:
+        return self.meta_repository.get_subtree_ids(dataframe_id)
+
     def get_parent_id(self, dataframe_id: PydanticObjectId
                             ) -> Optional[PydanticObjectId]:
         dataframe_meta = self.get_dataframe_meta(dataframe_id)
@@ -10,6 +10,7 @@ from ml_api.apps.dataframes.services.methods_service import \
     DataframeMethodsService
 from ml_api.apps.dataframes.services.methods_async_service import DataframeMethodsAsyncService
 from ml_api.apps.dataframes import schemas, model, specs, errors
+from ml_api.common.executor.heavy_executor import heavy_executor
 
 
 dataframes_file_router = APIRouter(
@@ -21,7 +22,7 @@ dataframes_file_router = APIRouter(
 
 @dataframes_file_router.post("", summary="Загрузить csv-файл",
                              response_model=model.DataFrameMetadata)
-def upload_dataframe(
+async def upload_dataframe(
         filename: str,
         file: UploadFile = File(...),
         user: User = Depends(current_active_user),
@@ -34,7 +35,8 @@ def upload_dataframe(
     """
     if file.content_type != "text/csv":
         raise errors.WrongFileTypeError(file.content_type)
-    return DataframeService(user.id).upload_new_dataframe(
+    return await heavy_executor.run(
+        user.id, DataframeService(user.id).upload_new_dataframe,
         file=file.file, filename=filename)
 
 
@@ -51,6 +53,22 @@ def download_dataframe(
     return DataframeService(user.id).download_dataframe(dataframe_id)
 
 
+@dataframes_file_router.get("/download_scores",
+                            summary="Скачать оценки предсказания")
+def download_prediction_scores(
+        dataframe_id: PydanticObjectId,
+        user: User = Depends(current_active_user),
+):
+    """
+        Скачивает npz-файл с оценками модели (predict_proba или
+        decision_function) для датафрейма предсказаний: массив row_index
+        с индексами строк и по массиву float32 на каждый столбец оценок
+
+        - **dataframe_id**: ID датафрейма предсказаний
+    """
+    return DataframeService(user.id).download_prediction_scores(dataframe_id)
+
+
 @dataframes_file_router.put("/rename",
                             summary="Переименовать csv-файл",
                             response_model=model.DataFrameMetadata)
@@ -71,7 +89,7 @@ def rename_dataframe(
 
 @dataframes_file_router.delete("", summary="Удалить csv-файл",
                                response_model=model.DataFrameMetadata)
-def delete_dataframe(
+async def delete_dataframe(
         dataframe_id: PydanticObjectId,
         user: User = Depends(current_active_user),
 ):
@@ -80,13 +98,14 @@ def delete_dataframe(
 
         - **dataframe_id**: ID csv-файла(датафрейма)
     """
-    return DataframeService(user.id).delete_dataframe(dataframe_id)
+    return await heavy_executor.run(
+        user.id, DataframeService(user.id).delete_dataframe, dataframe_id)
 
 
 @dataframes_file_router.delete("/prediction",
                                summary="Удалить предсказание модели",
                                response_model=model.DataFrameMetadata)
-def delete_model_prediction(
+async def delete_model_prediction(
         model_id: PydanticObjectId,
         prediction_id: PydanticObjectId,
         user: User = Depends(current_active_user),
@@ -96,7 +115,8 @@ def delete_model_prediction(
 
         - **model_id**: ID модели
     """
-    return DataframeService(user.id).delete_prediction(
+    return await heavy_executor.run(
+        user.id, DataframeService(user.id).delete_prediction,
         model_id, prediction_id)
 
 
@@ -122,13 +142,14 @@ def read_dataframe_info(
 
 
 @dataframes_metadata_router.get("/all",
-                                response_model=List[model.DataFrameMetadata],
+                                response_model=List[schemas.DataFrameSummary],
                                 summary="Получить информацию обо всех csv-файлах (датафреймах)")
 def read_all_user_dataframes(user: User = Depends(current_active_user)):
     """
-        Возвращает информацию обо всех датафреймах пользователя
+        Возвращает краткую информацию обо всех датафреймах пользователя
+        (без пайплайна и отчета об отборе признаков)
     """
-    return DataframeService(user.id).get_active_dataframes_meta()
+    return DataframeService(user.id).get_active_dataframes_summaries()
 
 
 @dataframes_metadata_router.get("/trees",
@@ -150,7 +171,7 @@ dataframes_content_router = APIRouter(
 @dataframes_content_router.get("",
                                response_model=schemas.ReadDataFrameResponse,
                                summary="Прочитать датафрейм")
-def read_dataframe_with_pagination(
+async def read_dataframe_with_pagination(
         dataframe_id: PydanticObjectId,
         page: int = 1,
         rows_on_page: int = 50,
@@ -163,15 +184,15 @@ def read_dataframe_with_pagination(
         - **page**: номер cтраницы (default=1)
         - **rows_on_page**: кол-во строк датафрейма на cтраницу (default=1)
     """
-    return DataframeService(
-        user.id).get_dataframe_with_pagination(
+    return await heavy_executor.run(
+        user.id, DataframeService(user.id).get_dataframe_with_pagination,
         dataframe_id, page, rows_on_page)
 
 
 @dataframes_content_router.get("/statistics",
                                response_model=List[schemas.ColumnDescription],
                                summary="Получить описание столбцов")
-def dataframe_columns_stat_info(
+async def dataframe_columns_stat_info(
         dataframe_id: PydanticObjectId,
         user: User = Depends(current_active_user),
 ):
@@ -190,8 +211,9 @@ def dataframe_columns_stat_info(
 
         - **dataframe_id**: ID csv-файла(датафрейма)
     """
-    return DataframeService(
-        user.id).get_dataframe_column_statistics(dataframe_id)
+    return await heavy_executor.run(
+        user.id, DataframeService(user.id).get_dataframe_column_statistics,
+        dataframe_id)
 
 
 @dataframes_content_router.get("/column_types",
@@ -211,15 +233,16 @@ def get_column_types(dataframe_id: PydanticObjectId,
 @dataframes_content_router.get("/corr_matrix",
                                response_model=Dict[str, Dict[str, float]],
                                summary="Получить матрицу корреляций")
-def get_correlation_matrix(dataframe_id: PydanticObjectId,
-                           user: User = Depends(current_active_user)):
+async def get_correlation_matrix(dataframe_id: PydanticObjectId,
+                                 user: User = Depends(current_active_user)):
     """
         Возвращает матрицу корреляций для численных столбцов датафрейма.
 
         - **dataframe_id**: ID csv-файла(датафрейма)
     """
-    return DataframeService(
-        user.id).get_correlation_matrix(dataframe_id)
+    return await heavy_executor.run(
+        user.id, DataframeService(user.id).get_correlation_matrix,
+        dataframe_id)
 
 
 dataframes_methods_router = APIRouter(
@@ -295,11 +318,11 @@ def move_to_active(
 @dataframes_methods_router.post("/feature_importances",
                                 summary="Провести отбор признаков",
                                 response_model=schemas.FeatureSelectionSummary)
-def feature_importances(dataframe_id: PydanticObjectId,
-                        task_type: specs.FeatureSelectionTaskType,
-                        selection_params: List[
-                            schemas.SelectorMethodParams],
-                        user: User = Depends(current_active_user)):
+async def feature_importances(dataframe_id: PydanticObjectId,
+                              task_type: specs.FeatureSelectionTaskType,
+                              selection_params: List[
+                                  schemas.SelectorMethodParams],
+                              user: User = Depends(current_active_user)):
     """
         Применяет методы отбора признаков к датафрейму. Возвращает таблицу результатов.
         На основе её, пользователь может выбрать какие признаки стоит удалять
@@ -327,17 +350,17 @@ def feature_importances(dataframe_id: PydanticObjectId,
         * 'select_from_model: 'estimator'
 
     """
-    return DataframeMethodsAsyncService(
-        user.id).run_feature_importances(
+    return await heavy_executor.run(
+        user.id, DataframeMethodsAsyncService(user.id).run_feature_importances,
         dataframe_id, task_type, selection_params)
 
 
 @dataframes_methods_router.delete("/columns", summary="Удалить столбцы",
                                   response_model=model.DataFrameMetadata)
-def delete_column(dataframe_id: PydanticObjectId,
-                  column_names: List[str],
-                  new_filename: str,
-                  user: User = Depends(current_active_user)):
+async def delete_column(dataframe_id: PydanticObjectId,
+                        column_names: List[str],
+                        new_filename: str,
+                        user: User = Depends(current_active_user)):
     """
         Удаляет столбцы из датафрейма.
         *То же самое, что /apply_method?drop_columns*
@@ -349,17 +372,18 @@ def delete_column(dataframe_id: PydanticObjectId,
         method_name=specs.AvailableMethods.DROP_COLUMNS,
         columns=column_names
     )
-    return DataframeMethodsService(user.id).delete_column(
+    return await heavy_executor.run(
+        user.id, DataframeMethodsService(user.id).delete_column,
         dataframe_id, [method_params], new_filename)
 
 
 @dataframes_methods_router.put("/change_columns_type",
                                summary="Сменить тип столбцов",
                                response_model=model.DataFrameMetadata)
-def change_columns_type(dataframe_id: PydanticObjectId,
-                        column_names: List[str],
-                        new_type: specs.ColumnType,
-                        user: User = Depends(current_active_user)):
+async def change_columns_type(dataframe_id: PydanticObjectId,
+                              column_names: List[str],
+                              new_type: specs.ColumnType,
+                              user: User = Depends(current_active_user)):
     """
         Изменяет тип столбцов на заданный (числовой/категориальный).
         *То же самое, что /apply_method?change_columns_type*
@@ -373,15 +397,16 @@ def change_columns_type(dataframe_id: PydanticObjectId,
         columns=column_names,
         params={'new_type': new_type}
     )
-    return DataframeMethodsService(user.id).change_columns_type(
+    return await heavy_executor.run(
+        user.id, DataframeMethodsService(user.id).change_columns_type,
         dataframe_id, [method_params])
 
 
 @dataframes_methods_router.post("/apply_method")
-def apply_method(dataframe_id: PydanticObjectId,
-                 method_params: List[schemas.ApplyMethodParams],
-                 new_filename: str,
-                 user: User = Depends(current_active_user)):
+async def apply_method(dataframe_id: PydanticObjectId,
+                       method_params: List[schemas.ApplyMethodParams],
+                       new_filename: str,
+                       user: User = Depends(current_active_user)):
     """
         Применяет метод обработки к датафрейму.
 
@@ -411,22 +436,24 @@ def apply_method(dataframe_id: PydanticObjectId,
         - **min_max_scaler** - Scale features to a given range
         - **robust_scaler** - Scale features using statistics that are robust to outliers
     """
-    return DataframeMethodsAsyncService(user.id).apply_changing_methods(
+    return await heavy_executor.run(
+        user.id, DataframeMethodsAsyncService(user.id).apply_changing_methods,
         dataframe_id, method_params, new_filename)
 
 
 @dataframes_methods_router.post("/copy_pipeline")
-def copy_pipeline(dataframe_id_from: PydanticObjectId,
-                  dataframe_id_to: PydanticObjectId,
-                  new_filename: str,
-                  user: User = Depends(current_active_user)):
+async def copy_pipeline(dataframe_id_from: PydanticObjectId,
+                        dataframe_id_to: PydanticObjectId,
+                        new_filename: str,
+                        user: User = Depends(current_active_user)):
     """
         Применяет пайплайн от одного документа к другому.
 
         - **dataframe_id**: ID csv-файла(датафрейма) с которого копируется пайплайн
         - **dataframe_id**: ID csv-файла(датафрейма) на который применяется пайплайн
     """
-    return DataframeMethodsAsyncService(user.id).copy_pipeline(
+    return await heavy_executor.run(
+        user.id, DataframeMethodsAsyncService(user.id).copy_pipeline,
         dataframe_id_from, dataframe_id_to, new_filename)
 
 
@@ -15,6 +15,18 @@ class DataFrameNode(BaseModel):
 DataFrameNode.update_forward_refs()
 
 
+class DataFrameSummary(BaseModel):
+    """Поля метаданных для списков (проекция без пайплайна и отчетов)."""
+    id: PydanticObjectId = Field(alias='_id')
+    filename: str
+    parent_id: Optional[PydanticObjectId] = None
+    is_prediction: bool = False
+    created_at: str
+
+    class Config:
+        allow_population_by_field_name = True
+
+
 class ColumnTypes(BaseModel):
     numeric: List[str]
     categorical: List[str]
@@ -7,6 +7,7 @@ from ml_api.apps.dataframes.repositories.repository_manager import \
     DataframeRepositoryManager
 from ml_api.apps.dataframes.model import DataFrameMetadata
 from ml_api.apps.dataframes import utils, schemas, errors
+from ml_api.apps.jobs.services import BackgroundJobsService
 from ml_api.apps.ml_models.facade import ModelServiceFacade
 
 
@@ -63,14 +64,18 @@ class DataframeService:
     def download_dataframe(self, dataframe_id):
         return self.repository.download_dataframe(dataframe_id)
 
+    def download_prediction_scores(self, dataframe_id):
+        return self.repository.download_prediction_scores(dataframe_id)
+
     def get_dataframe_meta(self, dataframe_id) -> DataFrameMetadata:
         return self.repository.get_dataframe_meta(dataframe_id)
 
-    def get_active_dataframes_meta(self) -> List[DataFrameMetadata]:
-        return self.repository.get_active_dataframes_meta()
+    def get_active_dataframes_summaries(self
+                                        ) -> List[schemas.DataFrameSummary]:
+        return self.repository.get_active_dataframes_summaries()
 
     def get_dataframes_trees(self) -> List[schemas.DataFrameNode]:
-        dataframes = self.get_active_dataframes_meta()
+        dataframes = self.get_active_dataframes_summaries()
         # Словарь для хранения узлов по их ID
         nodes = {str(df.id): schemas.DataFrameNode(
                 id=str(df.id), filename=df.filename) for df in dataframes}
@@ -171,12 +176,14 @@ class DataframeService:
         dataframe_meta = self.repository.get_dataframe_meta(dataframe_id)
         if dataframe_meta.is_prediction:
             raise errors.DataFrameIsPredictionError(dataframe_id)
-        child_dataframes = self.repository.get_dataframe_metas_by_parent_id(
-            dataframe_id)
-        for child_dataframe in child_dataframes:
-            self.delete_dataframe(child_dataframe.id)
-        self.models_service.delete_models_by_dataframe(dataframe_id)
-        dataframe_meta = self.repository.delete_dataframe(dataframe_id)
+        # поддерево получается одним запросом, затем все объекты
+        # удаляются пакетно, а не рекурсивно по каждому потомку
+        dataframe_ids = self.repository.get_subtree_ids(dataframe_id)
+        model_ids, prediction_ids = \
+            self.models_service.delete_models_by_dataframes(dataframe_ids)
+        self.repository.delete_dataframes(dataframe_ids + prediction_ids)
+        BackgroundJobsService(self._user_id).delete_by_objects(
+            dataframe_ids + prediction_ids + model_ids)
         return dataframe_meta
 
     def delete_prediction(self, model_id: PydanticObjectId,
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Iterator, Tuple
 
 import pandas as pd
 from bunnet import PydanticObjectId
@@ -95,6 +95,30 @@ class DataframeMethodsService:
             self._check_columns_consistency(df, feature_columns)
             return df, None
 
+    def get_feature_target_chunks(self, dataframe_id: PydanticObjectId,
+                                  chunksize: int
+                                  ) -> Iterator[Tuple[pd.DataFrame,
+                                                      Optional[pd.Series]]]:
+        """Returns generator of (features, target) chunks of the dataframe
+        without loading the whole file into memory."""
+        feature_columns, target_column = self.get_feature_target_column_names(
+            dataframe_id=dataframe_id)
+        chunks = self.repository.read_pandas_dataframe_chunks(dataframe_id,
+                                                              chunksize)
+        return self._split_feature_target_chunks(chunks, feature_columns,
+                                                 target_column)
+
+    def _split_feature_target_chunks(self, chunks, feature_columns,
+                                     target_column):
+        for df in chunks:
+            if target_column is not None:
+                self._check_columns_consistency(
+                    df, feature_columns + [target_column])
+                yield df[feature_columns], df[target_column]
+            else:
+                self._check_columns_consistency(df, feature_columns)
+                yield df, None
+
     def _process_feature_importances(
             self,
             dataframe_id: PydanticObjectId,
@@ -166,6 +190,95 @@ class DataframeMethodsService:
             id_to, validated_params)
         return new_df
 
+    def can_copy_pipeline_by_chunks(self, id_from: PydanticObjectId) -> bool:
+        return all(method.method_name not in specs.whole_frame_methods
+                   for method in self.repository.get_pipeline(id_from))
+
+    def copy_pipeline_for_prediction_chunks(
+            self, id_from: PydanticObjectId, id_to: PydanticObjectId,
+            chunksize: int) -> Iterator[pd.DataFrame]:
+        """Applies pipeline of the dataframe to another dataframe by chunks
+        of chunksize rows. Pipeline must not contain whole-frame methods."""
+        self.dataframe_service._ensure_not_prediction(id_from)
+        self.dataframe_service._ensure_not_prediction(id_to)
+        pipeline_from_source_df = self.repository.get_pipeline(id_from)
+        validated_params = MethodsApplierValidator().validate_params(
+            pipeline_from_source_df)
+        dataframe_meta = self.repository.get_dataframe_meta(id_to)
+        chunks = self.repository.read_pandas_dataframe_chunks(id_to,
+                                                              chunksize)
+        return self._apply_methods_to_chunks(dataframe_meta, chunks,
+                                             validated_params)
+
+    def _apply_methods_to_chunks(
+            self, dataframe_meta: DataFrameMetadata,
+            chunks: Iterator[pd.DataFrame],
+            validated_params: List[schemas.ApplyMethodParams]
+    ) -> Iterator[pd.DataFrame]:
+        columns_list = dataframe_meta.feature_columns_types.numeric + \
+            dataframe_meta.feature_columns_types.categorical
+        for df in chunks:
+            self._check_columns_consistency(df, columns_list)
+            # применитель методов меняет метаданные - каждой части своя копия
+            methods_applier = MethodsApplier(
+                df, dataframe_meta.copy(deep=True), validated_params)
+            methods_applier.apply_methods()
+            yield methods_applier.get_df()
+
+    def apply_pipeline_to_rows(self, id_from: PydanticObjectId,
+                               df: pd.DataFrame) -> pd.DataFrame:
+        """Applies pipeline of the dataframe to rows that are not stored
+        (online predictions)."""
+        self.dataframe_service._ensure_not_prediction(id_from)
+        pipeline = [
+            method for method in self.repository.get_pipeline(id_from)
+            # повторяющиеся строки запроса предсказываются все
+            if method.method_name != specs.AvailableMethods.DROP_DUPLICATES
+            # методы для отсутствующих в строках столбцов (например, целевого)
+            and (not method.columns
+                 or any(column in df.columns for column in method.columns))
+        ]
+        # заполнение пропусков по всему датафрейму на строках запроса
+        # считалось бы по самим строкам, а не по обучающему датафрейму
+        whole_frame_methods = [method.method_name.value for method in pipeline
+                               if method.method_name in
+                               specs.whole_frame_methods]
+        if whole_frame_methods:
+            raise errors.PipelineNotApplicableToRowsError(
+                id_from, whole_frame_methods)
+        validated_params = MethodsApplierValidator().validate_params(pipeline)
+        rows_meta = DataFrameMetadata(
+            filename='', user_id=self._user_id,
+            feature_columns_types=self._get_rows_column_types(df, pipeline))
+        methods_applier = MethodsApplier(df, rows_meta, validated_params)
+        methods_applier.apply_methods()
+        return methods_applier.get_df()
+
+    def _get_rows_column_types(self, df: pd.DataFrame,
+                               pipeline: List[schemas.ApplyMethodParams]
+                               ) -> schemas.ColumnTypes:
+        numeric = df.select_dtypes(include='number').columns.tolist()
+        categorical = [column for column in df.columns
+                       if column not in numeric]
+        # при загрузке датафрейма числовые столбцы с малым числом значений
+        # становятся категориальными - тип берется из первого метода,
+        # применяемого к столбцу
+        typed_columns = set()
+        for method in pipeline:
+            for column in method.columns:
+                if column in typed_columns or column not in df.columns:
+                    continue
+                typed_columns.add(column)
+                if method.method_name in specs.categorical_methods and \
+                        column in numeric:
+                    numeric.remove(column)
+                    categorical.append(column)
+                elif method.method_name in specs.numeric_methods and \
+                        column in categorical:
+                    categorical.remove(column)
+                    numeric.append(column)
+        return schemas.ColumnTypes(numeric=numeric, categorical=categorical)
+
     def _apply_methods_to_df(
             self,
             dataframe_id: PydanticObjectId,
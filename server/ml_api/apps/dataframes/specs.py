@@ -59,3 +59,38 @@ class AvailableMethods(Enum):
     STANDARD_SCALER = 'standard_scaler'
     MIN_MAX_SCALER = 'min_max_scaler'
     ROBUST_SCALER = 'robust_scaler'
+
+
+# Методы, которые применяются только к категориальным/числовым столбцам:
+# по ним восстанавливается исходный тип столбцов для строк онлайн-предсказания
+categorical_methods = [
+    AvailableMethods.FILL_MOST_FREQUENT,
+    AvailableMethods.LEAVE_N_VALUES_ENCODING,
+    AvailableMethods.ONE_HOT_ENCODING,
+    AvailableMethods.ORDINAL_ENCODING,
+]
+
+numeric_methods = [
+    AvailableMethods.FILL_MEAN,
+    AvailableMethods.FILL_MEDIAN,
+    AvailableMethods.FILL_INTERPOLATION,
+    AvailableMethods.FILL_LINEAR_IMPUTER,
+    AvailableMethods.FILL_KNN_IMPUTER,
+    AvailableMethods.STANDARD_SCALER,
+    AvailableMethods.MIN_MAX_SCALER,
+    AvailableMethods.ROBUST_SCALER,
+]
+
+# Методы, результат которых зависит от всех строк датафрейма: пайплайн с ними
+# нельзя применять к датафрейму по частям
+whole_frame_methods = [
+    AvailableMethods.DROP_DUPLICATES,
+    AvailableMethods.FILL_MEAN,
+    AvailableMethods.FILL_MEDIAN,
+    AvailableMethods.FILL_MOST_FREQUENT,
+    AvailableMethods.FILL_BFILL,
+    AvailableMethods.FILL_FFILL,
+    AvailableMethods.FILL_INTERPOLATION,
+    AvailableMethods.FILL_LINEAR_IMPUTER,
+    AvailableMethods.FILL_KNN_IMPUTER,
+]
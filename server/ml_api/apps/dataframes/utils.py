@@ -1,8 +1,10 @@
 import random
+from typing import Dict
 
 import pandas as pd
 
 from ml_api.apps.dataframes import schemas
+from ml_api.apps.dataframes.model import DataFrameMetadata
 
 
 def _get_dataframe_with_pagination(df, page, rows_on_page
@@ -128,3 +130,15 @@ def convert_dtypes(df: pd.DataFrame) -> (pd.DataFrame, schemas.ColumnTypes):
     column_types = schemas.ColumnTypes(
         numeric=numeric_columns, categorical=categorical_columns)
     return df, column_types
+
+
+def get_feature_dtypes(dataframe_meta: DataFrameMetadata) -> Dict[str, str]:
+    """Типы признаков для чтения csv по частям: без них каждая часть
+    определяет типы сама (столбец с пропусками только в некоторых частях
+    читается то целым, то float), и кодировщики получают '1' в одной части
+    и '1.0' в другой. Целевой признак читается как раньше."""
+    column_types = dataframe_meta.feature_columns_types
+    dtypes = {column: 'float' for column in column_types.numeric}
+    dtypes.update({column: 'str' for column in column_types.categorical})
+    dtypes.pop(dataframe_meta.target_feature, None)
+    return dtypes
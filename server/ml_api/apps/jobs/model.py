@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
 
 from bunnet import Document
 from bunnet import PydanticObjectId
@@ -17,6 +17,7 @@ class BackgroundJob(Document):
     status: specs.JobStatuses = specs.JobStatuses.WAITING
     input_params: Dict = None
     output_message: str = None
+    progress: Optional[Dict] = None
 
     started_at: str = Field(default_factory=lambda: datetime.now().isoformat())
     finished_at: str = None
@@ -1,6 +1,7 @@
 from typing import List, Dict
 
 from bunnet import PydanticObjectId
+from bunnet.operators import In
 
 from ml_api.apps.jobs.model import BackgroundJob
 from ml_api.apps.jobs import specs
@@ -31,6 +32,11 @@ class BackgroundJobsCRUD:
             BackgroundJob.object_id == object_id).to_list()
         return reports
 
+    def delete_by_objects(self, object_ids: List[PydanticObjectId]):
+        BackgroundJob.find(
+            BackgroundJob.user_id == self.user_id,
+            In(BackgroundJob.object_id, object_ids)).delete().run()
+
     def get_all(self) -> List[BackgroundJob]:
         reports = BackgroundJob.find(
             BackgroundJob.user_id == self.user_id).to_list()
@@ -44,3 +50,14 @@ class BackgroundJobsCRUD:
         job.update(query)
         job_updated = BackgroundJob.get(job_id).run()
         return job_updated
+
+    def update_running_by_object(self,
+                                 object_type: specs.AvailableObjectTypes,
+                                 object_id: PydanticObjectId,
+                                 query: Dict):
+        BackgroundJob.find(
+            BackgroundJob.user_id == self.user_id,
+            BackgroundJob.object_type == object_type,
+            BackgroundJob.object_id == object_id,
+            BackgroundJob.status == specs.JobStatuses.RUNNING,
+        ).update(query).run()
@@ -25,6 +25,9 @@ class BackgroundJobsService:
                       ) -> List[BackgroundJob]:
         return self.repository.get_by_object(object_type, object_id)
 
+    def delete_by_objects(self, object_ids: List[PydanticObjectId]):
+        self.repository.delete_by_objects(object_ids)
+
     def create_apply_changing_methods_job(self,
                                           dataframe_id: PydanticObjectId,
                                           input_params: Dict
@@ -95,6 +98,20 @@ class BackgroundJobsService:
         job = self.repository.add(job)
         return job
 
+    def create_update_model_job(self,
+                                model_id: PydanticObjectId,
+                                input_params: Dict
+                                ) -> BackgroundJob:
+        job = BackgroundJob(
+            user_id=self._user_id,
+            type=specs.AvailableJobTypes.UPDATE_MODEL,
+            object_type=specs.AvailableObjectTypes.MODEL,
+            object_id=model_id,
+            input_params=input_params
+        )
+        job = self.repository.add(job)
+        return job
+
     def run_job(self,
                 job_id: PydanticObjectId,
                 ) -> BackgroundJob:
@@ -104,6 +121,14 @@ class BackgroundJobsService:
         job = self.repository.update(job_id, query)
         return job
 
+    def set_progress(self,
+                     object_type: specs.AvailableObjectTypes,
+                     object_id: PydanticObjectId,
+                     progress: Dict):
+        """Обновляет прогресс выполняющихся jobs объекта."""
+        query = {"$set": {BackgroundJob.progress: progress}}
+        self.repository.update_running_by_object(object_type, object_id, query)
+
     def complete_job(self,
                      job_id: PydanticObjectId,
                      ) -> BackgroundJob:
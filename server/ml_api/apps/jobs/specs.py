@@ -7,6 +7,7 @@ class AvailableJobTypes(Enum):
     TRAIN_MODEL = "train_model"
     BUILD_COMPOSITION = "build_composition"
     PREDICT_ON_MODEL = "predict_on_model"
+    UPDATE_MODEL = "update_model"
 
 
 class AvailableObjectTypes(Enum):
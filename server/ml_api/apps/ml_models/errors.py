@@ -96,6 +96,52 @@ class FeaturesNotEqualError(HTTPException):
         )
 
 
+class WrongCVFoldsNumberError(HTTPException):
+    """
+    Exception raised when the number of cross-validation folds is less than 2.
+    """
+    def __init__(self, cv_folds: int):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Cross-validation requires at least 2 folds, got {cv_folds}."
+        )
+
+
+class WrongTrainScoringSampleSizeError(HTTPException):
+    """
+    Exception raised when the train scoring sample size is not positive.
+    """
+    def __init__(self, sample_size: int):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Train scoring sample size must be positive, got {sample_size}."
+        )
+
+
+class OutOfCoreModelTypeError(HTTPException):
+    """
+    Exception raised when out-of-core training is requested for a model type
+    without partial_fit support.
+    """
+    def __init__(self, model_type: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Model type '{model_type}' does not support out-of-core training."
+        )
+
+
+class OutOfCoreParamsConflictError(HTTPException):
+    """
+    Exception raised when out-of-core training is combined with an option
+    that requires the whole dataframe in memory.
+    """
+    def __init__(self, param_name: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Out-of-core training can't be combined with {param_name}."
+        )
+
+
 # MODEL CONSTRUCTOR ERRORS-----------------------------------------------------
 # These exceptions indicate issues during the construction of machine learning models.
 class ModelConstructionError(HTTPException):
@@ -189,6 +235,51 @@ class TooManyClassesClassificationError(Exception):
         super().__init__(error_message)
 
 
+# MODEL UPDATE ERRORS----------------------------------------------------------
+# These exceptions are associated with continued training of trained models.
+class ModelUpdateNotSupportedError(HTTPException):
+    """
+    Exception raised when continued training is requested for a model type
+    (or its parameters) that supports neither partial_fit nor warm start.
+    """
+    def __init__(self, model_type: str, reason: str = None):
+        detail = f"Model type '{model_type}' does not support continued training."
+        if reason is not None:
+            detail = f"{detail} {reason}"
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+
+
+class ModelNotTrainedError(HTTPException):
+    """
+    Exception raised when continued training is requested for a model
+    that has not been trained yet.
+    """
+    def __init__(self, model_id: PydanticObjectId):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Model with id {model_id} is not trained yet."
+        )
+
+
+class TargetNotEqualError(HTTPException):
+    """
+    Exception raised when the target column of the provided dataframe
+    differs from the model's target column.
+    """
+    def __init__(self, target_column_model: str, target_column_input: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Mismatch in target column. Model was trained with: "
+                f"{target_column_model}. Provided dataframe has: "
+                f"{target_column_input}."
+            )
+        )
+
+
 # MODEL PREDICTION ERRORS------------------------------------------------------
 # These exceptions pertain to issues encountered during model prediction.
 class ModelPredictionError(HTTPException):
@@ -202,6 +293,31 @@ class ModelPredictionError(HTTPException):
         )
 
 
+class ScoreMethodNotSupportedError(HTTPException):
+    """
+    Exception raised when prediction scores are requested with a method
+    the model does not provide.
+    """
+    def __init__(self, model_type: str, score_method: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Model {model_type} does not support {score_method}."
+        )
+
+
+class OnlinePredictionRowsError(HTTPException):
+    """
+    Exception raised when an online prediction request has no rows or more
+    rows than allowed.
+    """
+    def __init__(self, n_rows: int, max_rows: int):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Online prediction accepts from 1 to {max_rows} rows, "
+                   f"got {n_rows}."
+        )
+
+
 # PARAMETERS SEARCHING ERRORS--------------------------------------------------
 # These exceptions are related to errors during hyperparameter optimization.
 class ParamsSearchingError(HTTPException):
@@ -286,7 +402,7 @@ class CompositionConstructionError(HTTPException):
     Exception raised when there's an error during composition construction.
     """
     def __init__(self, err_desc: str):
-        super.__init__(
+        super().__init__(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=f"Composition construction failed: {err_desc}"
         )
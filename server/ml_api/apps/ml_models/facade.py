@@ -1,6 +1,10 @@
+from typing import List, Tuple
+
 from bunnet import PydanticObjectId
 
 from ml_api.apps.ml_models.repositories.repository_manager import ModelRepositoryManager
+from ml_api.apps.ml_models.repositories.search_history_repository import \
+    ParamsSearchHistoryCRUD
 from ml_api.apps.ml_models.services.model_service import ModelService
 
 
@@ -15,7 +19,12 @@ class ModelServiceFacade:
         return self.repository.remove_prediction(model_id, prediction_id)
 
     # 4: DELETE OPERATIONS ----------------------------------------------------
-    def delete_models_by_dataframe(self, dataframe_id: PydanticObjectId):
-        dataframe_models = self.repository.get_all_models_meta_by_dataframe(dataframe_id)
-        for model in dataframe_models:
-            self.models_service.delete_model(model.id)
+    def delete_models_by_dataframes(self,
+                                    dataframe_ids: List[PydanticObjectId]
+                                    ) -> Tuple[List[PydanticObjectId],
+                                               List[PydanticObjectId]]:
+        model_ids, prediction_ids = \
+            self.models_service.delete_models_by_dataframes(dataframe_ids)
+        ParamsSearchHistoryCRUD(self._user_id).delete_by_dataframe_ids(
+            dataframe_ids)
+        return model_ids, prediction_ids
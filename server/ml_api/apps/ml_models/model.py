@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from bunnet import Document
 from bunnet import PydanticObjectId
@@ -22,6 +22,15 @@ class ModelMetadata(Document):
     target_column: Optional[str] = None
     test_size: Optional[float] = 0.25
     stratify: Optional[bool] = False
+    cv_folds: Optional[int] = None
+    cv_refit: Optional[bool] = True
+    train_scoring: specs.TrainScoringModes = specs.TrainScoringModes.FULL
+    train_scoring_sample_size: Optional[int] = None
+    out_of_core: bool = False
+    prediction_output: specs.PredictionOutputModes = \
+        specs.PredictionOutputModes.FULL
+    storage_mode: specs.ModelStorageModes = specs.ModelStorageModes.DEFAULT
+    onnx_exported: bool = False
     status: specs.ModelStatuses = specs.ModelStatuses.BUILDING
     metrics_report_ids: List[PydanticObjectId] = []
     model_prediction_ids: List[PydanticObjectId] = []
@@ -36,3 +45,26 @@ class ModelMetadata(Document):
                 "filename", ASCENDING)], unique=True),
             IndexModel([("dataframe_id", HASHED)]),
         ]
+
+
+class ParamsSearchHistory(Document):
+    """
+    История испытаний подбора гиперпараметров для версии датафрейма
+    (хэша его содержимого), типа задачи и типа модели.
+    """
+    user_id: PydanticObjectId
+    dataframe_id: PydanticObjectId
+    dataframe_version: str
+    task_type: specs.AvailableTaskTypes
+    model_type: specs.AvailableModelTypes
+    # испытания hyperopt: {'vals': ..., 'params': ..., 'loss': ..., 'status': ...}
+    trials: List[Dict[str, Any]] = []
+    updated_at: str = Field(default_factory=lambda: datetime.now().isoformat())
+
+    class Settings:
+        collection = "params_search_history_collection"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("dataframe_id", ASCENDING),
+                        ("task_type", ASCENDING), ("model_type", ASCENDING),
+                        ("updated_at", ASCENDING)]),
+        ]
@@ -23,6 +23,12 @@ CLASSIFICATION_SEARCH_SPACE_CONFIG = {
         'learning_rate': hp.loguniform('learning_rate', -5, 0),
         'max_depth': scope.int(hp.quniform('max_depth', 1, 10, 1))
     },
+    Models.HIST_GRADIENT_BOOSTING_CLASSIFIER: {
+        'max_iter': scope.int(hp.quniform('max_iter', 50, 300, 1)),
+        'learning_rate': hp.loguniform('learning_rate', -5, 0),
+        'max_leaf_nodes': scope.int(hp.quniform('max_leaf_nodes', 8, 64, 1)),
+        'l2_regularization': hp.loguniform('l2_regularization', -5, 1)
+    },
     Models.ADABOOST_CLASSIFIER: {
         'n_estimators': scope.int(hp.quniform('n_estimators', 50, 200, 1)),
         'learning_rate': hp.loguniform('learning_rate', -5, 0)
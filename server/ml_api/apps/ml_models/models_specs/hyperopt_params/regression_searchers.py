@@ -1,4 +1,5 @@
 from hyperopt import hp
+from hyperopt.pyll import scope
 from ml_api.apps.ml_models.specs import AvailableModelTypes as Models
 
 # Определяем search_space
@@ -6,53 +7,59 @@ REGRESSION_SEARCH_SPACE_CONFIG = {
     Models.DECISION_TREE_REGRESSOR: {
         'criterion': hp.choice('criterion', ['mse', 'friedman_mse', 'mae']),
         'splitter': hp.choice('splitter', ['best', 'random']),
-        'max_depth': hp.quniform('max_depth', 1, 20, 1),
+        'max_depth': scope.int(hp.quniform('max_depth', 1, 20, 1)),
     },
 
     Models.RANDOM_FOREST_REGRESSOR: {
-        'n_estimators': hp.quniform('n_estimators', 50, 200, 1),
+        'n_estimators': scope.int(hp.quniform('n_estimators', 50, 200, 1)),
         'criterion': hp.choice('criterion', ['mse', 'mae']),
-        'max_depth': hp.quniform('max_depth', 1, 20, 1),
+        'max_depth': scope.int(hp.quniform('max_depth', 1, 20, 1)),
     },
 
     Models.EXTRA_TREES_REGRESSOR: {
-        'n_estimators': hp.quniform('n_estimators', 50, 200, 1),
+        'n_estimators': scope.int(hp.quniform('n_estimators', 50, 200, 1)),
         'criterion': hp.choice('criterion', ['mse', 'mae']),
-        'max_depth': hp.quniform('max_depth', 1, 20, 1),
+        'max_depth': scope.int(hp.quniform('max_depth', 1, 20, 1)),
     },
 
     Models.GRADIENT_BOOSTING_REGRESSOR: {
-        'n_estimators': hp.quniform('n_estimators', 50, 200, 1),
+        'n_estimators': scope.int(hp.quniform('n_estimators', 50, 200, 1)),
         'learning_rate': hp.loguniform('learning_rate', -5, 0),
-        'max_depth': hp.quniform('max_depth', 1, 10, 1),
+        'max_depth': scope.int(hp.quniform('max_depth', 1, 10, 1)),
     },
 
+    Models.HIST_GRADIENT_BOOSTING_REGRESSOR: {
+        'max_iter': scope.int(hp.quniform('max_iter', 50, 300, 1)),
+        'learning_rate': hp.loguniform('learning_rate', -5, 0),
+        'max_leaf_nodes': scope.int(hp.quniform('max_leaf_nodes', 8, 64, 1)),
+        'l2_regularization': hp.loguniform('l2_regularization', -5, 1)
+    },
     Models.ADABOOST_REGRESSOR: {
-        'n_estimators': hp.quniform('n_estimators', 50, 200, 1),
+        'n_estimators': scope.int(hp.quniform('n_estimators', 50, 200, 1)),
         'learning_rate': hp.loguniform('learning_rate', -5, 0),
     },
 
     Models.BAGGING_REGRESSOR: {
-        'n_estimators': hp.quniform('n_estimators', 10, 100, 1),
+        'n_estimators': scope.int(hp.quniform('n_estimators', 10, 100, 1)),
         'max_samples': hp.uniform('max_samples', 0.5, 1),
     },
 
     Models.XGB_REGRESSOR: {
-        'n_estimators': hp.quniform('n_estimators', 50, 200, 1),
+        'n_estimators': scope.int(hp.quniform('n_estimators', 50, 200, 1)),
         'learning_rate': hp.loguniform('learning_rate', -5, 0),
-        'max_depth': hp.quniform('max_depth', 1, 10, 1),
+        'max_depth': scope.int(hp.quniform('max_depth', 1, 10, 1)),
     },
 
     Models.LGBM_REGRESSOR: {
-        'n_estimators': hp.quniform('n_estimators', 50, 200, 1),
+        'n_estimators': scope.int(hp.quniform('n_estimators', 50, 200, 1)),
         'learning_rate': hp.loguniform('learning_rate', -5, 0),
-        'max_depth': hp.quniform('max_depth', 1, 10, 1),
+        'max_depth': scope.int(hp.quniform('max_depth', 1, 10, 1)),
     },
 
     Models.CATBOOST_REGRESSOR: {
-        'iterations': hp.quniform('iterations', 50, 200, 1),
+        'iterations': scope.int(hp.quniform('iterations', 50, 200, 1)),
         'learning_rate': hp.loguniform('learning_rate', -5, 0),
-        'depth': hp.quniform('depth', 1, 10, 1),
+        'depth': scope.int(hp.quniform('depth', 1, 10, 1)),
     },
 
     Models.SGD_REGRESSOR: {
@@ -71,7 +78,7 @@ REGRESSION_SEARCH_SPACE_CONFIG = {
     Models.SVR: {
         'C': hp.loguniform('C', -5, 0),
         'kernel': hp.choice('kernel', ['linear', 'poly', 'rbf', 'sigmoid']),
-        'degree': hp.quniform('degree', 1, 5, 1),
+        'degree': scope.int(hp.quniform('degree', 1, 5, 1)),
     },
 
     Models.LINEAR_REGRESSION: {},
@@ -96,7 +103,7 @@ REGRESSION_SEARCH_SPACE_CONFIG = {
     },
 
     Models.K_NEIGHBORS_REGRESSOR: {
-        'n_neighbors': hp.quniform('n_neighbors', 1, 20, 1),
+        'n_neighbors': scope.int(hp.quniform('n_neighbors', 1, 20, 1)),
         'weights': hp.choice('weights', ['uniform', 'distance']),
         'algorithm': hp.choice('algorithm',
                                ['auto', 'ball_tree', 'kd_tree', 'brute']),
@@ -4,6 +4,7 @@ from pydantic import BaseModel
 
 class VotingClassifierParams(BaseModel):
     voting: Literal['hard', 'soft'] = 'hard'
+    prefit: bool = False
 
 
 class StackingClassifierParams(BaseModel):
@@ -12,3 +13,4 @@ class StackingClassifierParams(BaseModel):
         "RandomForestClassifier",
         'GradientBoostingClassifier'
     ] = 'GradientBoostingClassifier'
+    prefit: bool = False
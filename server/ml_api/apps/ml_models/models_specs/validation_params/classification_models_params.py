@@ -62,6 +62,22 @@ class GradientBoostingClassifierParams(BaseModel):
     tol: float = 1e-4
 
 
+class HistGradientBoostingClassifierParams(BaseModel):
+    loss: Literal['log_loss'] = 'log_loss'
+    learning_rate: float = Field(0.1, gt=0.0)
+    max_iter: conint(ge=1) = 100
+    max_leaf_nodes: Optional[conint(ge=2)] = 31
+    max_depth: Optional[conint(gt=0)] = None
+    min_samples_leaf: conint(ge=1) = 20
+    l2_regularization: confloat(ge=0) = 0.0
+    max_bins: conint(ge=2, le=255) = 255
+    early_stopping: Union[Literal['auto'], bool] = 'auto'
+    validation_fraction: Optional[float] = Field(0.1, gt=0.0, lt=1.0)
+    n_iter_no_change: conint(ge=1) = 10
+    tol: confloat(ge=0) = 1e-7
+    random_state: Optional[int] = None
+
+
 class AdaBoostClassifierParams(BaseModel):
     # base_estimator: Optional[str] = None
     n_estimators: conint(ge=1) = 50
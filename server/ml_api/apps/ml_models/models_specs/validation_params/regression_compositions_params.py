@@ -4,6 +4,7 @@ from pydantic import BaseModel
 
 class VotingRegressorParams(BaseModel):
     voting: Literal['hard', 'soft', 'weighted'] = 'hard'
+    prefit: bool = False
 
 
 class StackingRegressorParams(BaseModel):
@@ -12,3 +13,4 @@ class StackingRegressorParams(BaseModel):
         "RandomForestRegressor",
         'GradientBoostingRegressor'
     ] = 'GradientBoostingRegressor'
+    prefit: bool = False
@@ -1,9 +1,15 @@
 from pathlib import Path
+from typing import List
+
 import joblib
 from bunnet import PydanticObjectId
 from fastapi.responses import FileResponse
 
-from ml_api.apps.ml_models import errors
+from ml_api import config
+from ml_api.apps.ml_models import errors, utils
+from ml_api.apps.ml_models.specs import ModelStorageModes
+from ml_api.apps.ml_models.repositories.model_cache import model_cache, \
+    estimate_model_size
 from ml_api.common.file_manager.base import FileCRUD
 from ml_api.config import ROOT_DIR
 
@@ -25,25 +31,128 @@ class ModelFileCRUD(FileCRUD):
         file_response = self._download(path=joblib_path, filename=filename)
         return file_response
 
-    def read_model(self, file_id: PydanticObjectId):  # -> Estimator object
-        """Read model file"""
+    def _get_cache_key(self, file_id: PydanticObjectId):
+        return str(self.user_id), str(file_id)
+
+    def read_model(self, file_id: PydanticObjectId,
+                   storage_mode: ModelStorageModes = ModelStorageModes.DEFAULT,
+                   use_cache: bool = True):
+        """
+        Read model file. Cached models are shared and must not be changed;
+        with use_cache=False the model is loaded into private memory.
+        """
         joblib_path = self._get_joblib_path(file_id)
         try:
-            model = joblib.load(joblib_path)
+            stat = joblib_path.stat()
+        except FileNotFoundError:
+            raise errors.ModelFileNotFoundError(file_id)
+        cache_key = self._get_cache_key(file_id)
+        if use_cache:
+            model = model_cache.get(cache_key, stat.st_mtime_ns)
+            if model is not None:
+                return model
+        # массивы открываются только на чтение, страницы файла делятся
+        # между процессами, загрузившими ту же модель
+        mmap_mode = 'r' if use_cache and \
+            storage_mode == ModelStorageModes.MMAP else None
+        try:
+            model = joblib.load(joblib_path, mmap_mode=mmap_mode)
         except FileNotFoundError:
             raise errors.ModelFileNotFoundError(file_id)
+        if use_cache:
+            model_cache.put(cache_key, stat.st_mtime_ns,
+                            estimate_model_size(model), model)
         return model
 
-    def save_model(self, file_id: PydanticObjectId, model):
+    def save_model(self, file_id: PydanticObjectId, model,
+                   storage_mode: ModelStorageModes = ModelStorageModes.DEFAULT):
         """Save model file"""
         joblib_path = self._get_joblib_path(file_id)
-        joblib.dump(model, joblib_path)
+        model_cache.invalidate(self._get_cache_key(file_id))
+        compress = config.MODEL_COMPRESSION_LEVEL \
+            if storage_mode == ModelStorageModes.COMPRESSED else 0
+        # запись во временный файл: процессы, отобразившие старый файл
+        # в память, продолжают читать его до перезагрузки модели
+        tmp_path = joblib_path.with_suffix('.tmp')
+        joblib.dump(model, tmp_path, compress=compress)
+        tmp_path.replace(joblib_path)
 
     def delete_model(self, file_id: PydanticObjectId):
         """Delete model file"""
         joblib_path = self._get_joblib_path(file_id)
+        model_cache.invalidate(self._get_cache_key(file_id))
         self._delete(joblib_path)
 
+    def _get_onnx_path(self, file_id: PydanticObjectId):
+        return self._get_joblib_path(file_id).with_suffix('.onnx')
+
+    def read_onnx(self, file_id: PydanticObjectId):
+        """Read ONNX model file as an ONNX Runtime inference session"""
+        onnx_path = self._get_onnx_path(file_id)
+        try:
+            stat = onnx_path.stat()
+        except FileNotFoundError:
+            raise errors.ModelFileNotFoundError(file_id)
+        cache_key = (*self._get_cache_key(file_id), 'onnx')
+        session = model_cache.get(cache_key, stat.st_mtime_ns)
+        if session is None:
+            session = utils.create_onnx_session(onnx_path.read_bytes(),
+                                          config.ONNX_N_THREADS)
+            model_cache.put(cache_key, stat.st_mtime_ns, stat.st_size,
+                            session)
+        return session
+
+    def save_onnx(self, file_id: PydanticObjectId, onnx_model: bytes):
+        """Save model in the ONNX format"""
+        model_cache.invalidate((*self._get_cache_key(file_id), 'onnx'))
+        self._get_onnx_path(file_id).write_bytes(onnx_model)
+
+    def delete_onnx(self, file_id: PydanticObjectId):
+        """Delete ONNX model file if exists"""
+        model_cache.invalidate((*self._get_cache_key(file_id), 'onnx'))
+        self._get_onnx_path(file_id).unlink(missing_ok=True)
+
+    def _get_oof_dir(self):
+        oof_dir = Path(ROOT_DIR) / str(self.user_id) / "models" / "oof"
+        oof_dir.mkdir(parents=True, exist_ok=True)
+        return oof_dir
+
+    def _get_oof_path(self, file_id: PydanticObjectId, key: str):
+        return self._get_oof_dir() / f"{file_id}_{key}.joblib"
+
+    def read_oof_predictions(self, file_id: PydanticObjectId, key: str):
+        """Read cached out-of-fold predictions, None if not cached"""
+        oof_path = self._get_oof_path(file_id, key)
+        if not oof_path.exists():
+            return None
+        return joblib.load(oof_path)
+
+    def save_oof_predictions(self, file_id: PydanticObjectId, key: str,
+                             oof_predictions):
+        """Save out-of-fold predictions to cache"""
+        joblib.dump(oof_predictions, self._get_oof_path(file_id, key))
+
+    def delete_oof_predictions(self, file_id: PydanticObjectId):
+        """Delete all cached out-of-fold predictions of the model"""
+        for oof_path in self._get_oof_dir().glob(
+                f"{file_id}_*.joblib"):
+            oof_path.unlink()
+
+    def delete_models_files(self, file_ids: List[PydanticObjectId]):
+        """Delete model, ONNX and out-of-fold files of many models"""
+        paths = []
+        for file_id in file_ids:
+            cache_key = self._get_cache_key(file_id)
+            model_cache.invalidate(cache_key)
+            model_cache.invalidate((*cache_key, 'onnx'))
+            paths.append(self._get_joblib_path(file_id))
+            paths.append(self._get_onnx_path(file_id))
+        # каталог кэша out-of-fold просматривается один раз на все модели
+        file_ids = set(map(str, file_ids))
+        paths.extend(oof_path for oof_path in self._get_oof_dir().glob(
+            "*.joblib") if oof_path.name.split('_', 1)[0] in file_ids)
+        self._delete_many(paths)
+
 
 # class ModelFileCRUD(FileCRUD):
 #
@@ -1,6 +1,7 @@
 from typing import List, Dict, Optional
 
 from bunnet import PydanticObjectId
+from bunnet.operators import In
 from pymongo.errors import DuplicateKeyError
 
 from ml_api.apps.ml_models import schemas, specs, errors
@@ -17,9 +18,10 @@ class ModelMetaCRUD:
             raise errors.ModelNotFoundError(model_id)
         return model_meta
 
-    def get_all(self) -> List[ModelMetadata]:
+    def get_all(self) -> List[schemas.ModelSummary]:
         model_metas = ModelMetadata.find(
-            ModelMetadata.user_id == self.user_id).to_list()
+            ModelMetadata.user_id == self.user_id).project(
+            schemas.ModelSummary).to_list()
         return model_metas
 
     def get_by_dataframe_id(self, dataframe_id: PydanticObjectId
@@ -29,6 +31,13 @@ class ModelMetaCRUD:
             ModelMetadata.dataframe_id == dataframe_id).to_list()
         return models
 
+    def get_by_dataframe_ids(self, dataframe_ids: List[PydanticObjectId]
+                             ) -> List[ModelMetadata]:
+        models = ModelMetadata.find(
+            ModelMetadata.user_id == self.user_id,
+            In(ModelMetadata.dataframe_id, dataframe_ids)).to_list()
+        return models
+
     def get_by_filename(self, filename: str) -> ModelMetadata:
         model_meta = ModelMetadata.find_one(
             ModelMetadata.filename == filename,
@@ -46,6 +55,14 @@ class ModelMetaCRUD:
                target_column: str,
                test_size: float,
                stratify: bool,
+               cv_folds: Optional[int] = None,
+               cv_refit: bool = True,
+               train_scoring: specs.TrainScoringModes =
+               specs.TrainScoringModes.FULL,
+               train_scoring_sample_size: Optional[int] = None,
+               out_of_core: bool = False,
+               prediction_output: specs.PredictionOutputModes =
+               specs.PredictionOutputModes.FULL,
                composition_model_ids: Optional[List[PydanticObjectId]] = None
                ) -> ModelMetadata:
         new_obj = ModelMetadata(
@@ -60,6 +77,12 @@ class ModelMetaCRUD:
             target_column=target_column,
             test_size=test_size,
             stratify=stratify,
+            cv_folds=cv_folds,
+            cv_refit=cv_refit,
+            train_scoring=train_scoring,
+            train_scoring_sample_size=train_scoring_sample_size,
+            out_of_core=out_of_core,
+            prediction_output=prediction_output,
             composition_model_ids=composition_model_ids
         )
         try:
@@ -83,3 +106,8 @@ class ModelMetaCRUD:
             raise errors.ModelNotFoundError(model_id)
         model_meta.delete()
         return model_meta
+
+    def delete_many(self, model_ids: List[PydanticObjectId]):
+        ModelMetadata.find(
+            In(ModelMetadata.id, model_ids),
+            ModelMetadata.user_id == self.user_id).delete().run()
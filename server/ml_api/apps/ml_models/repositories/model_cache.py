@@ -0,0 +1,81 @@
+import pickle
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional, Tuple
+
+from ml_api import config
+
+
+class ModelCache:
+    """
+    LRU-кэш загруженных моделей внутри процесса (API или celery-воркера).
+    Запись хранится вместе со временем изменения файла модели: если файл
+    перезаписан другим процессом, запись считается устаревшей. Объем
+    оценивается по размеру модели в памяти (см. estimate_model_size), а не
+    по размеру файла, который у сжатых моделей во много раз меньше; при
+    превышении бюджета вытесняются давно не использованные модели.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[int, int, Any]]' = \
+            OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, mtime: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_mtime, _, model = entry
+            if entry_mtime != mtime:
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return model
+
+    def put(self, key: Hashable, mtime: int, size: int, model):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (mtime, size, model)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._pop(key)
+
+    def _pop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+
+class _ByteCounter:
+    def __init__(self):
+        self.n_bytes = 0
+
+    def write(self, data) -> int:
+        self.n_bytes += len(data)
+        return len(data)
+
+
+def estimate_model_size(model) -> int:
+    """
+    Размер модели в памяти: объем ее pickle-представления, в котором массивы
+    numpy не копируются, а учитываются по nbytes (буферы вне потока).
+    """
+    counter = _ByteCounter()
+
+    def add_buffer(buffer: pickle.PickleBuffer):
+        counter.n_bytes += memoryview(buffer).nbytes
+
+    pickle.Pickler(counter, protocol=5,
+                   buffer_callback=add_buffer).dump(model)
+    return counter.n_bytes
+
+
+model_cache = ModelCache(config.MODEL_CACHE_MAX_MB * 1024 * 1024)
@@ -4,6 +4,7 @@ from bunnet import PydanticObjectId
 from fastapi.responses import FileResponse
 from pymongo.errors import DuplicateKeyError
 
+from ml_api import config
 from ml_api.apps.ml_models import specs, schemas, errors
 from ml_api.apps.ml_models.model import ModelMetadata
 from ml_api.apps.ml_models.repositories.meta_repository import ModelMetaCRUD
@@ -35,6 +36,14 @@ class ModelRepositoryManager:
                      target_column: str,
                      test_size: float,
                      stratify: bool,
+                     cv_folds: Optional[int] = None,
+                     cv_refit: bool = True,
+                     train_scoring: specs.TrainScoringModes =
+                     specs.TrainScoringModes.FULL,
+                     train_scoring_sample_size: Optional[int] = None,
+                     out_of_core: bool = False,
+                     prediction_output: specs.PredictionOutputModes =
+                     specs.PredictionOutputModes.FULL,
                      composition_model_ids: Optional[
                          List[PydanticObjectId]] = None
                      ) -> ModelMetadata:
@@ -49,13 +58,36 @@ class ModelRepositoryManager:
             target_column=target_column,
             test_size=test_size,
             stratify=stratify,
+            cv_folds=cv_folds,
+            cv_refit=cv_refit,
+            train_scoring=train_scoring,
+            train_scoring_sample_size=train_scoring_sample_size,
+            out_of_core=out_of_core,
+            prediction_output=prediction_output,
             composition_model_ids=composition_model_ids
         )
         return model_meta
 
-    def save_new_model(self, model_id: PydanticObjectId, model
+    def save_new_model(self, model_id: PydanticObjectId, model,
+                       storage_mode: Optional[specs.ModelStorageModes] = None
                        ) -> ModelMetadata:
-        self.file_repository.save_model(model_id, model)
+        """
+        storage_mode - формат файла модели, уже сохраненной ранее (при
+        дообучении); новые модели сохраняются в формате из настроек.
+        """
+        storage_mode = storage_mode or self._get_default_storage_mode(model)
+        self.file_repository.save_model(model_id, model, storage_mode)
+        return self.set_storage_mode(model_id, storage_mode)
+
+    @staticmethod
+    def _get_default_storage_mode(model) -> specs.ModelStorageModes:
+        # mmap только для моделей, массивы которых действительно остаются
+        # отображенными в память (деревья копируются при загрузке)
+        if config.MODEL_STORAGE_MODE == specs.ModelStorageModes.MMAP and \
+                type(model).__name__ not in \
+                {model_type.value for model_type in specs.mmap_shared_models}:
+            return specs.ModelStorageModes.DEFAULT
+        return config.MODEL_STORAGE_MODE
 
     def download_model(self, model_id: PydanticObjectId) -> FileResponse:
         # add onnx format conversion if needed
@@ -66,15 +98,55 @@ class ModelRepositoryManager:
             file_id=model_id, filename=model_meta.filename)
         return response
 
-    def load_model(self, model_id: PydanticObjectId):
-        return self.file_repository.read_model(model_id)
+    def load_model(self, model_id: PydanticObjectId,
+                   storage_mode: specs.ModelStorageModes,
+                   use_cache: bool = True):
+        """storage_mode - формат файла из метаданных модели у вызывающего."""
+        return self.file_repository.read_model(model_id, storage_mode,
+                                               use_cache)
+
+    def save_onnx_model(self, model_id: PydanticObjectId,
+                        onnx_model: Optional[bytes]) -> ModelMetadata:
+        """Сохраняет ONNX-версию модели или удаляет устаревшую (None)."""
+        if onnx_model is None:
+            self.file_repository.delete_onnx(model_id)
+        else:
+            self.file_repository.save_onnx(model_id, onnx_model)
+        query = {"$set": {ModelMetadata.onnx_exported: onnx_model is not None}}
+        return self.meta_repository.update(model_id, query)
+
+    def load_onnx_session(self, model_id: PydanticObjectId):
+        return self.file_repository.read_onnx(model_id)
+
+    def change_storage_mode(self, model_id: PydanticObjectId,
+                            storage_mode: specs.ModelStorageModes
+                            ) -> ModelMetadata:
+        model_meta = self.meta_repository.get(model_id)
+        model = self.load_model(model_id, model_meta.storage_mode,
+                                use_cache=False)
+        self.file_repository.save_model(model_id, model, storage_mode)
+        return self.set_storage_mode(model_id, storage_mode)
+
+    def load_oof_predictions(self, model_id: PydanticObjectId, key: str):
+        return self.file_repository.read_oof_predictions(model_id, key)
+
+    def save_oof_predictions(self, model_id: PydanticObjectId, key: str,
+                             oof_predictions):
+        self.file_repository.save_oof_predictions(model_id, key,
+                                                  oof_predictions)
 
     def delete_model(self, model_id: PydanticObjectId) -> ModelMetadata:
         model_meta = self.meta_repository.delete(model_id)
         if model_meta.status == specs.ModelStatuses.TRAINED:
             self.file_repository.delete_model(model_id)
+        self.file_repository.delete_onnx(model_id)
+        self.file_repository.delete_oof_predictions(model_id)
         return model_meta
 
+    def delete_models(self, model_ids: List[PydanticObjectId]):
+        self.meta_repository.delete_many(model_ids)
+        self.file_repository.delete_models_files(model_ids)
+
     # 2: GET METADATA OPERATIONS ----------------------------------------------
     def get_by_filename(self, filename: str) -> ModelMetadata:
         return self.meta_repository.get_by_filename(filename)
@@ -83,7 +155,7 @@ class ModelRepositoryManager:
                        ) -> ModelMetadata:
         return self.meta_repository.get(model_id)
 
-    def get_all_models_meta(self) -> List[ModelMetadata]:
+    def get_all_models_summaries(self) -> List[schemas.ModelSummary]:
         return self.meta_repository.get_all()
 
     def get_all_models_meta_by_dataframe(self,
@@ -91,6 +163,11 @@ class ModelRepositoryManager:
     List[ModelMetadata]:
         return self.meta_repository.get_by_dataframe_id(dataframe_id)
 
+    def get_all_models_meta_by_dataframes(
+            self, dataframe_ids: List[PydanticObjectId]
+    ) -> List[ModelMetadata]:
+        return self.meta_repository.get_by_dataframe_ids(dataframe_ids)
+
     def get_filename(self, model_id: PydanticObjectId
                      ) -> str:
         model_meta = self.get_model_meta(model_id)
@@ -159,6 +236,12 @@ class ModelRepositoryManager:
         query = {"$set": {ModelMetadata.model_params: new_model_params}}
         return self.meta_repository.update(model_id, query)
 
+    def set_storage_mode(self, model_id: PydanticObjectId,
+                         storage_mode: specs.ModelStorageModes
+                         ) -> ModelMetadata:
+        query = {"$set": {ModelMetadata.storage_mode: storage_mode}}
+        return self.meta_repository.update(model_id, query)
+
     def add_report(self, model_id: PydanticObjectId,
                    report_id: PydanticObjectId) -> ModelMetadata:
         query = {"$push": {ModelMetadata.metrics_report_ids: report_id}}
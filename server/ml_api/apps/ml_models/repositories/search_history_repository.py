@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bunnet import PydanticObjectId
+from bunnet.operators import In
+
+from ml_api.apps.ml_models import specs
+from ml_api.apps.ml_models.model import ParamsSearchHistory
+
+
+class ParamsSearchHistoryCRUD:
+    def __init__(self, user_id: PydanticObjectId):
+        self.user_id = user_id
+
+    def get(self, dataframe_id: PydanticObjectId, dataframe_version: str,
+            task_type: specs.AvailableTaskTypes,
+            model_type: specs.AvailableModelTypes
+            ) -> Optional[ParamsSearchHistory]:
+        return ParamsSearchHistory.find_one(
+            ParamsSearchHistory.user_id == self.user_id,
+            ParamsSearchHistory.dataframe_id == dataframe_id,
+            ParamsSearchHistory.dataframe_version == dataframe_version,
+            ParamsSearchHistory.task_type == task_type,
+            ParamsSearchHistory.model_type == model_type).run()
+
+    def get_latest(self, dataframe_ids: List[PydanticObjectId],
+                   task_type: specs.AvailableTaskTypes,
+                   model_type: specs.AvailableModelTypes
+                   ) -> Optional[ParamsSearchHistory]:
+        histories = ParamsSearchHistory.find(
+            ParamsSearchHistory.user_id == self.user_id,
+            In(ParamsSearchHistory.dataframe_id, dataframe_ids),
+            ParamsSearchHistory.task_type == task_type,
+            ParamsSearchHistory.model_type == model_type,
+        ).sort(-ParamsSearchHistory.updated_at).limit(1).to_list()
+        return histories[0] if histories else None
+
+    def save(self, dataframe_id: PydanticObjectId, dataframe_version: str,
+             task_type: specs.AvailableTaskTypes,
+             model_type: specs.AvailableModelTypes,
+             trials: List[Dict[str, Any]]) -> ParamsSearchHistory:
+        history = self.get(dataframe_id, dataframe_version, task_type,
+                           model_type)
+        if history is None:
+            history = ParamsSearchHistory(
+                user_id=self.user_id,
+                dataframe_id=dataframe_id,
+                dataframe_version=dataframe_version,
+                task_type=task_type,
+                model_type=model_type,
+            )
+        history.trials = trials
+        history.updated_at = datetime.now().isoformat()
+        history.save()
+        return history
+
+    def delete_by_dataframe_id(self, dataframe_id: PydanticObjectId):
+        ParamsSearchHistory.find(
+            ParamsSearchHistory.user_id == self.user_id,
+            ParamsSearchHistory.dataframe_id == dataframe_id).delete().run()
+
+    def delete_by_dataframe_ids(self, dataframe_ids: List[PydanticObjectId]):
+        ParamsSearchHistory.find(
+            ParamsSearchHistory.user_id == self.user_id,
+            In(ParamsSearchHistory.dataframe_id, dataframe_ids)).delete().run()
@@ -1,4 +1,6 @@
-from typing import List
+from typing import Any, Dict, List
+
+import pandas as pd
 
 from bunnet import PydanticObjectId
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
@@ -13,6 +15,8 @@ from ml_api.apps.ml_models import schemas, specs, model, errors
 from ml_api.apps.ml_models.services.model_service import ModelService
 from ml_api.apps.ml_models.services.fit_predict_service import ModelFitPredictService
 from ml_api.apps.ml_models.services.jobs_manager import ModelJobsManager
+from ml_api.common.executor.heavy_executor import heavy_executor, \
+    ONLINE_PREDICTIONS_GROUP
 
 models_file_router = APIRouter(
     prefix="/model",
@@ -51,9 +55,33 @@ def rename_model(
         model_id, new_model_name)
 
 
+@models_file_router.put("/storage_mode",
+                        summary="Изменить формат хранения модели",
+                        response_model=model.ModelMetadata)
+async def set_model_storage_mode(
+    model_id: PydanticObjectId,
+    storage_mode: specs.ModelStorageModes,
+    user: User = Depends(current_active_user),
+):
+    """
+        Пересохраняет файл модели в другом формате.
+
+        - **model_id**: ID модели
+        - **storage_mode**: default - обычный файл; mmap - массивы модели
+        отображаются в память и разделяются процессами, загрузившими модель
+        (линейные модели, SVM, соседи, MLP, HistGradientBoosting; деревья
+        решений, леса и бустинги копируют массивы при загрузке, для них
+        mmap не экономит память); compressed - сжатый файл для редко
+        используемых моделей
+    """
+    return await heavy_executor.run(
+        user.id, ModelService(user.id).set_storage_mode,
+        model_id, storage_mode)
+
+
 @models_file_router.delete("",  summary="Удалить модель",
                            response_model=model.ModelMetadata)
-def delete_model(
+async def delete_model(
     model_id: PydanticObjectId,
     user: User = Depends(current_active_user),
 ):
@@ -62,7 +90,8 @@ def delete_model(
 
         - **model_id**: ID модели
     """
-    return ModelService(user.id).delete_model(model_id)
+    return await heavy_executor.run(
+        user.id, ModelService(user.id).delete_model, model_id)
 
 
 models_metadata_router = APIRouter(
@@ -86,13 +115,14 @@ def read_model_info(
     return ModelService(user.id).get_model_meta(model_id)
 
 
-@models_metadata_router.get("/all", response_model=List[model.ModelMetadata],
+@models_metadata_router.get("/all", response_model=List[schemas.ModelSummary],
     summary="Получить информацию обо всех моделях пользователя")
 def read_all_user_models(user: User = Depends(current_active_user)):
     """
-        Возвращает информацию обо всех моделях пользователя
+        Возвращает краткую информацию обо всех моделях пользователя
+        (без параметров, отчетов и предсказаний)
     """
-    return ModelService(user.id).get_all_models_meta()
+    return ModelService(user.id).get_all_models_summaries()
 
 
 @models_metadata_router.get("/by_dataframe",
@@ -120,14 +150,22 @@ models_processing_router = APIRouter(
 
 
 @models_processing_router.post("/train")
-def train_model(model_name: str,
-                dataframe_id: PydanticObjectId,
-                task_type: specs.AvailableTaskTypes,
-                model_params: schemas.ModelParams,
-                params_type: specs.AvailableParamsTypes,
-                test_size: float = None,
-                stratify: bool = None,
-                user: User = Depends(current_active_user)):
+async def train_model(model_name: str,
+                      dataframe_id: PydanticObjectId,
+                      task_type: specs.AvailableTaskTypes,
+                      model_params: schemas.ModelParams,
+                      params_type: specs.AvailableParamsTypes,
+                      test_size: float = None,
+                      stratify: bool = None,
+                      cv_folds: int = None,
+                      cv_refit: bool = True,
+                      train_scoring: specs.TrainScoringModes =
+                      specs.TrainScoringModes.FULL,
+                      train_scoring_sample_size: int = None,
+                      out_of_core: bool = False,
+                      prediction_output: specs.PredictionOutputModes =
+                      specs.PredictionOutputModes.FULL,
+                      user: User = Depends(current_active_user)):
     """
         Запускает обучение модели.
 
@@ -135,43 +173,103 @@ def train_model(model_name: str,
         - **dataframe_id**: ID датафрейма
         - **task_type**: тип задачи
         - **model_params**: тип и гиперпараметры модели
-        - **params_type**: тип подбора параметров (авто(hyperopt) только для
-        классификации/регрессии/кластеризации)
+        - **params_type**: тип подбора параметров (авто(hyperopt) и
+        successive halving только для классификации/регрессии/кластеризации)
         - **test_size**: размер валидационной выборки (классификация/регрессия)
         - **stratify**: делать ли стратификацию (при классификации)
+        - **cv_folds**: число фолдов для обучения с k-fold кросс-валидацией
+        вместо одного разбиения (классификация/регрессия)
+        - **cv_refit**: дообучать ли итоговую модель на всех данных после
+        кросс-валидации (иначе сохраняется лучшая модель среди фолдов)
+        - **train_scoring**: оценка модели на обучающей выборке - полностью
+        (по умолчанию), на случайной подвыборке (sample, для больших
+        датафреймов) или не оценивать (классификация/регрессия)
+        - **train_scoring_sample_size**: размер подвыборки для оценки на
+        обучающей выборке (по умолчанию из настроек)
+        - **out_of_core**: обучать по частям датафрейма через partial_fit, не
+        загружая его в память целиком (SGD, PassiveAggressive,
+        MiniBatchKMeans)
+        - **prediction_output**: что сохранять в датафреймах предсказаний на
+        валидации - признаки с предсказаниями (full) или только предсказания
+        (и вероятности) со столбцом row_index - индексом строки исходного
+        датафрейма, по которому клиент сам соединяет их с признаками
     """
-    if not config.USE_HYPEROPT and params_type == specs.AvailableParamsTypes.HYPEROPT:
+    if not config.USE_HYPEROPT and params_type in specs.searching_params_types:
         raise errors.HyperoptNotAvailableError()
 
-    model_meta = ModelService(user.id).create_model(
+    model_meta = await heavy_executor.run(
+        user.id, ModelService(user.id).create_model,
         model_name=model_name,
         dataframe_id=dataframe_id,
         task_type=task_type,
         model_params=model_params,
         params_type=params_type,
         test_size=test_size,
-        stratify=stratify)
-    return ModelFitPredictAsyncService(user.id).process_model_training(
+        stratify=stratify,
+        cv_folds=cv_folds,
+        cv_refit=cv_refit,
+        train_scoring=train_scoring,
+        train_scoring_sample_size=train_scoring_sample_size,
+        out_of_core=out_of_core,
+        prediction_output=prediction_output)
+    return await heavy_executor.run(
+        user.id, ModelFitPredictAsyncService(user.id).process_model_training,
         model_meta=model_meta)
 
 
 @models_processing_router.post("/build_composition")
-def build_composition(composition_name: str,
-                      model_ids: List[PydanticObjectId],
-                      composition_params: schemas.ModelParams,
-                      user: User = Depends(current_active_user)):
-    composition_meta = ModelService(user.id).create_composition(
+async def build_composition(composition_name: str,
+                            model_ids: List[PydanticObjectId],
+                            composition_params: schemas.ModelParams,
+                            cv_folds: int = None,
+                            cv_refit: bool = True,
+                            prediction_output: specs.PredictionOutputModes =
+                            specs.PredictionOutputModes.FULL,
+                            user: User = Depends(current_active_user)):
+    composition_meta = await heavy_executor.run(
+        user.id, ModelService(user.id).create_composition,
         composition_name=composition_name, model_ids=model_ids,
-        composition_params=composition_params)
-    return ModelFitPredictAsyncService(user.id).process_composition_training(
+        composition_params=composition_params, cv_folds=cv_folds,
+        cv_refit=cv_refit, prediction_output=prediction_output)
+    return await heavy_executor.run(
+        user.id,
+        ModelFitPredictAsyncService(user.id).process_composition_training,
         composition_meta=composition_meta)
 
 
+@models_processing_router.post("/update")
+async def update_model(model_id: PydanticObjectId,
+                       dataframe_id: PydanticObjectId = None,
+                       n_iterations: int = None,
+                       user: User = Depends(current_active_user)):
+    """
+        Дообучает обученную модель без обучения с нуля.
+
+        - **model_id**: ID модели
+        - **dataframe_id**: ID датафрейма с новыми данными (по умолчанию -
+        датафрейм, на котором училась модель)
+        - **n_iterations**: число эпох partial_fit или число добавляемых
+        деревьев/итераций бустинга
+
+        Поддерживаются модели с partial_fit (SGD, PassiveAggressive, MLP,
+        MiniBatchKMeans), ансамбли деревьев с warm_start и бустинги
+        XGBoost/LightGBM/CatBoost.
+    """
+    return await heavy_executor.run(
+        user.id, ModelFitPredictAsyncService(user.id).process_model_update,
+        model_id=model_id,
+        dataframe_id=dataframe_id,
+        n_iterations=n_iterations)
+
+
 @models_processing_router.put("/predict")
-def predict_on_model(dataframe_id: PydanticObjectId,
+async def predict_on_model(dataframe_id: PydanticObjectId,
             model_id: PydanticObjectId,
             prediction_name: str,
             apply_pipeline: bool = True,
+            prediction_output: specs.PredictionOutputModes =
+            specs.PredictionOutputModes.FULL,
+            score_type: specs.PredictionScoreTypes = None,
             user: User = Depends(current_active_user)):
     """
         Делает предсказание на модели.
@@ -180,15 +278,52 @@ def predict_on_model(dataframe_id: PydanticObjectId,
         - **model_id**: ID модели
         - **apply_pipeline**: применять ли пайплайн с выборки, на которой
         училась модель
+        - **prediction_output**: сохранять признаки вместе с предсказаниями
+        (full) или только предсказания (и вероятности) со столбцом
+        row_index - индексом строки исходного датафрейма; признаки при
+        чтении не присоединяются, клиент соединяет их сам по row_index
+        - **score_type**: дополнительно сохранить оценки модели
+        (predict_proba или decision_function) в компактный npz-файл
+        float32, доступный через /dataframe/download_scores
 
         Если данные в сыром виде, можно скопировать пайплайн с
         оригинальной выборки перед предсказанием.
         Если данные уже предобработаны, можно поставить параметр = False.
     """
-    return ModelFitPredictAsyncService(user.id).process_prediction(
+    return await heavy_executor.run(
+        user.id, ModelFitPredictAsyncService(user.id).process_prediction,
         dataframe_id=dataframe_id,
         model_id=model_id,
         prediction_name=prediction_name,
+        apply_pipeline=apply_pipeline,
+        prediction_output=prediction_output,
+        score_type=score_type)
+
+
+@models_processing_router.post(
+    "/predict_online", response_model=schemas.OnlinePredictionResults)
+async def predict_online(model_id: PydanticObjectId,
+                         rows: List[Dict[str, Any]],
+                         apply_pipeline: bool = True,
+                         user: User = Depends(current_active_user)):
+    """
+        Синхронное предсказание для строк из тела запроса: без загрузки
+        датафрейма, фоновой задачи и сохранения результатов.
+
+        - **model_id**: ID модели
+        - **rows**: строки в виде списка словарей {столбец: значение}
+        - **apply_pipeline**: применять ли к строкам пайплайн с выборки,
+        на которой училась модель. Пайплайн с методами, считаемыми по всему
+        датафрейму (заполнение пропусков средним, медианой, модой, соседними
+        значениями, интерполяцией или импьютерами), к строкам не применяется
+
+        Возвращает индексы строк запроса и предсказания для них.
+    """
+    return await heavy_executor.run_in_group(
+        ONLINE_PREDICTIONS_GROUP, user.id,
+        ModelFitPredictService(user.id).predict_online,
+        model_id=model_id,
+        rows=pd.DataFrame.from_records(rows),
         apply_pipeline=apply_pipeline)
 
 
@@ -228,6 +363,16 @@ def get_available_model_types(task_type: specs.AvailableTaskTypes):
         return [model.value for model in specs.dimensionality_reduction_models]
 
 
+@models_specs_router.get("/model_types/updatable")
+def get_updatable_model_types():
+    return [model.value for model in specs.updatable_models]
+
+
+@models_specs_router.get("/model_types/out_of_core")
+def get_out_of_core_model_types():
+    return [model.value for model in specs.out_of_core_models]
+
+
 @models_specs_router.get("/composition_types")
 def get_available_composition_types():
     return [composition.value for composition in specs.AvailableCompositionTypes]
@@ -251,6 +396,8 @@ def get_parameters_for_model_type(model_type: specs.AvailableModelTypes):
         return classification_models_params.ExtraTreesClassifierParams.schema()
     elif model_type == specs.AvailableModelTypes.GRADIENT_BOOSTING_CLASSIFIER:
         return classification_models_params.GradientBoostingClassifierParams.schema()
+    elif model_type == specs.AvailableModelTypes.HIST_GRADIENT_BOOSTING_CLASSIFIER:
+        return classification_models_params.HistGradientBoostingClassifierParams.schema()
     elif model_type == specs.AvailableModelTypes.ADABOOST_CLASSIFIER:
         return classification_models_params.AdaBoostClassifierParams.schema()
     elif model_type == specs.AvailableModelTypes.BAGGING_CLASSIFIER:
@@ -287,6 +434,8 @@ def get_parameters_for_model_type(model_type: specs.AvailableModelTypes):
         return regression_models_params.ExtraTreesRegressorParams.schema()
     elif model_type == specs.AvailableModelTypes.GRADIENT_BOOSTING_REGRESSOR:
         return regression_models_params.GradientBoostingRegressorParams.schema()
+    elif model_type == specs.AvailableModelTypes.HIST_GRADIENT_BOOSTING_REGRESSOR:
+        return regression_models_params.HistGradientBoostingRegressorParams.schema()
     elif model_type == specs.AvailableModelTypes.ADABOOST_REGRESSOR:
         return regression_models_params.AdaBoostRegressorParams.schema()
     elif model_type == specs.AvailableModelTypes.BAGGING_REGRESSOR:
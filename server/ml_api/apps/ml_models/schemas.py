@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Tuple, Union
 
-from pydantic import BaseModel
+from bunnet import PydanticObjectId
+from pydantic import BaseModel, Field
 
 from ml_api.apps.ml_models import specs
 from ml_api.apps.training_reports.model import Report
@@ -11,6 +12,26 @@ class ModelParams(BaseModel):
     params: Dict[str, Any]
 
 
+class ModelSummary(BaseModel):
+    """Поля метаданных для списков (проекция без параметров и отчетов)."""
+    id: PydanticObjectId = Field(alias='_id')
+    filename: str
+    dataframe_id: PydanticObjectId
+    is_composition: bool = False
+    task_type: specs.AvailableTaskTypes
+    status: specs.ModelStatuses
+    created_at: str
+
+    class Config:
+        allow_population_by_field_name = True
+
+
 class ModelTrainingResults(BaseModel):
     model: Any = None
     results: List[Tuple[Report, Any]] = []
+
+
+class OnlinePredictionResults(BaseModel):
+    # индексы строк запроса (строки могут быть удалены пайплайном)
+    index: List[int]
+    predictions: List[Any]
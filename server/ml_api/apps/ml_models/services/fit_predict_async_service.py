@@ -1,3 +1,5 @@
+from typing import Optional
+
 from bunnet import PydanticObjectId
 
 from ml_api import config
@@ -39,9 +41,11 @@ class ModelFitPredictAsyncService:
 
     def process_model_training(self, model_meta: ModelMetadata):
         self._set_status(model_meta, specs.ModelStatuses.WAITING)
-        validated_params = self._prepare_params(model_meta)
-        model_meta = self.repository.set_model_params(
-            model_meta.id, validated_params)
+        # подбор параметров выполняется при обучении, а не в запросе
+        if model_meta.params_type not in specs.searching_params_types:
+            validated_params = self._prepare_params(model_meta)
+            model_meta = self.repository.set_model_params(
+                model_meta.id, validated_params)
         if config.USE_CELERY:
             return ModelJobsManager(self._user_id).process_train_model_async(
                 model_meta)
@@ -65,14 +69,36 @@ class ModelFitPredictAsyncService:
                            dataframe_id: PydanticObjectId,
                            model_id: PydanticObjectId,
                            prediction_name: str,
-                           apply_pipeline: bool):
+                           apply_pipeline: bool,
+                           prediction_output: specs.PredictionOutputModes =
+                           specs.PredictionOutputModes.FULL,
+                           score_type: Optional[
+                               specs.PredictionScoreTypes] = None):
 
         self.dataframe_service.check_prediction_filename(prediction_name)
         self.dataframe_service.check_dataframe_not_prediction(dataframe_id)
         self.repository.get_model_meta(model_id)
         if config.USE_CELERY:
             return ModelJobsManager(self._user_id).predict_on_model_async(
-                dataframe_id, model_id, prediction_name, apply_pipeline)
+                dataframe_id, model_id, prediction_name, apply_pipeline,
+                prediction_output, score_type)
         else:
             return self.fit_predict_service.predict_on_model(
-                dataframe_id, model_id, prediction_name, apply_pipeline)
+                dataframe_id, model_id, prediction_name, apply_pipeline,
+                prediction_output, score_type)
+
+    def process_model_update(self,
+                             model_id: PydanticObjectId,
+                             dataframe_id: Optional[PydanticObjectId],
+                             n_iterations: Optional[int]):
+        model_meta = self.repository.get_model_meta(model_id)
+        if dataframe_id is None:
+            dataframe_id = model_meta.dataframe_id
+        self.fit_predict_service.check_update_params(model_meta, dataframe_id)
+        self._set_status(model_meta, specs.ModelStatuses.WAITING)
+        if config.USE_CELERY:
+            return ModelJobsManager(self._user_id).update_model_async(
+                model_id, dataframe_id, n_iterations)
+        else:
+            return self.fit_predict_service.update_model(
+                model_id, dataframe_id, n_iterations)
@@ -1,9 +1,13 @@
 import traceback
 import functools
-from typing import List, Tuple, Any
+import logging
+from datetime import datetime
+from typing import Iterator, List, Tuple, Any, Optional
 
+import pandas as pd
 from bunnet import PydanticObjectId
 
+from ml_api import config
 from ml_api.apps.ml_models import specs, errors, schemas
 from ml_api.apps.ml_models.model import ModelMetadata
 from ml_api.apps.ml_models.services.processors.composition_trainer import \
@@ -11,8 +15,18 @@ from ml_api.apps.ml_models.services.processors.composition_trainer import \
 from ml_api.apps.ml_models.services.processors.model_construstor import \
     ModelConstructorService
 from ml_api.apps.ml_models.services.processors.model_trainer import ModelTrainerService
+from ml_api.apps.ml_models.services.processors.model_updater import \
+    ModelUpdaterService
+from ml_api.apps.ml_models.services.processors.out_of_core_trainer import \
+    OutOfCoreTrainerService
+from ml_api.apps.ml_models.services.processors.oof_predictor import \
+    OutOfFoldPredictionsService
 from ml_api.apps.ml_models.services.processors.model_predictor import \
     ModelPredictorService
+from ml_api.apps.ml_models.services.processors.batch_predictor import \
+    BatchPredictorService
+from ml_api.apps.ml_models.services.processors.onnx_converter import \
+    OnnxConverterService
 from ml_api.apps.ml_models.services.processors.params_validator import \
     ParamsValidationService
 from ml_api.apps.ml_models.services.processors.composition_validator import \
@@ -25,6 +39,8 @@ from ml_api.apps.ml_models.repositories.repository_manager import \
 from ml_api.apps.training_reports.services import ReportCreatorService
 from ml_api.apps.dataframes.facade import DataframeServiceFacade
 
+logger = logging.getLogger(__name__)
+
 
 def handle_exceptions(method):
     @functools.wraps(method)
@@ -53,6 +69,9 @@ class ModelFitPredictService:
 
     def _process_error(self, model_meta, err):
         self._set_status(model_meta, specs.ModelStatuses.PROBLEM)
+        self._add_error_report(model_meta)
+
+    def _add_error_report(self, model_meta: ModelMetadata):
         error_description = traceback.format_exc()
         report = ReportCreatorService().get_error_report(model_meta.task_type,
                                                          error_description)
@@ -69,10 +88,19 @@ class ModelFitPredictService:
         model_meta = self.repository.get_model_meta(model_id)
         self._set_status(model_meta, specs.ModelStatuses.BUILDING)
         validated_params = self._prepare_params(model_meta)
-        model = self._prepare_model(model_meta, validated_params)
-        features, target = self._prepare_fit_data(model_meta)
-        self._set_status(model_meta, specs.ModelStatuses.TRAINING)
-        training_results = self._fit_model(model_meta, model, features, target)
+        if model_meta.params_type in specs.searching_params_types:
+            self.repository.set_model_params(model_meta.id, validated_params)
+        if model_meta.out_of_core:
+            model = self._prepare_model(model_meta, validated_params)
+            self._set_status(model_meta, specs.ModelStatuses.TRAINING)
+            training_results = self._fit_model_out_of_core(model_meta, model)
+        else:
+            features, target = self._prepare_fit_data(model_meta)
+            model = self._prepare_model(model_meta, validated_params,
+                                        n_rows=len(features))
+            self._set_status(model_meta, specs.ModelStatuses.TRAINING)
+            training_results = self._fit_model(model_meta, model, features,
+                                               target)
         self._save_training_results(model_meta, training_results)
         self._set_status(model_meta, specs.ModelStatuses.TRAINED)
         return self.repository.get_model_meta(model_meta.id)
@@ -81,9 +109,10 @@ class ModelFitPredictService:
         return ParamsValidationService(
             self._user_id, model_meta).validate_params()
 
-    def _prepare_model(self, model_meta: ModelMetadata, validated_params):
+    def _prepare_model(self, model_meta: ModelMetadata, validated_params,
+                       n_rows: Optional[int] = None):
         return ModelConstructorService().get_model(
-            model_meta.task_type, validated_params)
+            model_meta.task_type, validated_params, n_rows)
 
     def _prepare_fit_data(self, model_meta: ModelMetadata):
         if model_meta.task_type in [specs.AvailableTaskTypes.CLASSIFICATION,
@@ -99,19 +128,113 @@ class ModelFitPredictService:
         return ModelTrainerService(model_meta, model
                                          ).train_model(features, target)
 
+    def _fit_model_out_of_core(self, model_meta: ModelMetadata, model):
+        def get_chunks():
+            return self.dataframe_service.get_feature_target_chunks(
+                model_meta.dataframe_id, config.OUT_OF_CORE_CHUNK_SIZE)
+        return OutOfCoreTrainerService(model_meta, model
+                                       ).train_model(get_chunks)
+
+    def _export_onnx(self, model_meta: ModelMetadata, model):
+        onnx_model = None
+        if config.USE_ONNX:
+            onnx_model = OnnxConverterService(model_meta).convert(model)
+        self.repository.save_onnx_model(model_meta.id, onnx_model)
+
     def _save_training_results(self, model_meta: ModelMetadata,
-                                     results: schemas.ModelTrainingResults):
+                                     results: schemas.ModelTrainingResults,
+                                     dataframe_id: PydanticObjectId = None,
+                                     filename_suffix: str = '',
+                                     storage_mode: Optional[
+                                         specs.ModelStorageModes] = None):
         """Store trained model and related reports/predictions."""
-        self.repository.save_new_model(model_meta.id, results.model)
+        self.repository.save_new_model(model_meta.id, results.model,
+                                       storage_mode)
+        self._export_onnx(model_meta, results.model)
         for report, pred_df in results.results:
             self.model_service.add_report(model_meta.id,
+                                                dataframe_id or
                                                 model_meta.dataframe_id,
                                                 report)
             filename = f"{model_meta.filename}_predictions" \
-                       f"_{report.report_type.value}"
+                       f"_{report.report_type.value}{filename_suffix}"
             self.model_service.add_predictions(model_meta.id, pred_df,
                                                      filename)
 
+    def check_update_params(self, model_meta: ModelMetadata,
+                            dataframe_id: PydanticObjectId):
+        if model_meta.is_composition or \
+                model_meta.model_params.model_type not in \
+                specs.updatable_models:
+            raise errors.ModelUpdateNotSupportedError(
+                model_meta.model_params.model_type.value)
+        solver = model_meta.model_params.params.get('solver', 'adam')
+        if model_meta.model_params.model_type in specs.mlp_models and \
+                solver not in specs.mlp_partial_fit_solvers:
+            raise errors.ModelUpdateNotSupportedError(
+                model_meta.model_params.model_type.value,
+                f"Solver '{solver}' has no partial_fit.")
+        if model_meta.status != specs.ModelStatuses.TRAINED:
+            raise errors.ModelNotTrainedError(model_meta.id)
+        self.dataframe_service.check_dataframe_not_prediction(dataframe_id)
+        feature_columns, target_column = self.dataframe_service.\
+            get_feature_target_column_names(dataframe_id)
+        if sorted(feature_columns) != sorted(model_meta.feature_columns):
+            raise errors.FeaturesNotEqualError(
+                sorted(model_meta.feature_columns), sorted(feature_columns))
+        if model_meta.target_column is not None and \
+                target_column != model_meta.target_column:
+            raise errors.TargetNotEqualError(model_meta.target_column,
+                                             target_column)
+
+    def update_model(self, model_id: PydanticObjectId,
+                     dataframe_id: Optional[PydanticObjectId] = None,
+                     n_iterations: Optional[int] = None) -> ModelMetadata:
+        """
+        Дообучает сохраненную модель на новых данных (или дополнительными
+        итерациями на исходных) без обучения с нуля. Файл модели при ошибке
+        остается рабочим, поэтому модель возвращается в прежний статус,
+        а ошибка сохраняется отчетом.
+        """
+        model_meta = self.repository.get_model_meta(model_id)
+        try:
+            return self._update_model(model_meta, dataframe_id, n_iterations)
+        except Exception:
+            self._set_status(model_meta, model_meta.status)
+            self._add_error_report(model_meta)
+            raise
+
+    def _update_model(self, model_meta: ModelMetadata,
+                      dataframe_id: Optional[PydanticObjectId],
+                      n_iterations: Optional[int]) -> ModelMetadata:
+        dataframe_id = dataframe_id or model_meta.dataframe_id
+        # дообучение меняет модель на месте - берется копия с диска, а не из кэша
+        model = self.repository.load_model(
+            model_meta.id, model_meta.storage_mode, use_cache=False)
+        features, target = self._prepare_update_data(model_meta, dataframe_id)
+        self._set_status(model_meta, specs.ModelStatuses.TRAINING)
+        update_results = ModelUpdaterService(
+            model_meta, model, n_iterations).update_model(features, target)
+        self._save_training_results(
+            model_meta, update_results, dataframe_id,
+            filename_suffix=f"_update_{datetime.now():%Y%m%d%H%M%S}",
+            # дообученная модель сохраняется в выбранном для нее формате
+            storage_mode=model_meta.storage_mode)
+        self._set_status(model_meta, specs.ModelStatuses.TRAINED)
+        return self.repository.get_model_meta(model_meta.id)
+
+    def _prepare_update_data(self, model_meta: ModelMetadata,
+                             dataframe_id: PydanticObjectId):
+        if model_meta.task_type in [specs.AvailableTaskTypes.CLASSIFICATION,
+                                    specs.AvailableTaskTypes.REGRESSION]:
+            features, target = self.dataframe_service.\
+                get_feature_target_df_supervised(dataframe_id)
+        else:
+            features, target = self.dataframe_service.get_feature_target_df(
+                dataframe_id)
+        self._check_features_equality(features, model_meta.feature_columns)
+        return features[model_meta.feature_columns], target
+
     @handle_exceptions
     def train_composition(self, composition_id: PydanticObjectId
                           ) -> ModelMetadata:
@@ -120,10 +243,17 @@ class ModelFitPredictService:
         validated_params = self._prepare_composition_params(
             composition_meta)
         estimators = self._load_models(composition_meta)
-        composition = self._prepare_composition(
-            composition_meta, validated_params, estimators)
         features, target = self._prepare_fit_data(composition_meta)
         self._set_status(composition_meta, specs.ModelStatuses.TRAINING)
+        oof_predictions = None
+        if validated_params.params.get('prefit') and \
+                validated_params.model_type in specs.stacking_compositions:
+            oof_predictions = OutOfFoldPredictionsService(
+                self._user_id, composition_meta).get_oof_predictions(
+                composition_meta.composition_model_ids, estimators,
+                features, target)
+        composition = self._prepare_composition(
+            composition_meta, validated_params, estimators, oof_predictions)
         validation_results = self._validate_composition(
             composition_meta, composition, features, target)
         self._save_training_results(composition_meta, validation_results)
@@ -132,7 +262,7 @@ class ModelFitPredictService:
 
     def _load_single_model(self, model_id):
         model_meta = self.repository.get_model_meta(model_id)
-        model = self.repository.load_model(model_id)
+        model = self.repository.load_model(model_id, model_meta.storage_mode)
         model_name = f"{model_meta.model_params.model_type}_{model_meta.filename}"
         return model_name, model
 
@@ -153,8 +283,9 @@ class ModelFitPredictService:
             composition_meta).validate_params()
 
     def _prepare_composition(self, composition_meta: ModelMetadata,
-                                   validated_params, estimators):
-        return CompositionConstructorService().get_composition(
+                                   validated_params, estimators,
+                                   oof_predictions=None):
+        return CompositionConstructorService(oof_predictions).get_composition(
             composition_meta, validated_params, estimators)
 
     def _validate_composition(self, composition_meta: ModelMetadata,
@@ -166,15 +297,63 @@ class ModelFitPredictService:
     def predict_on_model(self, source_df_id: PydanticObjectId,
                                model_id: PydanticObjectId,
                                prediction_name: str,
-                               apply_pipeline: bool = True) -> ModelMetadata:
+                               apply_pipeline: bool = True,
+                               prediction_output: specs.PredictionOutputModes
+                               = specs.PredictionOutputModes.FULL,
+                               score_type: Optional[
+                                   specs.PredictionScoreTypes] = None
+                               ) -> ModelMetadata:
         model_meta = self.repository.get_model_meta(model_id)
-        model = self.repository.load_model(model_meta.id)
-        features = self._prepare_predict_data(
-            model_meta, source_df_id, apply_pipeline)
-        pred_df = self._perform_prediction(model_meta, model, features)
-        new_meta = self.model_service.add_predictions(
-            model_meta.id, pred_df, prediction_name)
-        return new_meta
+        model = self.repository.load_model(model_meta.id,
+                                           model_meta.storage_mode)
+        if apply_pipeline and not self.dataframe_service.\
+                can_copy_pipeline_by_chunks(model_meta.dataframe_id):
+            # пайплайн с методами по всем строкам применяется целиком
+            features = self._prepare_predict_data(
+                model_meta, source_df_id, apply_pipeline)
+            pred_df, scores = self._perform_prediction(
+                model_meta, model, features, prediction_output, score_type)
+            return self.model_service.add_predictions(
+                model_meta.id, pred_df, prediction_name, scores)
+        chunks = self._prepare_predict_chunks(model_meta, source_df_id,
+                                              apply_pipeline)
+        pred_chunks = BatchPredictorService(
+            model_meta, model, self._load_onnx_session(model_meta),
+            prediction_output, score_type
+        ).predict_chunks(chunks)
+        return self.model_service.add_predictions_chunks(
+            model_meta.id, pred_chunks, prediction_name,
+            with_scores=score_type is not None)
+
+    def predict_online(self, model_id: PydanticObjectId,
+                       rows: pd.DataFrame, apply_pipeline: bool = True
+                       ) -> schemas.OnlinePredictionResults:
+        """
+        Предсказания для строк из запроса без сохранения датафреймов:
+        пайплайн исходного датафрейма и модель (из кэша процесса)
+        применяются сразу.
+        """
+        if not 0 < len(rows) <= config.ONLINE_PREDICTION_MAX_ROWS:
+            raise errors.OnlinePredictionRowsError(
+                len(rows), config.ONLINE_PREDICTION_MAX_ROWS)
+        model_meta = self.repository.get_model_meta(model_id)
+        if model_meta.status != specs.ModelStatuses.TRAINED:
+            raise errors.ModelNotTrainedError(model_id)
+        if apply_pipeline:
+            rows = self.dataframe_service.apply_pipeline_to_rows(
+                model_meta.dataframe_id, rows)
+        self._check_features_equality(
+            rows.drop(columns=[model_meta.target_column], errors='ignore'),
+            model_meta.feature_columns)
+        features = rows[model_meta.feature_columns]
+        model = self.repository.load_model(model_meta.id,
+                                           model_meta.storage_mode)
+        predictions = ModelPredictorService(
+            model_meta, model, self._load_onnx_session(model_meta)
+        ).get_predictions(features, batched=True)
+        return schemas.OnlinePredictionResults(
+            index=features.index.tolist(),
+            predictions=predictions.tolist())
 
     def _check_features_equality(self, features, feature_columns):
         features_list_model = sorted(feature_columns)
@@ -196,7 +375,40 @@ class ModelFitPredictService:
         self._check_features_equality(features, model_meta.feature_columns)
         return features[model_meta.feature_columns]
 
-    def _perform_prediction(self, model_meta, model, features):
-        return ModelPredictorService(model_meta, model).predict(features)
+    def _prepare_predict_chunks(self, model_meta, dataframe_id,
+                                apply_pipeline) -> Iterator[pd.DataFrame]:
+        if apply_pipeline:
+            chunks = self.dataframe_service.copy_pipeline_for_prediction_chunks(
+                model_meta.dataframe_id, dataframe_id,
+                config.PREDICTION_CHUNK_SIZE)
+        else:
+            chunks = (features for features, _ in
+                      self.dataframe_service.get_feature_target_chunks(
+                          dataframe_id, config.PREDICTION_CHUNK_SIZE))
+        for features in chunks:
+            self._check_features_equality(features, model_meta.feature_columns)
+            yield features[model_meta.feature_columns]
+
+    def _load_onnx_session(self, model_meta: ModelMetadata):
+        if not (config.USE_ONNX and model_meta.onnx_exported):
+            return None
+        try:
+            return self.repository.load_onnx_session(model_meta.id)
+        except Exception:
+            # нет onnxruntime или файла - предсказания исходной моделью
+            logger.warning("ONNX session of model %s is not available, "
+                           "falling back to the original model",
+                           model_meta.id, exc_info=True)
+            return None
+
+    def _perform_prediction(self, model_meta, model, features,
+                            prediction_output=specs.PredictionOutputModes.FULL,
+                            score_type=None):
+        predictor = ModelPredictorService(
+            model_meta, model, self._load_onnx_session(model_meta),
+            prediction_output, score_type)
+        if score_type is None:
+            return predictor.predict(features), None
+        return predictor.predict_with_scores(features)
 
 
@@ -1,10 +1,13 @@
+from typing import Optional
+
 from bunnet import PydanticObjectId
 from fastapi.responses import JSONResponse
 
+from ml_api.apps.ml_models import specs
 from ml_api.apps.ml_models.model import ModelMetadata
 from ml_api.common.jobs_manager.base import JobsManager
 from ml_api.common.celery_tasks.celery_tasks import process_model_training, \
-    process_composition_training, process_prediction
+    process_composition_training, process_prediction, process_model_update
 
 
 class ModelJobsManager(JobsManager):
@@ -17,6 +20,11 @@ class ModelJobsManager(JobsManager):
             "params_type": model_meta.params_type,
             "test_size": model_meta.test_size,
             "stratify": model_meta.stratify,
+            "cv_folds": model_meta.cv_folds,
+            "cv_refit": model_meta.cv_refit,
+            "train_scoring": model_meta.train_scoring,
+            "train_scoring_sample_size": model_meta.train_scoring_sample_size,
+            "out_of_core": model_meta.out_of_core,
         }
         job = self.job_service.create_train_model_job(
             model_meta.id, input_params)
@@ -33,6 +41,8 @@ class ModelJobsManager(JobsManager):
             "model_ids": composition_meta.composition_model_ids,
             "task_type": composition_meta.task_type,
             "composition_params": composition_meta.model_params,
+            "cv_folds": composition_meta.cv_folds,
+            "cv_refit": composition_meta.cv_refit,
         }
         job = self.job_service.create_train_model_job(
             composition_meta.id, input_params)
@@ -47,12 +57,17 @@ class ModelJobsManager(JobsManager):
                                dataframe_id: PydanticObjectId,
                                model_id: PydanticObjectId,
                                prediction_name: str,
-                               apply_pipeline: bool):
+                               apply_pipeline: bool,
+                               prediction_output: specs.PredictionOutputModes,
+                               score_type: Optional[
+                                   specs.PredictionScoreTypes]):
         input_params = {
             "dataframe_id": dataframe_id,
             "model_id": model_id,
             "prediction_name": prediction_name,
-            "apply_pipeline": apply_pipeline
+            "apply_pipeline": apply_pipeline,
+            "prediction_output": prediction_output.value,
+            "score_type": score_type.value if score_type else None
         }
         job = self.job_service.create_train_model_job(
             model_id, input_params)
@@ -62,3 +77,20 @@ class ModelJobsManager(JobsManager):
             content={
                 "message": "Задача принята и выполняется в фоновом режиме"}
         )
+
+    def update_model_async(self,
+                           model_id: PydanticObjectId,
+                           dataframe_id: PydanticObjectId,
+                           n_iterations: Optional[int]):
+        input_params = {
+            "dataframe_id": dataframe_id,
+            "n_iterations": n_iterations
+        }
+        job = self.job_service.create_update_model_job(
+            model_id, input_params)
+        process_model_update.delay(str(self._user_id), str(job.id))
+        return JSONResponse(
+            status_code=202,
+            content={
+                "message": "Задача принята и выполняется в фоновом режиме"}
+        )
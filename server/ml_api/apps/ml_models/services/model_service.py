@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 from bunnet import PydanticObjectId
 from pandas import DataFrame
@@ -46,6 +46,25 @@ class ModelService:
                 raise errors.DifferentTargetColumnsCompositionError(
                     meta.target_column, first_model_meta.target_column)
 
+    def _check_cv_folds(self, cv_folds: Optional[int]):
+        if cv_folds is not None and cv_folds < 2:
+            raise errors.WrongCVFoldsNumberError(cv_folds)
+
+    def _check_train_scoring_sample_size(self, sample_size: Optional[int]):
+        if sample_size is not None and sample_size < 1:
+            raise errors.WrongTrainScoringSampleSizeError(sample_size)
+
+    def _check_out_of_core(self, model_params: schemas.ModelParams,
+                           params_type: specs.AvailableParamsTypes,
+                           cv_folds: Optional[int]):
+        if model_params.model_type not in specs.out_of_core_models:
+            raise errors.OutOfCoreModelTypeError(model_params.model_type.value)
+        if params_type in specs.searching_params_types:
+            raise errors.OutOfCoreParamsConflictError(
+                f'params_type={params_type.value}')
+        if cv_folds is not None:
+            raise errors.OutOfCoreParamsConflictError('cv_folds')
+
     # 1: CREATE OPERATIONS ----------------------------------------------------
     def create_model(self,
                      model_name: str,
@@ -54,7 +73,16 @@ class ModelService:
                      model_params: schemas.ModelParams,
                      params_type: specs.AvailableParamsTypes,
                      test_size: float,
-                     stratify: bool) -> ModelMetadata:
+                     stratify: bool,
+                     cv_folds: Optional[int] = None,
+                     cv_refit: bool = True,
+                     train_scoring: specs.TrainScoringModes =
+                     specs.TrainScoringModes.FULL,
+                     train_scoring_sample_size: Optional[int] = None,
+                     out_of_core: bool = False,
+                     prediction_output: specs.PredictionOutputModes =
+                     specs.PredictionOutputModes.FULL
+                     ) -> ModelMetadata:
         from ml_api.apps.dataframes.facade import DataframeServiceFacade
 
         dataframe_service = DataframeServiceFacade(self._user_id)
@@ -66,6 +94,10 @@ class ModelService:
             if target_column is None:
                 raise errors.TargetNotFoundSupervisedLearningError(
                     dataframe_id=dataframe_id)
+        self._check_cv_folds(cv_folds)
+        self._check_train_scoring_sample_size(train_scoring_sample_size)
+        if out_of_core:
+            self._check_out_of_core(model_params, params_type, cv_folds)
 
         model_meta = self.repository.create_model(
             model_name=model_name,
@@ -77,12 +109,23 @@ class ModelService:
             feature_columns=feature_columns,
             target_column=target_column,
             test_size=test_size,
-            stratify=stratify)
+            stratify=stratify,
+            cv_folds=cv_folds,
+            cv_refit=cv_refit,
+            train_scoring=train_scoring,
+            train_scoring_sample_size=train_scoring_sample_size,
+            out_of_core=out_of_core,
+            prediction_output=prediction_output)
         return model_meta
 
     def create_composition(self, composition_name: str,
                            model_ids: List[PydanticObjectId],
-                           composition_params: schemas.ModelParams):
+                           composition_params: schemas.ModelParams,
+                           cv_folds: Optional[int] = None,
+                           cv_refit: bool = True,
+                           prediction_output: specs.PredictionOutputModes =
+                           specs.PredictionOutputModes.FULL):
+        self._check_cv_folds(cv_folds)
         model_metas = []
         for model_id in model_ids:
             model_metas.append(self.get_model_meta(model_id))
@@ -102,6 +145,9 @@ class ModelService:
             target_column=first_model_meta.target_column,
             test_size=first_model_meta.test_size,
             stratify=first_model_meta.stratify,
+            cv_folds=cv_folds,
+            cv_refit=cv_refit,
+            prediction_output=prediction_output,
             composition_model_ids=model_ids
         )
         return composition_meta
@@ -117,12 +163,30 @@ class ModelService:
 
     def add_predictions(self, model_id: PydanticObjectId,
                         pred_df: DataFrame,
-                        df_filename: str) -> ModelMetadata:
+                        df_filename: str,
+                        scores: Optional[DataFrame] = None) -> ModelMetadata:
         from ml_api.apps.dataframes.facade import DataframeServiceFacade
 
         dataframe_service = DataframeServiceFacade(self._user_id)
         pred_df_info = dataframe_service.save_predictions_dataframe(
             df_filename, pred_df)
+        if scores is not None:
+            dataframe_service.save_prediction_scores(pred_df_info.id, scores)
+        return self.repository.add_prediction(model_id, pred_df_info.id)
+
+    def add_predictions_chunks(self, model_id: PydanticObjectId,
+                               pred_chunks: Iterator,
+                               df_filename: str,
+                               with_scores: bool = False) -> ModelMetadata:
+        """
+        with_scores - части приходят парами (предсказания, оценки): оценки
+        каждой части дописываются в файл вместе с предсказаниями.
+        """
+        from ml_api.apps.dataframes.facade import DataframeServiceFacade
+
+        dataframe_service = DataframeServiceFacade(self._user_id)
+        pred_df_info = dataframe_service.save_predictions_dataframe_chunks(
+            df_filename, pred_chunks, with_scores)
         return self.repository.add_prediction(model_id, pred_df_info.id)
 
     # 2: GET OPERATIONS -------------------------------------------------------
@@ -132,8 +196,8 @@ class ModelService:
     def get_model_meta(self, model_id):
         return self.repository.get_model_meta(model_id)
 
-    def get_all_models_meta(self):
-        return self.repository.get_all_models_meta()
+    def get_all_models_summaries(self):
+        return self.repository.get_all_models_summaries()
 
     def get_all_models_meta_by_dataframe(self, dataframe_id):
         return self.repository.get_all_models_meta_by_dataframe(
@@ -144,6 +208,16 @@ class ModelService:
         self._check_filename_exists(new_model_name)
         return self.repository.set_filename(model_id, new_model_name)
 
+    def set_storage_mode(self, model_id: PydanticObjectId,
+                         storage_mode: specs.ModelStorageModes
+                         ) -> ModelMetadata:
+        model_meta = self.repository.get_model_meta(model_id)
+        if model_meta.status != specs.ModelStatuses.TRAINED:
+            raise errors.ModelNotTrainedError(model_id)
+        if model_meta.storage_mode == storage_mode:
+            return model_meta
+        return self.repository.change_storage_mode(model_id, storage_mode)
+
     # 4: DELETE OPERATIONS ----------------------------------------------------
     def delete_model(self, model_id: PydanticObjectId) -> ModelMetadata:
         from ml_api.apps.dataframes.facade import DataframeServiceFacade
@@ -156,3 +230,23 @@ class ModelService:
             self.report_crud.delete(report_id)
         model_meta = self.repository.delete_model(model_id)
         return model_meta
+
+    def delete_models_by_dataframes(self,
+                                    dataframe_ids: List[PydanticObjectId]
+                                    ) -> Tuple[List[PydanticObjectId],
+                                               List[PydanticObjectId]]:
+        """
+        Удаляет модели датафреймов вместе с отчетами пакетно и возвращает
+        ID удаленных моделей и ID их предсказаний - предсказания удаляет
+        вызывающий вместе с датафреймами, а задачи - по всем ID.
+        """
+        model_metas = self.repository.get_all_models_meta_by_dataframes(
+            dataframe_ids)
+        if not model_metas:
+            return [], []
+        model_ids = [model_meta.id for model_meta in model_metas]
+        self.report_crud.delete_by_model_ids(model_ids)
+        self.repository.delete_models(model_ids)
+        prediction_ids = [prediction_id for model_meta in model_metas
+                          for prediction_id in model_meta.model_prediction_ids]
+        return model_ids, prediction_ids
@@ -0,0 +1,59 @@
+from typing import Iterator, Optional, Tuple, Union
+
+import pandas as pd
+from joblib import Parallel, delayed
+
+from ml_api import config
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.specs import PredictionOutputModes, \
+    PredictionScoreTypes
+from ml_api.apps.ml_models.services.processors.model_predictor import \
+    ModelPredictorService
+
+
+PredictionChunk = Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]
+
+
+def _predict_chunk(predictor: ModelPredictorService,
+                   features: pd.DataFrame) -> PredictionChunk:
+    if predictor.score_type is not None:
+        return predictor.predict_with_scores(features)
+    return predictor.predict(features)
+
+
+class BatchPredictorService:
+    """
+    Предсказывает датафрейм по частям: части обрабатываются параллельно
+    в процессах, результаты возвращаются по порядку и сразу записываются,
+    поэтому в памяти одновременно находится лишь несколько частей.
+    Массивы модели передаются процессам через общий memmap-файл joblib,
+    а не копируются в каждую задачу. Если заданы оценки (score_type),
+    для каждой части возвращается пара (предсказания, оценки).
+    """
+    def __init__(self, model_meta: ModelMetadata, model, onnx_session=None,
+                 output_mode: PredictionOutputModes =
+                 PredictionOutputModes.FULL,
+                 score_type: Optional[PredictionScoreTypes] = None):
+        self.model_meta = model_meta
+        self.model = model
+        self.onnx_session = onnx_session
+        self.output_mode = output_mode
+        self.score_type = score_type
+        self.n_jobs = config.PREDICTION_N_JOBS
+
+    def predict_chunks(self, chunks: Iterator[pd.DataFrame]
+                       ) -> Iterator[PredictionChunk]:
+        if self.n_jobs == 1:
+            predictor = ModelPredictorService(
+                self.model_meta, self.model, self.onnx_session,
+                self.output_mode, self.score_type)
+            return (_predict_chunk(predictor, features) for features in chunks)
+        # сессия ONNX Runtime не передается в процессы - в них предсказывает
+        # исходная модель
+        predictor = ModelPredictorService(
+            self.model_meta, self.model, output_mode=self.output_mode,
+            score_type=self.score_type)
+        return Parallel(n_jobs=self.n_jobs, max_nbytes='1M',
+                        return_as='generator')(
+            delayed(_predict_chunk)(predictor, features)
+            for features in chunks)
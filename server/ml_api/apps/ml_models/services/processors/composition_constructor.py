@@ -1,16 +1,24 @@
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+import pandas as pd
 from sklearn import ensemble, linear_model
 
 from ml_api.apps.ml_models import schemas, errors
 from ml_api.apps.ml_models.model import ModelMetadata
 from ml_api.apps.ml_models.specs import AvailableCompositionTypes as Compositions
 from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
+from ml_api.apps.ml_models.services.processors import prefit_compositions
 
 
 class CompositionConstructorService:
-    def __init__(self):
+    """
+    Строит композицию из базовых моделей. При prefit=True базовые модели
+    не переобучаются: голосование использует их как есть, а мета-модель
+    стекинга обучается на заранее посчитанных out-of-fold предсказаниях.
+    """
+    def __init__(self, oof_predictions: Optional[pd.DataFrame] = None):
+        self.oof_predictions = oof_predictions
 
         self._classification_composition_map = {
             Compositions.VOTING_CLASSIFIER: self._get_voting_classifier,
@@ -56,20 +64,30 @@ class CompositionConstructorService:
         return composition
 
     def _get_voting_classifier(self, composition_params: Dict[str, Any], models):
+        if composition_params.get('prefit'):
+            return prefit_compositions.PrefitVotingClassifier(
+                estimators=prefit_compositions.FittedEstimators(models),
+                voting=composition_params['voting'])
         if composition_params['voting'] == 'hard':
             return ensemble.VotingClassifier(estimators=models, voting='hard')
         elif composition_params['voting'] == 'soft':
             return ensemble.VotingClassifier(estimators=models, voting='soft')
 
     def _get_voting_regressor(self, composition_params: Dict[str, Any], models):
-        if composition_params['voting'] == 'hard':
-            return ensemble.VotingRegressor(estimators=models, voting='hard')
-        elif composition_params['voting'] == 'soft':
-            return ensemble.VotingRegressor(estimators=models, voting='soft')
+        # VotingRegressor всегда усредняет предсказания, параметра voting нет
+        if composition_params.get('prefit'):
+            return prefit_compositions.PrefitVotingRegressor(
+                estimators=prefit_compositions.FittedEstimators(models))
+        return ensemble.VotingRegressor(estimators=models)
 
     def _get_stacking_classifier(self, composition_params: Dict[str, Any], estimators):
         final_estimator = self._get_final_classification_estimator(
             composition_params['final_estimator'])
+        if composition_params.get('prefit'):
+            return prefit_compositions.PrefitStackingClassifier(
+                estimators=prefit_compositions.FittedEstimators(estimators),
+                final_estimator=final_estimator,
+                oof_predictions=self.oof_predictions)
         return ensemble.StackingClassifier(
             estimators=estimators,
             final_estimator=final_estimator)
@@ -77,6 +95,11 @@ class CompositionConstructorService:
     def _get_stacking_regressor(self, composition_params: Dict[str, Any], estimators):
         final_estimator = self._get_final_regression_estimator(
             composition_params['final_estimator'])
+        if composition_params.get('prefit'):
+            return prefit_compositions.PrefitStackingRegressor(
+                estimators=prefit_compositions.FittedEstimators(estimators),
+                final_estimator=final_estimator,
+                oof_predictions=self.oof_predictions)
         return ensemble.StackingRegressor(
             estimators=estimators,
             final_estimator=final_estimator)
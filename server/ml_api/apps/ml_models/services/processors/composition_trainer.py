@@ -1,5 +1,6 @@
 import traceback
 
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
@@ -7,12 +8,15 @@ from ml_api.apps.ml_models import errors, utils, specs
 from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
 from ml_api.apps.ml_models.model import ModelMetadata
 from ml_api.apps.ml_models.schemas import ModelTrainingResults
+from ml_api.apps.ml_models.services.processors.cross_validator import \
+    CrossValidationService
 from ml_api.apps.training_reports.services import ReportCreatorService
 
 
 class CompositionValidationService:
     def __init__(self, composition_meta: ModelMetadata, composition):
         self.composition = composition
+        self.composition_meta = composition_meta
         self.task_type = composition_meta.task_type
         self.composition_type = composition_meta.model_params.model_type
         self.model_id = composition_meta.id
@@ -21,6 +25,8 @@ class CompositionValidationService:
         self.target_column = composition_meta.target_column
         self.stratify = composition_meta.stratify
         self.test_size = composition_meta.test_size
+        self.cv_folds = composition_meta.cv_folds
+        self.prediction_output = composition_meta.prediction_output
 
         self.report_creator = ReportCreatorService()
         self.classes_limit = 10
@@ -34,19 +40,6 @@ class CompositionValidationService:
         return train_test_split(features, target, test_size=self.test_size,
                                 stratify=stratify)
 
-    def _get_probabilities(self, f_valid):
-        try:
-            probabilities = self.composition.predict_proba(f_valid)
-            if probabilities.shape[1] == 2:  # Бинарная классификация
-                return probabilities[:, 1]
-            else:  # Многоклассовая классификация
-                return probabilities
-        except AttributeError:
-            try:
-                return self.composition.decision_function(f_valid)
-            except AttributeError:
-                return None
-
     def validate_composition(self, composition_meta, features, target) -> ModelTrainingResults:
         if self.task_type not in self._task_to_method_map.keys():
             raise errors.UnknownTaskTypeError(self.task_type.value)
@@ -58,6 +51,11 @@ class CompositionValidationService:
             error_type = type(err).__name__
             error_description = str(err)
             raise errors.CompositionValidationError(f"{error_type}: {error_description}")
+        if self.composition_meta.model_params.params.get('prefit'):
+            # обученные базовые модели видели строки валидационной выборки
+            # композиции, их разбиения не сохраняются
+            for report, _ in composition_validation_result.results:
+                report.optimistic_bias = True
         return composition_validation_result
 
     def _process_classification(self, features, target) -> ModelTrainingResults:
@@ -68,20 +66,25 @@ class CompositionValidationService:
             raise errors.TooManyClassesClassificationError(
                 num_classes, self.dataframe_id)
 
+        if self.cv_folds is not None:
+            return CrossValidationService(
+                self.composition_meta, self.composition
+            ).cross_validate(features, target)
+
         # can be joined with ModelTrainer
         f_train, f_valid, t_train, t_valid = self._get_train_test_split(
                 features, target)
         self.composition.fit(f_train, t_train)
 
-        preds = pd.Series(self.composition.predict(f_valid),
-                          name=self.target_column)
-        probs = self._get_probabilities(f_valid)
-        results_df = utils.get_predictions_df(f_valid, preds)
+        preds, probs = utils.predict_with_scores(self.composition, f_valid)
+        preds = pd.Series(preds, name=self.target_column)
+        classes = list(np.sort(target.unique()))
+        results_df = utils.get_predictions_df(
+            f_valid, preds, self.prediction_output, probs, classes)
         if num_classes == 2:
             report = self.report_creator.score_binary_classification(
                 t_valid, preds, probs)
         else:
-            classes = list(target.unique())
             report = self.report_creator.score_multiclass_classification(
                 classes, t_valid, preds, probs)
         return ModelTrainingResults(
@@ -90,13 +93,19 @@ class CompositionValidationService:
         )
 
     def _process_regression(self, features, target) -> ModelTrainingResults:
+        if self.cv_folds is not None:
+            return CrossValidationService(
+                self.composition_meta, self.composition
+            ).cross_validate(features, target)
+
         f_train, f_valid, t_train, t_valid = self._get_train_test_split(
             features, target)
         self.composition.fit(f_train, t_train)
 
         preds = pd.Series(self.composition.predict(f_valid),
                           name=self.target_column)
-        results_df = utils.get_predictions_df(f_valid, preds)
+        results_df = utils.get_predictions_df(f_valid, preds,
+                                              self.prediction_output)
         report = self.report_creator.score_regression(t_valid, preds)
         return ModelTrainingResults(
             model=self.composition,
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import KFold, StratifiedKFold
+
+from ml_api import config
+from ml_api.apps.ml_models import utils
+from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes, \
+    PredictionOutputModes
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.schemas import ModelTrainingResults
+from ml_api.apps.training_reports.services import ReportCreatorService
+
+
+def _fit_fold(model, f_train, t_train, f_valid):
+    model.fit(f_train, t_train)
+    if is_classifier(model):
+        return (model, *utils.predict_with_scores(model, f_valid))
+    return model, model.predict(f_valid), None
+
+
+class CrossValidationService:
+    """
+    Обучает модель k-fold кросс-валидацией: фолды обучаются параллельно,
+    метрики фолдов агрегируются в один отчет.
+    """
+    def __init__(self, model_meta: ModelMetadata, model):
+        self.model = model
+        self.task_type = model_meta.task_type
+        self.target_column = model_meta.target_column
+        self.stratify = model_meta.stratify
+        self.n_folds = model_meta.cv_folds
+        self.refit = model_meta.cv_refit
+        self.prediction_output = model_meta.prediction_output
+        self.n_jobs = config.CV_N_JOBS
+
+        self.report_creator = ReportCreatorService()
+
+    def _get_folds(self, features, target):
+        if self.stratify and self.task_type == TaskTypes.CLASSIFICATION:
+            splitter = StratifiedKFold(n_splits=self.n_folds, shuffle=True)
+        else:
+            splitter = KFold(n_splits=self.n_folds, shuffle=True)
+        return list(splitter.split(features, target))
+
+    def _clone_model(self):
+        model = clone(self.model)
+        if self.n_jobs != 1:
+            # фолды уже обучаются параллельно - бюджет потоков не умножаем
+            utils.set_n_jobs(model, 1)
+        return model
+
+    def _fit_folds(self, features, target, folds):
+        return Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_fold)(self._clone_model(),
+                               features.iloc[train_idx],
+                               target.iloc[train_idx],
+                               features.iloc[valid_idx])
+            for train_idx, valid_idx in folds)
+
+    @staticmethod
+    def _get_classes(model, target):
+        # порядок классов совпадает с порядком столбцов predict_proba модели;
+        # модель фолда могла не увидеть редкий класс
+        classes = getattr(model, 'classes_', None)
+        if classes is None:
+            return list(np.sort(target.unique()))
+        return list(classes)
+
+    def _score_fold(self, model, target, t_valid, preds, probs):
+        preds = pd.Series(preds, name=self.target_column)
+        if self.task_type == TaskTypes.REGRESSION:
+            return self.report_creator.score_regression(t_valid, preds)
+        if target.nunique() == 2:
+            return self.report_creator.score_binary_classification(
+                t_valid, preds, probs)
+        classes = self._get_classes(model, target)
+        # ROC-кривые строятся, если каждый класс модели есть в валидации;
+        # для двух классов label_binarize дает один столбец вместо двух
+        if len(classes) < 3 or not set(classes) <= set(t_valid.unique()):
+            probs = None
+        return self.report_creator.score_multiclass_classification(
+            classes, t_valid, preds, probs)
+
+    def _get_final_model(self, features, target, fold_models, fold_reports):
+        if self.refit:
+            return self.model.fit(features, target)
+        # без дообучения сохраняется лучшая модель среди фолдов
+        if self.task_type == TaskTypes.REGRESSION:
+            losses = [report.body['mse'] for report in fold_reports]
+        else:
+            losses = [-report.body['accuracy'] for report in fold_reports]
+        return fold_models[int(np.argmin(losses))]
+
+    def _get_oof_probabilities(self, n_rows, folds, fold_results):
+        if (self.prediction_output !=
+                PredictionOutputModes.PREDICTIONS_WITH_PROBABILITIES):
+            return None
+        fold_probs = [probs for _, _, probs in fold_results]
+        # фолд без какого-то класса дает другие столбцы
+        fold_classes = {tuple(getattr(model, 'classes_', ()))
+                        for model, _, _ in fold_results}
+        if (any(probs is None for probs in fold_probs) or
+                len(fold_classes) != 1 or
+                len({probs.shape[1:] for probs in fold_probs}) != 1):
+            return None
+        oof_probs = np.empty((n_rows, *fold_probs[0].shape[1:]))
+        for (_, valid_idx), probs in zip(folds, fold_probs):
+            oof_probs[valid_idx] = probs
+        return oof_probs
+
+    def cross_validate(self, features, target) -> ModelTrainingResults:
+        folds = self._get_folds(features, target)
+        fold_results = self._fit_folds(features, target, folds)
+
+        fold_models, fold_reports = [], []
+        oof_preds = np.empty(len(features), dtype=fold_results[0][1].dtype)
+        for (_, valid_idx), (model, preds, probs) in zip(folds, fold_results):
+            fold_models.append(model)
+            fold_reports.append(self._score_fold(
+                model, target, target.iloc[valid_idx], preds, probs))
+            oof_preds[valid_idx] = preds
+
+        report = self.report_creator.aggregate_cross_validation(
+            self.task_type, fold_reports)
+        classes = (self._get_classes(fold_models[0], target)
+                   if self.task_type == TaskTypes.CLASSIFICATION else None)
+        results_df = utils.get_predictions_df(
+            features, pd.Series(oof_preds, name=self.target_column),
+            self.prediction_output,
+            self._get_oof_probabilities(len(features), folds, fold_results),
+            classes)
+        return ModelTrainingResults(
+            model=self._get_final_model(features, target, fold_models,
+                                        fold_reports),
+            results=[(report, results_df)],
+        )
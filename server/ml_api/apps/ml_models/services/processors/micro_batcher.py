@@ -0,0 +1,124 @@
+import queue
+import time
+from concurrent.futures import Future, TimeoutError
+from threading import Lock, Thread
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ml_api import config
+
+PredictFunction = Callable[[pd.DataFrame], np.ndarray]
+BatchItem = Tuple[PredictFunction, pd.DataFrame, Future]
+
+
+class PredictionMicroBatcher:
+    """
+    Объединяет одновременные онлайн-запросы к одной модели в один вызов
+    predict. Запросы ставятся в очередь по ключу модели; поток очереди
+    собирает пакет до max_rows строк или до истечения max_wait секунд
+    с первого запроса, предсказывает пакет целиком и раздает результаты.
+    Поток завершается, если запросов нет дольше idle_timeout секунд.
+    Результат ожидается не дольше result_timeout секунд.
+    """
+    def __init__(self, max_rows: int, max_wait: float,
+                 idle_timeout: float = 1.0, result_timeout: float = 60.0):
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.idle_timeout = idle_timeout
+        self.result_timeout = result_timeout
+        self._queues: Dict[Hashable, queue.SimpleQueue] = {}
+        self._lock = Lock()
+
+    def predict(self, key: Hashable, predict: PredictFunction,
+                features: pd.DataFrame) -> np.ndarray:
+        future = Future()
+        with self._lock:
+            batch_queue = self._queues.get(key)
+            if batch_queue is None:
+                batch_queue = self._queues[key] = queue.SimpleQueue()
+                Thread(target=self._run, args=(key, batch_queue),
+                       daemon=True).start()
+            batch_queue.put((predict, features, future))
+        try:
+            return future.result(timeout=self.result_timeout)
+        except TimeoutError:
+            # пакет с отмененным запросом его не предсказывает
+            future.cancel()
+            raise
+
+    def _run(self, key: Hashable, batch_queue: queue.SimpleQueue):
+        try:
+            while True:
+                try:
+                    first_item = batch_queue.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    with self._lock:
+                        # новые запросы ставятся под той же блокировкой
+                        if batch_queue.empty():
+                            del self._queues[key]
+                            return
+                    continue
+                self._process(self._collect_batch(first_item, batch_queue))
+        finally:
+            with self._lock:
+                # поток завершился с ошибкой: следующий запрос запустит
+                # новый, оставшимся в очереди запросам сообщается об ошибке
+                if self._queues.get(key) is batch_queue:
+                    del self._queues[key]
+                    while not batch_queue.empty():
+                        _, _, future = batch_queue.get_nowait()
+                        if future.set_running_or_notify_cancel():
+                            future.set_exception(RuntimeError(
+                                "Prediction micro-batcher stopped"))
+
+    def _collect_batch(self, first_item: BatchItem,
+                       batch_queue: queue.SimpleQueue) -> List[BatchItem]:
+        batch = [first_item]
+        n_rows = len(first_item[1])
+        deadline = time.monotonic() + self.max_wait
+        while n_rows < self.max_rows:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = batch_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item[1])
+        return batch
+
+    @staticmethod
+    def _process(batch: List[BatchItem]):
+        # запросы, отмененные по истечении ожидания, не предсказываются
+        batch = [item for item in batch
+                 if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        predict = batch[0][0]
+        try:
+            features = pd.concat([item[1] for item in batch],
+                                 ignore_index=True)
+            predictions = np.asarray(predict(features))
+            if len(predictions) != len(features):
+                raise ValueError("Predictions count does not match rows")
+        except Exception:
+            # ошибка одного запроса не должна затрагивать остальные -
+            # запросы пакета предсказываются по отдельности
+            for predict, features, future in batch:
+                try:
+                    future.set_result(predict(features))
+                except Exception as err:
+                    future.set_exception(err)
+            return
+        start = 0
+        for _, features, future in batch:
+            future.set_result(predictions[start:start + len(features)])
+            start += len(features)
+
+
+micro_batcher = PredictionMicroBatcher(
+    config.MICRO_BATCH_MAX_ROWS, config.MICRO_BATCH_MAX_WAIT_MS / 1000,
+    result_timeout=config.MICRO_BATCH_RESULT_TIMEOUT_S)
@@ -1,5 +1,5 @@
 import traceback
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Optional
 
 from sklearn import ensemble, linear_model, svm, neighbors, neural_network, \
     tree, cluster, mixture, decomposition, discriminant_analysis, manifold, covariance
@@ -7,7 +7,8 @@ from xgboost import XGBClassifier, XGBRegressor
 from lightgbm import LGBMClassifier, LGBMRegressor
 from catboost import CatBoostClassifier, CatBoostRegressor
 
-from ml_api.apps.ml_models import specs, schemas, errors
+from ml_api import config
+from ml_api.apps.ml_models import specs, schemas, errors, utils
 from ml_api.apps.ml_models.specs import AvailableModelTypes as Models
 from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
 
@@ -16,12 +17,14 @@ class ModelConstructorService:
     """
     Отвечает за сборку sklearn-модели с указанными параметрами.
     """
-    def __init__(self):
+    def __init__(self, n_jobs: Optional[int] = None):
+        self.n_jobs = n_jobs or config.JOB_N_JOBS
         self._classification_models_map: Dict[Models, Callable] = {
             Models.DECISION_TREE_CLASSIFIER: self._get_decision_tree_classifier,
             Models.RANDOM_FOREST_CLASSIFIER: self._get_random_forest_classifier,
             Models.EXTRA_TREES_CLASSIFIER: self._get_extra_trees_classifier,
             Models.GRADIENT_BOOSTING_CLASSIFIER: self._get_gradient_boosting_classifier,
+            Models.HIST_GRADIENT_BOOSTING_CLASSIFIER: self._get_hist_gradient_boosting_classifier,
             Models.ADABOOST_CLASSIFIER: self._get_adaboost_classifier,
             Models.BAGGING_CLASSIFIER: self._get_bagging_classifier,
             Models.XGB_CLASSIFIER: self._get_xgb_classifier,
@@ -41,6 +44,7 @@ class ModelConstructorService:
             Models.RANDOM_FOREST_REGRESSOR: self._get_random_forest_regressor,
             Models.EXTRA_TREES_REGRESSOR: self._get_extra_trees_regressor,
             Models.GRADIENT_BOOSTING_REGRESSOR: self._get_gradient_boosting_regressor,
+            Models.HIST_GRADIENT_BOOSTING_REGRESSOR: self._get_hist_gradient_boosting_regressor,
             Models.ADABOOST_REGRESSOR: self._get_adaboost_regressor,
             Models.BAGGING_REGRESSOR: self._get_bagging_regressor,
             Models.XGB_REGRESSOR: self._get_xgb_regressor,
@@ -89,6 +93,18 @@ class ModelConstructorService:
             Models.TRUNCATED_SVD: self._get_truncated_svd,
         }
 
+        # Быстрые настройки бинаризации признаков для больших выборок
+        self._large_data_params_map: Dict[Models, Dict[str, Any]] = {
+            Models.XGB_CLASSIFIER: {'tree_method': 'hist'},
+            Models.XGB_REGRESSOR: {'tree_method': 'hist'},
+            Models.LGBM_CLASSIFIER: {'max_bin': 63},
+            Models.LGBM_REGRESSOR: {'max_bin': 63},
+            Models.CATBOOST_CLASSIFIER: {'border_count': 32,
+                                         'boosting_type': 'Plain'},
+            Models.CATBOOST_REGRESSOR: {'border_count': 32,
+                                        'boosting_type': 'Plain'},
+        }
+
         self._task_to_models_map_map = {
             TaskTypes.CLASSIFICATION: self._classification_models_map,
             TaskTypes.REGRESSION: self._regression_models_map,
@@ -106,7 +122,8 @@ class ModelConstructorService:
         }
 
     def get_model(self, task_type: specs.AvailableTaskTypes,
-                  model_params: schemas.ModelParams):
+                  model_params: schemas.ModelParams,
+                  n_rows: Optional[int] = None):
         model_type = model_params.model_type
 
         if task_type not in self._task_to_models_map_map:
@@ -116,15 +133,32 @@ class ModelConstructorService:
         if model_type not in model_map:
             unknown_model_err = self._task_to_model_error_map[task_type]
             raise unknown_model_err(model_type)
+        params = model_params.params
+        if n_rows is not None and n_rows >= config.LARGE_DATA_ROWS_THRESHOLD:
+            params = self._get_large_data_params(model_type, params)
         try:
-            model = model_map[model_type](model_params.params)
+            model = model_map[model_type](params)
         except Exception as err:
             # print(traceback.format_exc())
             error_type = type(err).__name__
             error_description = str(err)
             raise errors.ModelConstructionError(f"{error_type}: {error_description}")
+        self._apply_thread_budget(model)
         return model
 
+    def _get_large_data_params(self, model_type: Models,
+                               model_params: Dict[str, Any]) -> Dict[str, Any]:
+        # явно заданные пользователем параметры не переопределяются
+        large_data_params = self._large_data_params_map.get(model_type, {})
+        return {**large_data_params, **model_params}
+
+    def _apply_thread_budget(self, model):
+        # -1/None и значения больше бюджета задачи приводят к переподписке
+        # ядер при параллельной работе нескольких задач
+        n_jobs = utils.get_n_jobs(model)
+        if n_jobs is None or n_jobs < 1 or n_jobs > self.n_jobs:
+            utils.set_n_jobs(model, self.n_jobs)
+
     def _get_decision_tree_classifier(self, model_params: Dict[str, Any]):
         return tree.DecisionTreeClassifier(**model_params)
 
@@ -137,6 +171,9 @@ class ModelConstructorService:
     def _get_gradient_boosting_classifier(self, model_params: Dict[str, Any]):
         return ensemble.GradientBoostingClassifier(**model_params)
 
+    def _get_hist_gradient_boosting_classifier(self, model_params: Dict[str, Any]):
+        return ensemble.HistGradientBoostingClassifier(**model_params)
+
     def _get_adaboost_classifier(self, model_params: Dict[str, Any]):
         return ensemble.AdaBoostClassifier(**model_params)
 
@@ -189,6 +226,9 @@ class ModelConstructorService:
     def _get_gradient_boosting_regressor(self, model_params: Dict[str, Any]):
         return ensemble.GradientBoostingRegressor(**model_params)
 
+    def _get_hist_gradient_boosting_regressor(self, model_params: Dict[str, Any]):
+        return ensemble.HistGradientBoostingRegressor(**model_params)
+
     def _get_adaboost_regressor(self, model_params: Dict[str, Any]):
         return ensemble.AdaBoostRegressor(**model_params)
 
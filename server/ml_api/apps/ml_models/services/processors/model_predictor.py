@@ -1,14 +1,29 @@
+import logging
 import traceback
+from typing import Optional, Tuple
 
 import pandas as pd
 
+from ml_api import config
 from ml_api.apps.ml_models.model import ModelMetadata
 from ml_api.apps.ml_models import utils, errors
+from ml_api.apps.ml_models.specs import PredictionOutputModes, \
+    PredictionScoreTypes
+from ml_api.apps.ml_models.services.processors.micro_batcher import \
+    micro_batcher
+
+logger = logging.getLogger(__name__)
 
 
 class ModelPredictorService:
-    def __init__(self, model_meta: ModelMetadata, model):
+    def __init__(self, model_meta: ModelMetadata, model, onnx_session=None,
+                 output_mode: PredictionOutputModes =
+                 PredictionOutputModes.FULL,
+                 score_type: Optional[PredictionScoreTypes] = None):
         self.model = model
+        self.onnx_session = onnx_session
+        self.output_mode = output_mode
+        self.score_type = score_type
         # self.task_type = model_meta.task_type
         self.model_id = model_meta.id
         self.dataframe_id = model_meta.dataframe_id
@@ -16,12 +31,86 @@ class ModelPredictorService:
         self.target_column = model_meta.target_column
 
     def predict(self, features: pd.DataFrame):
+        if self.output_mode == \
+                PredictionOutputModes.PREDICTIONS_WITH_PROBABILITIES:
+            return self._predict_with_probabilities(features)
+        predictions = self.get_predictions(features)
+        results_df = utils.get_predictions_df(features, predictions,
+                                              self.output_mode)
+        return results_df
+
+    def predict_with_scores(self, features: pd.DataFrame
+                            ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Предсказания и оценки модели (predict_proba или decision_function)
+        за один проход по выборке; оценки возвращаются отдельно во float32.
+        """
+        score_method = self.score_type.value
+        if not hasattr(self.model, score_method):
+            raise errors.ScoreMethodNotSupportedError(
+                type(self.model).__name__, score_method)
+        try:
+            values, scores = utils.predict_with_score_method(
+                self.model, features, score_method)
+        except Exception as err:
+            error_type = type(err).__name__
+            error_description = str(err)
+            raise errors.ModelPredictionError(f"{error_type}: {error_description}")
+        predictions = pd.Series(values, name=self.target_column)
+        classes = getattr(self.model, 'classes_', None)
+        score_name = 'score' if self.score_type == \
+            PredictionScoreTypes.DECISION_FUNCTION else 'probability'
+        results_df = utils.get_predictions_df(
+            features, predictions, self.output_mode,
+            utils.format_probabilities(scores), classes, score_name)
+        return results_df, utils.get_scores_df(features, scores, classes)
+
+    def _predict_with_probabilities(self, features: pd.DataFrame):
+        # вероятности считает исходная модель, ONNX-сессия не используется
         try:
-            predictions = pd.Series(self.model.predict(features), name=self.target_column)
+            values, probabilities = utils.predict_with_scores(self.model,
+                                                              features)
+        except Exception as err:
+            error_type = type(err).__name__
+            error_description = str(err)
+            raise errors.ModelPredictionError(f"{error_type}: {error_description}")
+        predictions = pd.Series(values, name=self.target_column)
+        return utils.get_predictions_df(
+            features, predictions, self.output_mode, probabilities,
+            getattr(self.model, 'classes_', None))
+
+    def get_predictions(self, features: pd.DataFrame,
+                        batched: bool = False) -> pd.Series:
+        """
+        batched - объединять с одновременными запросами к той же модели
+        в один вызов predict (онлайн-предсказания небольшого числа строк).
+        """
+        try:
+            if batched and config.MICRO_BATCH_MAX_WAIT_MS > 0:
+                # в пакет попадают только запросы к тому же объекту модели
+                batch_key = (str(self.model_id), id(self.model),
+                             id(self.onnx_session))
+                values = micro_batcher.predict(batch_key, self._predict,
+                                               features)
+            else:
+                values = self._predict(features)
+            predictions = pd.Series(values, name=self.target_column)
         except Exception as err:
             # print(traceback.format_exc())
             error_type = type(err).__name__
             error_description = str(err)
             raise errors.ModelPredictionError(f"{error_type}: {error_description}")
-        results_df = utils.get_predictions_df(features, predictions)
-        return results_df
+        return predictions
+
+    def _predict(self, features: pd.DataFrame):
+        if self.onnx_session is not None:
+            try:
+                return utils.run_onnx_predict(self.onnx_session,
+                                              features.to_numpy())
+            except Exception:
+                # ONNX Runtime не справился (например, нечисловые
+                # признаки) - предсказываем исходной моделью
+                logger.warning("ONNX prediction of model %s failed, "
+                               "falling back to the original model",
+                               self.model_id, exc_info=True)
+        return self.model.predict(features)
@@ -1,18 +1,24 @@
 import traceback
 
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+from ml_api import config
 from ml_api.apps.ml_models import errors, utils
-from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
+from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes, \
+    TrainScoringModes
 from ml_api.apps.ml_models.model import ModelMetadata
 from ml_api.apps.ml_models.schemas import ModelTrainingResults
+from ml_api.apps.ml_models.services.processors.cross_validator import \
+    CrossValidationService
 from ml_api.apps.training_reports.services import ReportCreatorService
 
 
 class ModelTrainerService:
     def __init__(self, model_meta: ModelMetadata, model):
         self.model = model
+        self.model_meta = model_meta
         self.task_type = model_meta.task_type
         self.model_id = model_meta.id
         self.dataframe_id = model_meta.dataframe_id
@@ -20,6 +26,12 @@ class ModelTrainerService:
         self.target_column = model_meta.target_column
         self.test_size = model_meta.test_size
         self.stratify = model_meta.stratify
+        self.cv_folds = model_meta.cv_folds
+        self.train_scoring = model_meta.train_scoring
+        self.train_scoring_sample_size = (
+            model_meta.train_scoring_sample_size
+            or config.TRAIN_SCORING_SAMPLE_SIZE)
+        self.prediction_output = model_meta.prediction_output
 
         self.report_creator = ReportCreatorService()
         self.classes_limit = 10
@@ -36,23 +48,26 @@ class ModelTrainerService:
         return train_test_split(features, target, test_size=self.test_size,
                                 stratify=stratify)
 
-    def _fit_and_predict(self, f_train, t_train, f_valid):
-        self.model.fit(f_train, t_train)
-        return pd.Series(self.model.predict(f_train), name=self.target_column), \
-               pd.Series(self.model.predict(f_valid), name=self.target_column)
-
-    def _get_probabilities(self, f_valid):
-        try:
-            probabilities = self.model.predict_proba(f_valid)
-            if probabilities.shape[1] == 2:  # Бинарная классификация
-                return probabilities[:, 1]
-            else:  # Многоклассовая классификация
-                return probabilities
-        except AttributeError:
-            try:
-                return self.model.decision_function(f_valid)
-            except AttributeError:
-                return None
+    def _fit(self, features, target=None):
+        if target is None:
+            self.model.fit(features)
+        else:
+            self.model.fit(features, target)
+
+    def _get_train_scoring_split(self, f_train, t_train):
+        """Часть обучающей выборки для оценки модели (None - не оценивать)."""
+        if self.train_scoring == TrainScoringModes.DISABLED:
+            return None
+        if (self.train_scoring == TrainScoringModes.SAMPLE
+                and len(f_train) > self.train_scoring_sample_size):
+            f_train = f_train.sample(n=self.train_scoring_sample_size)
+            t_train = t_train.loc[f_train.index]
+        return f_train, t_train
+
+    def _predict_with_scores(self, features):
+        predictions, probabilities = utils.predict_with_scores(
+            self.model, features)
+        return pd.Series(predictions, name=self.target_column), probabilities
 
     def train_model(self, features, target) -> ModelTrainingResults:
         if self.task_type not in self._task_to_method_map.keys():
@@ -75,57 +90,69 @@ class ModelTrainerService:
             raise errors.TooManyClassesClassificationError(
                 num_classes, self.dataframe_id)
 
+        if self.cv_folds is not None:
+            return CrossValidationService(
+                self.model_meta, self.model).cross_validate(features, target)
+
         f_train, f_valid, t_train, t_valid = self._get_train_test_split(
             features, target)
 
-        train_preds, valid_preds = self._fit_and_predict(f_train, t_train, f_valid)
-        train_probs = self._get_probabilities(f_train)
-        valid_probs = self._get_probabilities(f_valid)
-
-        train_results_df = utils.get_predictions_df(f_train, train_preds)
-        valid_results_df = utils.get_predictions_df(f_valid, valid_preds)
-
-        if num_classes == 2:
-            train_report = self.report_creator.score_binary_classification(
-                t_train, train_preds, train_probs, is_train=True)
-            valid_report = self.report_creator.score_binary_classification(
-                t_valid, valid_preds, valid_probs)
+        self._fit(f_train, t_train)
+        classes = list(np.sort(target.unique()))
+
+        results = []
+        train_split = self._get_train_scoring_split(f_train, t_train)
+        if train_split is not None:
+            results.append(self._score_classification(
+                classes, *train_split, is_train=True))
+        results.append(self._score_classification(classes, f_valid, t_valid))
+        return ModelTrainingResults(model=self.model, results=results)
+
+    def _score_classification(self, classes, features, target,
+                              is_train=False):
+        preds, probs = self._predict_with_scores(features)
+        results_df = utils.get_predictions_df(
+            features, preds, self.prediction_output, probs, classes)
+        if len(classes) == 2:
+            report = self.report_creator.score_binary_classification(
+                target, preds, probs, is_train=is_train)
         else:
-            classes = list(target.unique())
-            train_report = self.report_creator.score_multiclass_classification(
-                classes, t_train, train_preds, train_probs, is_train=True)
-            valid_report = self.report_creator.score_multiclass_classification(
-                classes, t_valid, valid_preds, valid_probs)
-        return ModelTrainingResults(
-            model=self.model,
-            results=[(train_report, train_results_df),
-                     (valid_report, valid_results_df)],
-        )
+            report = self.report_creator.score_multiclass_classification(
+                classes, target, preds, probs, is_train=is_train)
+        return report, results_df
 
     def _process_regression(self, features, target) -> ModelTrainingResults:
+        if self.cv_folds is not None:
+            return CrossValidationService(
+                self.model_meta, self.model).cross_validate(features, target)
+
         f_train, f_valid, t_train, t_valid = self._get_train_test_split(
             features, target)
-        train_preds, valid_preds = self._fit_and_predict(f_train, t_train,
-                                                         f_valid)
-
-        train_results_df = utils.get_predictions_df(f_train, train_preds)
-        valid_results_df = utils.get_predictions_df(f_valid, valid_preds)
-
-        train_report = self.report_creator.score_regression(
-            t_train, train_preds, is_train=True)
-
-        valid_report = self.report_creator.score_regression(t_valid, valid_preds)
-        return ModelTrainingResults(
-            model=self.model,
-            results=[(train_report, train_results_df),
-                     (valid_report, valid_results_df)],
-        )
+        self._fit(f_train, t_train)
+
+        results = []
+        train_split = self._get_train_scoring_split(f_train, t_train)
+        if train_split is not None:
+            results.append(self._score_regression(*train_split,
+                                                  is_train=True))
+        results.append(self._score_regression(f_valid, t_valid))
+        return ModelTrainingResults(model=self.model, results=results)
+
+    def _score_regression(self, features, target, is_train=False):
+        preds = pd.Series(self.model.predict(features),
+                          name=self.target_column)
+        results_df = utils.get_predictions_df(features, preds,
+                                              self.prediction_output)
+        report = self.report_creator.score_regression(target, preds,
+                                                      is_train=is_train)
+        return report, results_df
 
     def _process_clustering(self, features, target) -> ModelTrainingResults:
-        self.model.fit(features)
+        self._fit(features)
         labels = pd.Series(self.model.labels_)
 
-        results_df = utils.get_predictions_df(features, labels)
+        results_df = utils.get_predictions_df(features, labels,
+                                              self.prediction_output)
         report = self.report_creator.score_clustering(features, labels,
                                                       is_train=True)
 
@@ -138,7 +165,8 @@ class ModelTrainerService:
         outliers = self.model.fit_predict(features)
         outliers = pd.Series(outliers).replace({1: False, -1: True})
 
-        results_df = utils.get_predictions_df(features, outliers)
+        results_df = utils.get_predictions_df(features, outliers,
+                                              self.prediction_output)
 
         report = self.report_creator.score_outlier_detection(
             features, outliers, is_train=True)
@@ -0,0 +1,102 @@
+from typing import Dict, Callable, Optional
+
+from ml_api import config
+from ml_api.apps.ml_models import errors
+from ml_api.apps.ml_models.specs import AvailableModelTypes as Models
+from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.schemas import ModelTrainingResults
+from ml_api.apps.ml_models.services.processors.model_trainer import \
+    ModelTrainerService
+
+
+class ModelUpdaterService(ModelTrainerService):
+    """
+    Дообучает уже обученную модель на новых данных без обучения с нуля:
+    partial_fit, добавление деревьев через warm_start или продолжение
+    бустинга от сохраненного бустера.
+    """
+    def __init__(self, model_meta: ModelMetadata, model,
+                 n_iterations: Optional[int] = None):
+        super().__init__(model_meta, model)
+        self.model_type = model_meta.model_params.model_type
+        self.n_iterations = n_iterations
+        # дообучение всегда проводится на одном разбиении
+        self.cv_folds = None
+
+        self._task_to_method_map = {
+            TaskTypes.CLASSIFICATION: self._process_classification,
+            TaskTypes.REGRESSION: self._process_regression,
+            TaskTypes.CLUSTERING: self._process_clustering,
+        }
+        self._update_methods_map: Dict[Models, Callable] = {
+            Models.SGD_CLASSIFIER: self._partial_fit,
+            Models.SGD_REGRESSOR: self._partial_fit,
+            Models.PASSIVE_AGGRESSIVE_CLASSIFIER: self._partial_fit,
+            Models.PASSIVE_AGGRESSIVE_REGRESSOR: self._partial_fit,
+            Models.MLP_CLASSIFIER: self._partial_fit,
+            Models.MLP_REGRESSOR: self._partial_fit,
+            Models.MINI_BATCH_KMEANS: self._partial_fit,
+            Models.RANDOM_FOREST_CLASSIFIER: self._add_estimators,
+            Models.RANDOM_FOREST_REGRESSOR: self._add_estimators,
+            Models.EXTRA_TREES_CLASSIFIER: self._add_estimators,
+            Models.EXTRA_TREES_REGRESSOR: self._add_estimators,
+            Models.GRADIENT_BOOSTING_CLASSIFIER: self._add_estimators,
+            Models.GRADIENT_BOOSTING_REGRESSOR: self._add_estimators,
+            Models.BAGGING_CLASSIFIER: self._add_estimators,
+            Models.BAGGING_REGRESSOR: self._add_estimators,
+            Models.XGB_CLASSIFIER: self._continue_xgb,
+            Models.XGB_REGRESSOR: self._continue_xgb,
+            Models.LGBM_CLASSIFIER: self._continue_lgbm,
+            Models.LGBM_REGRESSOR: self._continue_lgbm,
+            Models.CATBOOST_CLASSIFIER: self._continue_catboost,
+            Models.CATBOOST_REGRESSOR: self._continue_catboost,
+        }
+
+    def update_model(self, features, target) -> ModelTrainingResults:
+        if self.model_type not in self._update_methods_map.keys():
+            raise errors.ModelUpdateNotSupportedError(self.model_type.value)
+        return self.train_model(features, target)
+
+    def _fit(self, features, target=None):
+        self._update_methods_map[self.model_type](features, target)
+
+    def _get_n_estimators(self):
+        return self.n_iterations or config.MODEL_UPDATE_N_ESTIMATORS
+
+    def _partial_fit(self, features, target):
+        for _ in range(self.n_iterations or 1):
+            if target is None:
+                self.model.partial_fit(features)
+            else:
+                self.model.partial_fit(features, target)
+
+    def _add_estimators(self, features, target):
+        # warm_start сохраняет обученные деревья и достраивает новые
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=self.model.n_estimators + self._get_n_estimators())
+        self.model.fit(features, target)
+
+    def _continue_xgb(self, features, target):
+        booster = self.model.get_booster()
+        self.model.set_params(n_estimators=self._get_n_estimators())
+        self.model.fit(features, target, xgb_model=booster)
+        # в параметрах остается общее число деревьев, а не прирост
+        self.model.set_params(
+            n_estimators=self.model.get_booster().num_boosted_rounds())
+
+    def _continue_lgbm(self, features, target):
+        booster = self.model.booster_
+        self.model.set_params(n_estimators=self._get_n_estimators())
+        self.model.fit(features, target, init_model=booster)
+        self.model.set_params(
+            n_estimators=self.model.booster_.current_iteration())
+
+    def _continue_catboost(self, features, target):
+        # параметры обученной модели CatBoost менять нельзя
+        params = self.model.get_params()
+        params['iterations'] = self._get_n_estimators()
+        model = type(self.model)(**params)
+        model.fit(features, target, init_model=self.model)
+        self.model = model
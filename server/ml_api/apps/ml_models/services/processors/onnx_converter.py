@@ -0,0 +1,127 @@
+import copy
+import logging
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ml_api.apps.ml_models import utils
+from ml_api.apps.ml_models.model import ModelMetadata
+
+logger = logging.getLogger(__name__)
+
+# Число случайных строк, на которых предсказания ONNX-модели сверяются
+# с исходной моделью
+CHECK_ROWS = 100
+# Версии наборов операторов, поддерживаемые всеми конвертерами
+TARGET_OPSET = {'': 15, 'ai.onnx.ml': 3}
+
+
+class OnnxConverterService:
+    """
+    Конвертирует обученную модель в ONNX (sklearn, XGBoost и LightGBM через
+    skl2onnx/onnxmltools, CatBoost - собственным экспортом). Пакеты
+    конвертации необязательны: если их нет, модель не поддерживается или
+    ее предсказания после конвертации расходятся с исходными, возвращается
+    None и предсказания считаются исходной моделью.
+    """
+    def __init__(self, model_meta: ModelMetadata):
+        self.n_features = len(model_meta.feature_columns)
+
+    def convert(self, model) -> Optional[bytes]:
+        try:
+            if type(model).__module__.startswith('catboost'):
+                onnx_model = self._convert_catboost(model)
+            else:
+                onnx_model = self._convert_sklearn(model)
+            if not self._check_predictions(model, onnx_model):
+                logger.warning(
+                    "ONNX predictions of %s differ from the original model, "
+                    "falling back to the original model",
+                    type(model).__name__)
+                return None
+        except Exception:
+            logger.warning(
+                "ONNX conversion of %s failed, falling back to the original "
+                "model", type(model).__name__, exc_info=True)
+            return None
+        return onnx_model
+
+    def _convert_sklearn(self, model) -> bytes:
+        from skl2onnx import to_onnx
+        from skl2onnx.common.data_types import FloatTensorType
+
+        self._register_boosting_converters()
+        if type(model).__module__.startswith('xgboost'):
+            # конвертер XGBoost понимает только имена признаков вида f0, f1...
+            model = copy.deepcopy(model)
+            model.get_booster().feature_names = None
+        options = None
+        if getattr(model, '_estimator_type', None) == 'classifier':
+            # вероятности тензором, а не списком словарей
+            options = {id(model): {'zipmap': False}}
+        onnx_model = to_onnx(
+            model, initial_types=[
+                ('input', FloatTensorType([None, self.n_features]))],
+            options=options, target_opset=TARGET_OPSET)
+        return onnx_model.SerializeToString()
+
+    @staticmethod
+    def _register_boosting_converters():
+        from skl2onnx import update_registered_converter
+        from skl2onnx.common.shape_calculator import \
+            calculate_linear_classifier_output_shapes, \
+            calculate_linear_regressor_output_shapes
+
+        try:
+            from xgboost import XGBClassifier, XGBRegressor
+            from onnxmltools.convert.xgboost.operator_converters.XGBoost \
+                import convert_xgboost
+            from lightgbm import LGBMClassifier, LGBMRegressor
+            from onnxmltools.convert.lightgbm.operator_converters.LightGbm \
+                import convert_lightgbm
+        except ImportError:
+            return
+        classifier_options = {'nocl': [True, False],
+                              'zipmap': [True, False, 'columns']}
+        for model_class, converter in ((XGBClassifier, convert_xgboost),
+                                       (LGBMClassifier, convert_lightgbm)):
+            update_registered_converter(
+                model_class, f"Custom{model_class.__name__}",
+                calculate_linear_classifier_output_shapes, converter,
+                options=classifier_options)
+        for model_class, converter in ((XGBRegressor, convert_xgboost),
+                                       (LGBMRegressor, convert_lightgbm)):
+            update_registered_converter(
+                model_class, f"Custom{model_class.__name__}",
+                calculate_linear_regressor_output_shapes, converter)
+
+    @staticmethod
+    def _convert_catboost(model) -> bytes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            onnx_path = Path(tmp_dir) / 'model.onnx'
+            model.save_model(str(onnx_path), format='onnx')
+            return onnx_path.read_bytes()
+
+    def _check_predictions(self, model, onnx_model: bytes) -> bool:
+        # значения, точно представимые во float32, одинаковы для обеих моделей
+        features = np.random.default_rng(0).normal(
+            size=(CHECK_ROWS, self.n_features)).astype(np.float32).astype(
+            np.float64)
+        feature_names = getattr(model, 'feature_names_in_', None)
+        if feature_names is None:
+            feature_names = getattr(model, 'feature_names_', None)
+        if feature_names is not None:
+            features_df = pd.DataFrame(features, columns=list(feature_names))
+        else:
+            features_df = pd.DataFrame(features)
+        expected = np.asarray(model.predict(features_df)).ravel()
+        predicted = utils.run_onnx_predict(
+            utils.create_onnx_session(onnx_model), features)
+        if expected.dtype.kind in 'fc':
+            return np.allclose(predicted.astype(np.float64), expected,
+                               rtol=1e-3, atol=1e-4)
+        return (predicted.astype(expected.dtype) == expected).all()
+
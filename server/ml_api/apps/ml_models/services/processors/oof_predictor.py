@@ -0,0 +1,68 @@
+from typing import Any, List, Tuple
+
+import joblib
+import pandas as pd
+from bunnet import PydanticObjectId
+from sklearn.base import clone
+from sklearn.model_selection import KFold, StratifiedKFold, cross_val_predict
+
+from ml_api import config
+from ml_api.apps.ml_models import utils
+from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.repositories.repository_manager import \
+    ModelRepositoryManager
+from ml_api.apps.ml_models.services.processors.prefit_compositions import \
+    get_stack_method, format_stack_predictions
+
+
+class OutOfFoldPredictionsService:
+    """
+    Считает out-of-fold предсказания базовых моделей для стекинга.
+    Предсказания кэшируются для каждой модели по версии данных, числу
+    фолдов и параметрам модели, поэтому повторные композиции из тех же
+    моделей не переобучают их.
+    """
+    def __init__(self, user_id, composition_meta: ModelMetadata):
+        self.repository = ModelRepositoryManager(user_id)
+        self.task_type = composition_meta.task_type
+        self.stratify = composition_meta.stratify
+        self.cv_folds = composition_meta.cv_folds or config.STACKING_CV_FOLDS
+        self.n_jobs = config.CV_N_JOBS
+
+    def get_oof_predictions(self, model_ids: List[PydanticObjectId],
+                            estimators: List[Tuple[str, Any]],
+                            features: pd.DataFrame,
+                            target: pd.Series) -> pd.DataFrame:
+        data_version = utils.get_data_version(features, target)
+        oof_predictions = []
+        for model_id, (name, estimator) in zip(model_ids, estimators):
+            key = f"{data_version}_{self.cv_folds}_" \
+                  f"{joblib.hash(estimator.get_params())}"
+            model_oof = self.repository.load_oof_predictions(model_id, key)
+            if model_oof is None:
+                model_oof = self._predict_out_of_fold(name, estimator,
+                                                      features, target)
+                self.repository.save_oof_predictions(model_id, key,
+                                                     model_oof)
+            oof_predictions.append(model_oof)
+        return pd.concat(oof_predictions, axis=1)
+
+    def _get_folds(self):
+        if self.task_type == TaskTypes.CLASSIFICATION and self.stratify:
+            return StratifiedKFold(n_splits=self.cv_folds, shuffle=True,
+                                   random_state=0)
+        return KFold(n_splits=self.cv_folds, shuffle=True, random_state=0)
+
+    def _predict_out_of_fold(self, name: str, estimator, features, target
+                             ) -> pd.DataFrame:
+        model = clone(estimator)
+        if self.n_jobs != 1:
+            # фолды обучаются параллельно - бюджет потоков не умножаем
+            utils.set_n_jobs(model, 1)
+        method = get_stack_method(estimator)
+        predictions = cross_val_predict(model, features, target,
+                                        cv=self._get_folds(), method=method,
+                                        n_jobs=self.n_jobs)
+        return format_stack_predictions(name, predictions, method,
+                                        features.index)
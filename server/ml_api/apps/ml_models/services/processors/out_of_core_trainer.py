@@ -0,0 +1,161 @@
+from typing import Callable, Iterator, Tuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from ml_api import config
+from ml_api.apps.ml_models import errors, utils
+from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
+from ml_api.apps.ml_models.specs import PredictionOutputModes
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.schemas import ModelTrainingResults
+from ml_api.apps.training_reports.services import ReportCreatorService
+
+ChunksFactory = Callable[[], Iterator[Tuple[pd.DataFrame,
+                                            Optional[pd.Series]]]]
+
+
+class OutOfCoreTrainerService:
+    """
+    Обучает модели с partial_fit по частям датафрейма, не загружая его
+    в память целиком. Валидационная выборка выделяется из каждой части
+    детерминированно, поэтому совпадает при всех проходах по данным.
+    """
+    def __init__(self, model_meta: ModelMetadata, model):
+        self.model = model
+        self.task_type = model_meta.task_type
+        self.dataframe_id = model_meta.dataframe_id
+        self.target_column = model_meta.target_column
+        self.test_size = model_meta.test_size or 0.25
+        self.prediction_output = model_meta.prediction_output
+        self.sample_size = (model_meta.train_scoring_sample_size
+                            or config.TRAIN_SCORING_SAMPLE_SIZE)
+        self.random_state = np.random.randint(np.iinfo(np.int32).max)
+
+        self.report_creator = ReportCreatorService()
+        self.classes_limit = 10
+        self._task_to_method_map = {
+            TaskTypes.CLASSIFICATION: self._process_classification,
+            TaskTypes.REGRESSION: self._process_regression,
+            TaskTypes.CLUSTERING: self._process_clustering,
+        }
+
+    def train_model(self, get_chunks: ChunksFactory) -> ModelTrainingResults:
+        if self.task_type not in self._task_to_method_map.keys():
+            raise errors.UnknownTaskTypeError(self.task_type.value)
+        process_train = self._task_to_method_map[self.task_type]
+        try:
+            model_training_result = process_train(get_chunks)
+        except Exception as err:
+            error_type = type(err).__name__
+            error_description = str(err)
+            raise errors.ModelTrainingError(f"{error_type}: {error_description}")
+        return model_training_result
+
+    def _split_chunks(self, get_chunks: ChunksFactory):
+        """(features, target, valid_mask) для каждой части датафрейма."""
+        for i, (features, target) in enumerate(get_chunks()):
+            rng = np.random.default_rng([self.random_state, i])
+            yield features, target, rng.random(len(features)) < self.test_size
+
+    def _get_classes(self, get_chunks: ChunksFactory):
+        classes = set()
+        for _, target in get_chunks():
+            classes.update(target.unique())
+        return np.sort(np.array(list(classes)))
+
+    def _fit_chunks(self, get_chunks: ChunksFactory, **fit_params):
+        for features, target, valid_mask in self._split_chunks(get_chunks):
+            if valid_mask.all():
+                continue
+            self.model.partial_fit(features[~valid_mask],
+                                   target[~valid_mask], **fit_params)
+
+    def _predict_valid_chunks(self, get_chunks: ChunksFactory, predict):
+        valid_features, targets, preds, probs = [], [], [], []
+        for features, target, valid_mask in self._split_chunks(get_chunks):
+            if not valid_mask.any():
+                continue
+            chunk_preds, chunk_probs = predict(features[valid_mask])
+            # признаки валидационной выборки хранятся только для вывода full,
+            # иначе достаточно индекса строк (row_index)
+            if self.prediction_output == PredictionOutputModes.FULL:
+                valid_features.append(features[valid_mask])
+            else:
+                valid_features.append(features[valid_mask].iloc[:, :0])
+            targets.append(target[valid_mask].to_numpy())
+            preds.append(np.asarray(chunk_preds))
+            if chunk_probs is not None:
+                probs.append(chunk_probs)
+        target = pd.Series(np.concatenate(targets), name=self.target_column)
+        preds = pd.Series(np.concatenate(preds), name=self.target_column)
+        probs = np.concatenate(probs) if probs else None
+        return pd.concat(valid_features), target, preds, probs
+
+    def _process_classification(self, get_chunks: ChunksFactory
+                                ) -> ModelTrainingResults:
+        classes = self._get_classes(get_chunks)
+        if len(classes) < 2:
+            raise errors.OneClassClassificationError(self.dataframe_id)
+        elif len(classes) > self.classes_limit:
+            raise errors.TooManyClassesClassificationError(
+                len(classes), self.dataframe_id)
+
+        self._fit_chunks(get_chunks, classes=classes)
+        f_valid, t_valid, valid_preds, valid_probs = \
+            self._predict_valid_chunks(
+                get_chunks, lambda f: utils.predict_with_scores(self.model, f))
+
+        if len(classes) == 2:
+            valid_report = self.report_creator.score_binary_classification(
+                t_valid, valid_preds, valid_probs)
+        else:
+            valid_report = self.report_creator.score_multiclass_classification(
+                list(classes), t_valid, valid_preds, valid_probs)
+        results_df = utils.get_predictions_df(
+            f_valid, valid_preds, self.prediction_output, valid_probs,
+            list(classes))
+        return ModelTrainingResults(
+            model=self.model,
+            results=[(valid_report, results_df)],
+        )
+
+    def _process_regression(self, get_chunks: ChunksFactory
+                            ) -> ModelTrainingResults:
+        self._fit_chunks(get_chunks)
+        f_valid, t_valid, valid_preds, _ = self._predict_valid_chunks(
+            get_chunks, lambda f: (self.model.predict(f), None))
+
+        valid_report = self.report_creator.score_regression(t_valid,
+                                                            valid_preds)
+        results_df = utils.get_predictions_df(f_valid, valid_preds,
+                                              self.prediction_output)
+        return ModelTrainingResults(
+            model=self.model,
+            results=[(valid_report, results_df)],
+        )
+
+    def _process_clustering(self, get_chunks: ChunksFactory
+                            ) -> ModelTrainingResults:
+        sample, sample_keys = None, None
+        rng = np.random.default_rng(self.random_state)
+        for features, _ in get_chunks():
+            self.model.partial_fit(features)
+            # равномерная подвыборка строк для отчета: строки с наименьшими
+            # случайными ключами среди всех частей
+            keys = rng.random(len(features))
+            if sample is not None:
+                features = pd.concat([sample, features], ignore_index=True)
+                keys = np.concatenate([sample_keys, keys])
+            keep = np.argsort(keys)[:self.sample_size]
+            sample = features.iloc[keep].reset_index(drop=True)
+            sample_keys = keys[keep]
+
+        labels = pd.Series(self.model.predict(sample))
+        results_df = utils.get_predictions_df(sample, labels)
+        report = self.report_creator.score_clustering(sample, labels,
+                                                      is_train=True)
+        return ModelTrainingResults(
+            model=self.model,
+            results=[(report, results_df)],
+        )
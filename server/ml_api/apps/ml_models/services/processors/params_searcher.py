@@ -1,16 +1,27 @@
-import traceback
+import multiprocessing
+import time
+from typing import Any, Callable, Dict, List, Optional
 
-from hyperopt import fmin, tpe, STATUS_OK, space_eval
+import numpy as np
+from hyperopt import tpe, Trials, Domain, STATUS_OK, STATUS_FAIL, \
+    JOB_STATE_DONE, JOB_STATE_NEW, space_eval
+from hyperopt.base import spec_from_misc
+from hyperopt.pyll.stochastic import sample
+from joblib import Parallel, delayed
 from sklearn.model_selection import cross_val_score
-from sklearn.metrics import silhouette_score
 from bunnet import PydanticObjectId
 
 
-from ml_api.apps.ml_models import schemas, errors
+from ml_api import config
+from ml_api.apps.ml_models import schemas, errors, utils
 from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
 from ml_api.apps.ml_models.specs import AvailableModelTypes as ModelTypes
+from ml_api.apps.ml_models.specs import AvailableParamsTypes as ParamsTypes
+from ml_api.apps.training_reports.services import sampled_silhouette_score
 from ml_api.apps.dataframes.facade import \
     DataframeServiceFacade
+from ml_api.apps.ml_models.repositories.search_history_repository import \
+    ParamsSearchHistoryCRUD
 from ml_api.apps.ml_models.services.processors.model_construstor import \
     ModelConstructorService
 from ml_api.apps.ml_models.models_specs.hyperopt_params.\
@@ -21,12 +32,52 @@ from ml_api.apps.ml_models.models_specs.hyperopt_params.clustering_searchers \
     import CLUSTERING_SEARCH_SPACE_CONFIG
 
 
+def _evaluate_trial(model, task_type: TaskTypes, features, target,
+                    cv_n_jobs: int):
+    # функция модульного уровня, чтобы передаваться в процессы joblib
+    try:
+        if task_type == TaskTypes.CLASSIFICATION:
+            scoring_method = 'roc_auc_ovr_weighted' if \
+                len(target.unique()) > 2 else 'roc_auc'
+            scores = cross_val_score(model, features, target,
+                scoring=scoring_method, cv=5, n_jobs=cv_n_jobs,
+                error_score="raise")
+            loss = -scores.mean()
+        elif task_type == TaskTypes.REGRESSION:
+            scores = cross_val_score(model, features, target,
+                scoring='neg_mean_squared_error', cv=5, n_jobs=cv_n_jobs,
+                error_score="raise")
+            loss = -scores.mean()
+        else:
+            model.fit(features)
+            loss = -sampled_silhouette_score(features, model.labels_)
+    except Exception as err:
+        return {'status': STATUS_FAIL,
+                'error': f"{type(err).__name__}: {err}"}
+    return {'loss': float(loss), 'status': STATUS_OK}
+
+
+def _to_builtin(value):
+    # значения из numpy не сериализуются в BSON
+    return value.item() if isinstance(value, np.generic) else value
+
+
 class HyperoptService:
-    def __init__(self, user_id, dataframe_id: PydanticObjectId):
+    """
+    Подбирает гиперпараметры модели. История испытаний сохраняется для
+    версии датафрейма: повторный поиск продолжается с сохраненных испытаний,
+    а поиск на измененных данных начинается с лучших точек прошлого поиска
+    по этому датафрейму или его родителям.
+    """
+    def __init__(self, user_id, dataframe_id: PydanticObjectId,
+                 progress_callback: Optional[Callable[[Dict], None]] = None):
         self.target = None
         self.features = None
         self.dataframe_id = dataframe_id
+        self.dataframe_version = None
+        self.progress_callback = progress_callback
         self.dataframe_service = DataframeServiceFacade(user_id)
+        self.history_repository = ParamsSearchHistoryCRUD(user_id)
 
         self._task_to_searcher_params_map = {
             TaskTypes.CLASSIFICATION: CLASSIFICATION_SEARCH_SPACE_CONFIG,
@@ -40,18 +91,24 @@ class HyperoptService:
             TaskTypes.CLUSTERING: errors.UnknownClusteringModelError,
         }
 
-    def search_params(self, task_type: TaskTypes,
-                            model_type: ModelTypes) -> schemas.ModelParams:
+        self._params_type_to_search_method_map = {
+            ParamsTypes.HYPEROPT: self._run_trials,
+            ParamsTypes.SUCCESSIVE_HALVING: self._run_successive_halving,
+        }
+
+    def search_params(self, task_type: TaskTypes, model_type: ModelTypes,
+                      params_type: ParamsTypes = ParamsTypes.HYPEROPT
+                      ) -> schemas.ModelParams:
+        if params_type not in self._params_type_to_search_method_map:
+            raise errors.UnknownParamsTypeError(params_type)
+        search_method = self._params_type_to_search_method_map[params_type]
         self._prepare_data(task_type)
 
         search_space = self.get_model_params_search_space(task_type, model_type)
-
-        best = fmin(fn=lambda params: self._objective(params, task_type, model_type),
-                    space=search_space,
-                    algo=tpe.suggest,
-                    max_evals=50)
         try:
-            best_params = space_eval(search_space, best)
+            best_params = search_method(task_type, model_type, search_space)
+        except errors.ParamsSearchingError:
+            raise
         except Exception as err:
             # print(traceback.format_exc())
             error_type = type(err).__name__
@@ -61,6 +118,255 @@ class HyperoptService:
 
         return schemas.ModelParams(model_type=model_type, params=best_params)
 
+    def _run_trials(self, task_type: TaskTypes, model_type: ModelTypes,
+                    search_space) -> Dict[str, Any]:
+        """
+        Пакетный цикл TPE: за шаг предлагается n_jobs точек, которые
+        оцениваются параллельно. Поиск останавливается по числу итераций,
+        по времени или если лучший результат долго не улучшается.
+        """
+        n_jobs = max(1, config.HYPEROPT_N_JOBS)
+        domain = Domain(lambda params: None, search_space)
+        trials = Trials()
+        rng = np.random.default_rng()
+        deadline = time.monotonic() + config.HYPEROPT_TIMEOUT
+        best_loss, best_tid = np.inf, 0
+        last_error = None
+
+        # испытания на этой же версии данных восстанавливаются без оценки,
+        # лучшие точки с другой версии оцениваются первыми
+        history = self.history_repository.get(
+            self.dataframe_id, self.dataframe_version, task_type, model_type)
+        pending_vals = []
+        if history is not None:
+            docs = self._make_trial_docs(trials, domain, history.trials)
+            trials.insert_trial_docs(docs)
+            trials.refresh()
+            for doc in docs:
+                if doc['result']['status'] == STATUS_OK \
+                        and doc['result']['loss'] < best_loss:
+                    best_loss, best_tid = doc['result']['loss'], doc['tid']
+        else:
+            pending_vals = [trial['vals'] for trial
+                            in self._get_warm_start_trials(task_type,
+                                                           model_type)]
+
+        n_evals = 0
+        while n_evals < config.HYPEROPT_MAX_EVALS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            batch_size = min(n_jobs, config.HYPEROPT_MAX_EVALS - n_evals)
+            if pending_vals:
+                docs = self._make_trial_docs(
+                    trials, domain,
+                    [{'vals': vals} for vals in pending_vals[:batch_size]])
+                pending_vals = pending_vals[batch_size:]
+            else:
+                new_ids = trials.new_trial_ids(batch_size)
+                docs = tpe.suggest(new_ids, domain, trials,
+                                   rng.integers(2 ** 31 - 1))
+            params = [space_eval(search_space, spec_from_misc(doc['misc']))
+                      for doc in docs]
+            results = self._evaluate_candidates(
+                task_type, model_type, params, self.features, self.target,
+                remaining)
+            if results is None:
+                last_error = f"timeout of {config.HYPEROPT_TIMEOUT}s exceeded"
+                break
+            for doc, result in zip(docs, results):
+                last_error = result.pop('error', last_error)
+                doc['state'] = JOB_STATE_DONE
+                doc['result'] = result
+                if result['status'] == STATUS_OK \
+                        and result['loss'] < best_loss:
+                    best_loss, best_tid = result['loss'], doc['tid']
+            trials.insert_trial_docs(docs)
+            trials.refresh()
+            n_evals += len(docs)
+            self._report_progress(
+                search=ParamsTypes.HYPEROPT.value,
+                trials_done=n_evals,
+                max_trials=config.HYPEROPT_MAX_EVALS,
+                best_loss=best_loss)
+            # испытания после лучшего (tid нумеруются с нуля)
+            if len(trials) - best_tid - 1 >= \
+                    config.HYPEROPT_EARLY_STOP_ROUNDS:
+                break
+
+        if n_evals:
+            self._save_history(task_type, model_type, search_space, trials)
+        if best_loss == np.inf:
+            raise errors.ParamsSearchingError(
+                model_type.value, last_error or "no successful trials")
+        return space_eval(search_space, trials.argmin)
+
+    def _run_successive_halving(self, task_type: TaskTypes,
+                                model_type: ModelTypes,
+                                search_space) -> Dict[str, Any]:
+        """
+        Successive halving: случайные кандидаты из пространства поиска
+        оцениваются на растущих подвыборках данных, после каждого раунда
+        остается лучшая 1/factor часть. На полных данных оцениваются только
+        финалисты.
+        """
+        factor = max(2, config.HALVING_FACTOR)
+        n_rows = len(self.features)
+        min_rows = min(n_rows, config.HALVING_MIN_SAMPLES)
+        rng = np.random.default_rng()
+        # лучшие точки прошлых поисков заменяют часть случайных кандидатов
+        candidates = [trial['params'] for trial
+                      in self._get_warm_start_trials(task_type, model_type)]
+        candidates += [sample(search_space, rng=rng) for _
+                       in range(config.HYPEROPT_MAX_EVALS - len(candidates))]
+        n_rounds = 1 + min(
+            int(np.ceil(np.log(len(candidates)) / np.log(factor))),
+            int(np.log(n_rows / min_rows) / np.log(factor)))
+        # подвыборки вложены друг в друга: префиксы одной перестановки
+        order = rng.permutation(n_rows)
+        deadline = time.monotonic() + config.HYPEROPT_TIMEOUT
+        best_params, last_error = None, None
+
+        for round_number in range(n_rounds):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            round_rows = int(n_rows / factor ** (n_rounds - 1 - round_number))
+            rows = order[:max(round_rows, min_rows)]
+            features = self.features.iloc[rows]
+            target = self.target.iloc[rows] if self.target is not None \
+                else None
+            results = self._evaluate_candidates(
+                task_type, model_type, candidates, features, target, remaining)
+            if results is None:
+                last_error = f"timeout of {config.HYPEROPT_TIMEOUT}s exceeded"
+                break
+            losses = []
+            for result in results:
+                last_error = result.get('error', last_error)
+                losses.append(result['loss'] if result['status'] == STATUS_OK
+                              else np.inf)
+            ranking = np.argsort(losses, kind='stable')
+            if losses[ranking[0]] == np.inf:
+                break
+            best_params = candidates[ranking[0]]
+            self._report_progress(
+                search=ParamsTypes.SUCCESSIVE_HALVING.value,
+                round=round_number + 1,
+                rounds=n_rounds,
+                round_rows=len(rows),
+                candidates=len(candidates),
+                best_loss=losses[ranking[0]])
+            n_keep = max(1, int(np.ceil(len(candidates) / factor)))
+            candidates = [candidates[i] for i in ranking[:n_keep]
+                          if losses[i] < np.inf]
+
+        if best_params is None:
+            raise errors.ParamsSearchingError(
+                model_type.value, last_error or "no successful trials")
+        return best_params
+
+    def _get_warm_start_trials(self, task_type: TaskTypes,
+                               model_type: ModelTypes) -> List[Dict[str, Any]]:
+        history = self.history_repository.get(
+            self.dataframe_id, self.dataframe_version, task_type, model_type)
+        if history is None:
+            history = self.history_repository.get_latest(
+                self._get_dataframe_lineage(), task_type, model_type)
+        if history is None:
+            return []
+        successful = [trial for trial in history.trials
+                      if trial['status'] == STATUS_OK]
+        successful.sort(key=lambda trial: trial['loss'])
+        return successful[:config.HYPEROPT_WARM_START_TRIALS]
+
+    def _get_dataframe_lineage(self) -> List[PydanticObjectId]:
+        lineage = [self.dataframe_id]
+        parent_id = self.dataframe_service.get_parent_id(self.dataframe_id)
+        while parent_id is not None and parent_id not in lineage:
+            lineage.append(parent_id)
+            parent_id = self.dataframe_service.get_parent_id(parent_id)
+        return lineage
+
+    def _make_trial_docs(self, trials: Trials, domain: Domain,
+                         saved_trials: List[Dict[str, Any]]) -> List[Dict]:
+        """Документы hyperopt для сохраненных испытаний или новых точек."""
+        tids = trials.new_trial_ids(len(saved_trials))
+        results, miscs = [], []
+        for tid, trial in zip(tids, saved_trials):
+            vals = trial['vals']
+            miscs.append({'tid': tid, 'cmd': domain.cmd,
+                          'workdir': domain.workdir,
+                          'idxs': {label: [tid] if values else []
+                                   for label, values in vals.items()},
+                          'vals': vals})
+            if 'status' in trial:
+                results.append({'status': trial['status'],
+                                'loss': trial['loss']})
+            else:
+                results.append({'status': 'new'})
+        docs = trials.new_trial_docs(tids, [None] * len(tids), results, miscs)
+        for doc in docs:
+            if doc['result']['status'] != 'new':
+                doc['state'] = JOB_STATE_DONE
+            else:
+                doc['state'] = JOB_STATE_NEW
+        return docs
+
+    def _save_history(self, task_type: TaskTypes, model_type: ModelTypes,
+                      search_space, trials: Trials):
+        saved_trials = []
+        for doc in trials.trials:
+            vals = {label: [_to_builtin(value) for value in values]
+                    for label, values in doc['misc']['vals'].items()}
+            params = space_eval(search_space, spec_from_misc(doc['misc']))
+            saved_trials.append({
+                'vals': vals,
+                'params': {name: _to_builtin(value)
+                           for name, value in params.items()},
+                'loss': _to_builtin(doc['result'].get('loss')),
+                'status': doc['result']['status'],
+            })
+        self.history_repository.save(self.dataframe_id,
+                                      self.dataframe_version, task_type,
+                                      model_type, saved_trials)
+
+    def _report_progress(self, **progress):
+        if self.progress_callback is None:
+            return
+        if progress.get('best_loss') == np.inf:
+            progress['best_loss'] = None
+        self.progress_callback({'stage': 'params_search',
+                                **{key: _to_builtin(value)
+                                   for key, value in progress.items()}})
+
+    def _evaluate_candidates(self, task_type: TaskTypes,
+                             model_type: ModelTypes,
+                             candidates: List[Dict[str, Any]],
+                             features, target, timeout: float
+                             ) -> Optional[List[Dict[str, Any]]]:
+        """Оценивает кандидатов параллельно; None при превышении времени."""
+        n_jobs = max(1, config.HYPEROPT_N_JOBS)
+        # при параллельных испытаниях фолды внутри испытания не распараллеливаются
+        cv_n_jobs = config.CV_N_JOBS if n_jobs == 1 else 1
+        models = [self._get_trial_model(task_type, model_type, params)
+                  for params in candidates]
+        try:
+            return Parallel(n_jobs=n_jobs, timeout=timeout)(
+                delayed(_evaluate_trial)(model, task_type, features, target,
+                                         cv_n_jobs)
+                for model in models)
+        except (TimeoutError, multiprocessing.TimeoutError):
+            # испытания, не уложившиеся в отведенное время, отбрасываются
+            return None
+
+    def _get_trial_model(self, task_type: TaskTypes, model_type: ModelTypes,
+                         params: Dict[str, Any]):
+        model_params = schemas.ModelParams(model_type=model_type, params=params)
+        # испытания и фолды оцениваются параллельно, поэтому модель однопоточная
+        return ModelConstructorService(n_jobs=1).get_model(
+            task_type, model_params, n_rows=len(self.features))
+
     def _prepare_data(self, task_type: TaskTypes):
         if task_type in [TaskTypes.CLASSIFICATION,
                          TaskTypes.REGRESSION]:
@@ -74,6 +380,8 @@ class HyperoptService:
             raise errors.HyperoptTaskTypeError(task_type)
         else:
             raise errors.UnknownTaskTypeError(task_type.value)
+        self.dataframe_version = utils.get_data_version(self.features,
+                                                        self.target)
 
     def get_model_params_search_space(self, task_type: TaskTypes,
                                       model_type: ModelTypes):
@@ -85,28 +393,3 @@ class HyperoptService:
             unknown_model_err = self._task_to_model_error_map[task_type]
             raise unknown_model_err(model_type)
         return searcher_params_map[model_type]
-
-    def _objective(self, params, task_type, model_type):
-        model_params = schemas.ModelParams(model_type=model_type, params=params)
-        model = ModelConstructorService().get_model(task_type, model_params)
-
-        if task_type == TaskTypes.CLASSIFICATION:
-            scoring_method = 'roc_auc_weighted' if \
-                len(self.target.unique()) > 2 else 'roc_auc'
-            scores = cross_val_score(model, self.features, self.target,
-                scoring=scoring_method, cv=5, n_jobs=-1, error_score="raise")
-            loss = -scores.mean()
-
-        elif task_type == TaskTypes.REGRESSION:
-            scores = cross_val_score(model, self.features, self.target,
-                scoring='mse', cv=5, n_jobs=-1, error_score="raise")
-            loss = -scores.mean()
-
-        elif task_type == TaskTypes.CLUSTERING:
-            model.fit(self.features)
-            labels = model.labels_
-            loss = -silhouette_score(self.features, labels)
-        else:
-            raise errors.UnknownTaskTypeError(task_type.values_to_fill)
-
-        return {'loss': loss, 'status': STATUS_OK}
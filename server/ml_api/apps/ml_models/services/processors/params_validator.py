@@ -2,6 +2,8 @@ from typing import Dict, Any
 
 from pydantic import ValidationError
 
+from ml_api.apps.jobs.services import BackgroundJobsService
+from ml_api.apps.jobs.specs import AvailableObjectTypes
 from ml_api.apps.ml_models import specs, schemas, errors
 from ml_api.apps.ml_models.specs import AvailableModelTypes as Models
 from ml_api.apps.ml_models.specs import AvailableTaskTypes as TaskTypes
@@ -21,6 +23,7 @@ class ParamsValidationService:
     """
     def __init__(self, user_id, model_meta: ModelMetadata):
         self._user_id = user_id
+        self.model_id = model_meta.id
         self.dataframe_id = model_meta.dataframe_id
         self.model_type = model_meta.model_params.model_type
         self.model_params = model_meta.model_params.params
@@ -32,6 +35,7 @@ class ParamsValidationService:
             Models.RANDOM_FOREST_CLASSIFIER: classif_params.RandomForestClassifierParams,
             Models.EXTRA_TREES_CLASSIFIER: classif_params.ExtraTreesClassifierParams,
             Models.GRADIENT_BOOSTING_CLASSIFIER: classif_params.GradientBoostingClassifierParams,
+            Models.HIST_GRADIENT_BOOSTING_CLASSIFIER: classif_params.HistGradientBoostingClassifierParams,
             Models.ADABOOST_CLASSIFIER: classif_params.AdaBoostClassifierParams,
             Models.BAGGING_CLASSIFIER: classif_params.BaggingClassifierParams,
             Models.XGB_CLASSIFIER: classif_params.XGBClassifierParams,
@@ -52,6 +56,7 @@ class ParamsValidationService:
             Models.RANDOM_FOREST_REGRESSOR: regr_params.RandomForestRegressorParams,
             Models.EXTRA_TREES_REGRESSOR: regr_params.ExtraTreesRegressorParams,
             Models.GRADIENT_BOOSTING_REGRESSOR: regr_params.GradientBoostingRegressorParams,
+            Models.HIST_GRADIENT_BOOSTING_REGRESSOR: regr_params.HistGradientBoostingRegressorParams,
             Models.ADABOOST_REGRESSOR: regr_params.AdaBoostRegressorParams,
             Models.BAGGING_REGRESSOR: regr_params.BaggingRegressorParams,
             Models.XGB_REGRESSOR: regr_params.XGBRegressorParams,
@@ -131,12 +136,17 @@ class ParamsValidationService:
             return {}
         if self.params_type == specs.AvailableParamsTypes.CUSTOM:
             return self.model_params
-        if self.params_type == specs.AvailableParamsTypes.HYPEROPT:
-            hyperopt_model_params = HyperoptService(self._user_id, self.dataframe_id
-                ).search_params(self.task_type, self.model_type)
+        if self.params_type in specs.searching_params_types:
+            hyperopt_model_params = HyperoptService(
+                self._user_id, self.dataframe_id, self._report_search_progress
+            ).search_params(self.task_type, self.model_type, self.params_type)
             return hyperopt_model_params.params
         raise errors.UnknownParamsTypeError(self.params_type)
 
+    def _report_search_progress(self, progress: Dict[str, Any]):
+        BackgroundJobsService(self._user_id).set_progress(
+            AvailableObjectTypes.MODEL, self.model_id, progress)
+
     def _validate_params(self, initial_params: Dict) -> Dict[str, Any]:
         if self.task_type not in self._task_to_models_params_map_map:
             raise errors.UnknownTaskTypeError(self.task_type.value)
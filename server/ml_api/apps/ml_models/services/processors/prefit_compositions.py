@@ -0,0 +1,154 @@
+from collections.abc import Mapping
+from typing import Any, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin, RegressorMixin, \
+    clone
+from sklearn.utils.metaestimators import available_if
+
+
+class FittedEstimators(Mapping):
+    """
+    Обученные базовые модели композиции по именам. Объект не является
+    оценщиком sklearn, поэтому get_params композиции не раскрывает
+    параметры базовых моделей, а sklearn.clone копирует его через deepcopy -
+    копия возвращает тот же объект. Базовые модели не клонируются
+    и не сбрасываются при кросс-валидации композиции.
+    """
+    def __init__(self, estimators: Iterable[Tuple[str, Any]]):
+        self._estimators = dict(estimators)
+
+    def __getitem__(self, name: str):
+        return self._estimators[name]
+
+    def __iter__(self):
+        return iter(self._estimators)
+
+    def __len__(self) -> int:
+        return len(self._estimators)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def get_stack_method(estimator) -> str:
+    """Метод базовой модели, выходы которого идут в мета-модель."""
+    if getattr(estimator, '_estimator_type', None) == 'classifier':
+        for method in ('predict_proba', 'decision_function'):
+            if hasattr(estimator, method):
+                return method
+    return 'predict'
+
+
+def format_stack_predictions(name: str, predictions, method: str,
+                             index) -> pd.DataFrame:
+    predictions = np.asarray(predictions)
+    if predictions.ndim == 1:
+        predictions = predictions.reshape(-1, 1)
+    elif method == 'predict_proba' and predictions.shape[1] == 2:
+        # при двух классах вероятности линейно зависимы
+        predictions = predictions[:, 1:]
+    columns = [f"{name}_{i}" for i in range(predictions.shape[1])]
+    return pd.DataFrame(predictions, columns=columns, index=index)
+
+
+def get_stack_features(estimators: Mapping, features) -> pd.DataFrame:
+    return pd.concat([
+        format_stack_predictions(
+            name, getattr(estimator, get_stack_method(estimator))(features),
+            get_stack_method(estimator), features.index)
+        for name, estimator in estimators.items()], axis=1)
+
+
+class PrefitVotingClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Голосование уже обученных моделей: базовые модели не переобучаются,
+    fit только запоминает классы.
+    """
+    def __init__(self, estimators: FittedEstimators, voting: str = 'hard'):
+        self.estimators = estimators
+        self.voting = voting
+
+    def fit(self, features, target):
+        self.classes_ = np.sort(pd.unique(target))
+        return self
+
+    def predict(self, features):
+        if self.voting == 'soft':
+            return self.classes_[np.argmax(self.predict_proba(features),
+                                           axis=1)]
+        votes = np.zeros((len(features), len(self.classes_)))
+        for estimator in self.estimators.values():
+            indices = np.searchsorted(self.classes_,
+                                      estimator.predict(features))
+            votes[np.arange(len(features)),
+                  np.clip(indices, 0, len(self.classes_) - 1)] += 1
+        return self.classes_[np.argmax(votes, axis=1)]
+
+    @available_if(lambda self: self.voting == 'soft')
+    def predict_proba(self, features):
+        probs = np.zeros((len(features), len(self.classes_)))
+        for estimator in self.estimators.values():
+            # столбцы вероятностей выравниваются по общему набору классов
+            columns = np.searchsorted(self.classes_, estimator.classes_)
+            probs[:, columns] += estimator.predict_proba(features)
+        return probs / len(self.estimators)
+
+
+class PrefitVotingRegressor(RegressorMixin, BaseEstimator):
+    """Среднее предсказаний уже обученных моделей."""
+    def __init__(self, estimators: FittedEstimators):
+        self.estimators = estimators
+
+    def fit(self, features, target):
+        return self
+
+    def predict(self, features):
+        return np.mean([estimator.predict(features) for estimator
+                        in self.estimators.values()], axis=0)
+
+
+class _PrefitStacking(BaseEstimator):
+    """
+    Стекинг поверх уже обученных моделей. Мета-модель обучается на
+    out-of-fold предсказаниях базовых моделей, посчитанных заранее для
+    всех строк датафрейма; строки выбираются по индексу обучающей выборки.
+    """
+    def __init__(self, estimators: FittedEstimators, final_estimator,
+                 oof_predictions: pd.DataFrame):
+        self.estimators = estimators
+        self.final_estimator = final_estimator
+        self.oof_predictions = oof_predictions
+
+    def fit(self, features, target):
+        meta_features = self.oof_predictions.loc[features.index]
+        self.final_estimator_ = clone(self.final_estimator).fit(
+            meta_features, target)
+        return self
+
+    def _get_meta_features(self, features):
+        meta_features = get_stack_features(self.estimators, features)
+        return meta_features[self.oof_predictions.columns]
+
+    def predict(self, features):
+        return self.final_estimator_.predict(
+            self._get_meta_features(features))
+
+
+class PrefitStackingClassifier(ClassifierMixin, _PrefitStacking):
+    def fit(self, features, target):
+        super().fit(features, target)
+        self.classes_ = self.final_estimator_.classes_
+        return self
+
+    def predict_proba(self, features):
+        return self.final_estimator_.predict_proba(
+            self._get_meta_features(features))
+
+
+class PrefitStackingRegressor(RegressorMixin, _PrefitStacking):
+    pass
@@ -13,6 +13,30 @@ class AvailableParamsTypes(Enum):
     DEFAULT = 'default'
     CUSTOM = 'custom'
     HYPEROPT = 'hyperopt'
+    SUCCESSIVE_HALVING = 'successive_halving'
+
+
+class TrainScoringModes(Enum):
+    FULL = 'full'
+    SAMPLE = 'sample'
+    DISABLED = 'disabled'
+
+
+class PredictionOutputModes(Enum):
+    FULL = 'full'
+    PREDICTIONS = 'predictions'
+    PREDICTIONS_WITH_PROBABILITIES = 'predictions_with_probabilities'
+
+
+class PredictionScoreTypes(Enum):
+    PREDICT_PROBA = 'predict_proba'
+    DECISION_FUNCTION = 'decision_function'
+
+
+class ModelStorageModes(Enum):
+    DEFAULT = 'default'
+    MMAP = 'mmap'
+    COMPRESSED = 'compressed'
 
 
 class ModelStatuses(Enum):
@@ -35,6 +59,7 @@ class AvailableModelTypes(Enum):
     RANDOM_FOREST_CLASSIFIER = 'RandomForestClassifier'
     EXTRA_TREES_CLASSIFIER = 'ExtraTreesClassifier'
     GRADIENT_BOOSTING_CLASSIFIER = 'GradientBoostingClassifier'
+    HIST_GRADIENT_BOOSTING_CLASSIFIER = 'HistGradientBoostingClassifier'
     ADABOOST_CLASSIFIER = 'AdaBoostClassifier'
     BAGGING_CLASSIFIER = 'BaggingClassifier'
     XGB_CLASSIFIER = 'XGBClassifier'
@@ -54,6 +79,7 @@ class AvailableModelTypes(Enum):
     RANDOM_FOREST_REGRESSOR = 'RandomForestRegressor'
     EXTRA_TREES_REGRESSOR = 'ExtraTreesRegressor'
     GRADIENT_BOOSTING_REGRESSOR = 'GradientBoostingRegressor'
+    HIST_GRADIENT_BOOSTING_REGRESSOR = 'HistGradientBoostingRegressor'
     ADABOOST_REGRESSOR = 'AdaBoostRegressor'
     BAGGING_REGRESSOR = 'BaggingRegressor'
     XGB_REGRESSOR = 'XGBRegressor'
@@ -112,6 +138,7 @@ classification_models = [
     AvailableModelTypes.RANDOM_FOREST_CLASSIFIER,
     AvailableModelTypes.EXTRA_TREES_CLASSIFIER,
     AvailableModelTypes.GRADIENT_BOOSTING_CLASSIFIER,
+    AvailableModelTypes.HIST_GRADIENT_BOOSTING_CLASSIFIER,
     AvailableModelTypes.ADABOOST_CLASSIFIER,
     AvailableModelTypes.BAGGING_CLASSIFIER,
     AvailableModelTypes.XGB_CLASSIFIER,
@@ -132,6 +159,7 @@ regression_models = [
     AvailableModelTypes.RANDOM_FOREST_REGRESSOR,
     AvailableModelTypes.EXTRA_TREES_REGRESSOR,
     AvailableModelTypes.GRADIENT_BOOSTING_REGRESSOR,
+    AvailableModelTypes.HIST_GRADIENT_BOOSTING_REGRESSOR,
     AvailableModelTypes.ADABOOST_REGRESSOR,
     AvailableModelTypes.BAGGING_REGRESSOR,
     AvailableModelTypes.XGB_REGRESSOR,
@@ -172,6 +200,76 @@ anomaly_detection_models = [
     AvailableModelTypes.ISOLATION_FOREST
 ]
 
+updatable_models = [
+    AvailableModelTypes.SGD_CLASSIFIER,
+    AvailableModelTypes.SGD_REGRESSOR,
+    AvailableModelTypes.PASSIVE_AGGRESSIVE_CLASSIFIER,
+    AvailableModelTypes.PASSIVE_AGGRESSIVE_REGRESSOR,
+    AvailableModelTypes.MLP_CLASSIFIER,
+    AvailableModelTypes.MLP_REGRESSOR,
+    AvailableModelTypes.MINI_BATCH_KMEANS,
+    AvailableModelTypes.RANDOM_FOREST_CLASSIFIER,
+    AvailableModelTypes.RANDOM_FOREST_REGRESSOR,
+    AvailableModelTypes.EXTRA_TREES_CLASSIFIER,
+    AvailableModelTypes.EXTRA_TREES_REGRESSOR,
+    AvailableModelTypes.GRADIENT_BOOSTING_CLASSIFIER,
+    AvailableModelTypes.GRADIENT_BOOSTING_REGRESSOR,
+    AvailableModelTypes.BAGGING_CLASSIFIER,
+    AvailableModelTypes.BAGGING_REGRESSOR,
+    AvailableModelTypes.XGB_CLASSIFIER,
+    AvailableModelTypes.XGB_REGRESSOR,
+    AvailableModelTypes.LGBM_CLASSIFIER,
+    AvailableModelTypes.LGBM_REGRESSOR,
+    AvailableModelTypes.CATBOOST_CLASSIFIER,
+    AvailableModelTypes.CATBOOST_REGRESSOR,
+]
+
+# partial_fit у MLP есть только со стохастическими решателями
+mlp_models = [
+    AvailableModelTypes.MLP_CLASSIFIER,
+    AvailableModelTypes.MLP_REGRESSOR,
+]
+mlp_partial_fit_solvers = ['sgd', 'adam']
+
+out_of_core_models = [
+    AvailableModelTypes.SGD_CLASSIFIER,
+    AvailableModelTypes.SGD_REGRESSOR,
+    AvailableModelTypes.PASSIVE_AGGRESSIVE_CLASSIFIER,
+    AvailableModelTypes.PASSIVE_AGGRESSIVE_REGRESSOR,
+    AvailableModelTypes.MINI_BATCH_KMEANS,
+]
+
+# Модели, массивы которых остаются отображенными в память после загрузки
+# с mmap_mode и разделяются процессами. Деревья sklearn (Tree.__setstate__)
+# копируют узлы в память процесса, бустинги xgboost/lightgbm/catboost
+# хранят модель одним буфером - для них mmap не дает экономии.
+mmap_shared_models = [
+    AvailableModelTypes.SGD_CLASSIFIER,
+    AvailableModelTypes.LINEAR_SVC,
+    AvailableModelTypes.SVC,
+    AvailableModelTypes.LOGISTIC_REGRESSION,
+    AvailableModelTypes.PASSIVE_AGGRESSIVE_CLASSIFIER,
+    AvailableModelTypes.KNEIGHBORS_CLASSIFIER,
+    AvailableModelTypes.RADIUS_NEIGHBORS_CLASSIFIER,
+    AvailableModelTypes.MLP_CLASSIFIER,
+    AvailableModelTypes.HIST_GRADIENT_BOOSTING_CLASSIFIER,
+    AvailableModelTypes.SGD_REGRESSOR,
+    AvailableModelTypes.LINEAR_SVR,
+    AvailableModelTypes.SVR,
+    AvailableModelTypes.LINEAR_REGRESSION,
+    AvailableModelTypes.RIDGE,
+    AvailableModelTypes.LASSO,
+    AvailableModelTypes.ELASTIC_NET,
+    AvailableModelTypes.PASSIVE_AGGRESSIVE_REGRESSOR,
+    AvailableModelTypes.K_NEIGHBORS_REGRESSOR,
+    AvailableModelTypes.RADIUS_NEIGHBORS_REGRESSOR,
+    AvailableModelTypes.MLP_REGRESSOR,
+    AvailableModelTypes.HIST_GRADIENT_BOOSTING_REGRESSOR,
+    AvailableModelTypes.KMEANS,
+    AvailableModelTypes.MINI_BATCH_KMEANS,
+    AvailableModelTypes.PCA,
+]
+
 dimensionality_reduction_models = [
     AvailableModelTypes.PCA,
     AvailableModelTypes.LINEAR_DISCRIMINANT_ANALYSIS,
@@ -180,3 +278,13 @@ dimensionality_reduction_models = [
     AvailableModelTypes.NMF,
     AvailableModelTypes.TRUNCATED_SVD
 ]
+
+searching_params_types = [
+    AvailableParamsTypes.HYPEROPT,
+    AvailableParamsTypes.SUCCESSIVE_HALVING,
+]
+
+stacking_compositions = [
+    AvailableCompositionTypes.STACKING_CLASSIFIER,
+    AvailableCompositionTypes.STACKING_REGRESSOR,
+]
@@ -1,7 +1,151 @@
+import hashlib
+
+import numpy as np
 import pandas as pd
+from catboost import CatBoostClassifier, CatBoostRegressor
+from sklearn.svm import SVC, NuSVC
+
+from ml_api.apps.ml_models.specs import PredictionOutputModes
+
+# Столбец с индексом строки исходного датафрейма в датафрейме предсказаний
+ROW_INDEX_COLUMN = 'row_index'
+
+
+def get_predictions_df(features: pd.DataFrame, res_column: pd.Series,
+                       output_mode: PredictionOutputModes =
+                       PredictionOutputModes.FULL,
+                       probabilities=None, classes=None,
+                       score_name: str = 'probability'):
+    """
+    full - признаки вместе с предсказаниями; predictions - только
+    предсказания (и вероятности) со столбцом row_index - индексом строки
+    исходного датафрейма. Признаки к ним не присоединяются: клиент сам
+    соединяет предсказания с исходным датафреймом по row_index. score_name -
+    префикс столбцов оценок ('score' для decision_function).
+    """
+    if output_mode == PredictionOutputModes.FULL:
+        predictions_df = pd.concat([features.reset_index(drop=True),
+                                    res_column.reset_index(drop=True)], axis=1)
+        return predictions_df
+    predictions_df = res_column.reset_index(drop=True).to_frame()
+    predictions_df.insert(0, ROW_INDEX_COLUMN, np.asarray(features.index))
+    if (output_mode == PredictionOutputModes.PREDICTIONS_WITH_PROBABILITIES
+            and probabilities is not None):
+        probabilities = np.asarray(probabilities)
+        if probabilities.ndim == 1:
+            predictions_df[score_name] = probabilities
+        else:
+            if classes is None or len(classes) != probabilities.shape[1]:
+                classes = range(probabilities.shape[1])
+            for i, class_name in enumerate(classes):
+                predictions_df[f'{score_name}_{class_name}'] = \
+                    probabilities[:, i]
+    return predictions_df
+
+
+def _get_scores(model, features: pd.DataFrame):
+    try:
+        return model.predict_proba(features)
+    except AttributeError:
+        try:
+            return model.decision_function(features)
+        except AttributeError:
+            return None
+
+
+def _get_labels_from_scores(model, scores):
+    # predict у libsvm не совпадает с argmax predict_proba (калибровка Платта)
+    classes = getattr(model, 'classes_', None)
+    if classes is None or isinstance(model, (SVC, NuSVC)):
+        return None
+    classes = np.asarray(classes)
+    scores = np.asarray(scores)
+    if scores.ndim == 1:  # decision_function бинарной классификации
+        return classes[(scores > 0).astype(int)]
+    return classes[np.argmax(scores, axis=1)]
+
+
+def format_probabilities(scores):
+    if scores is not None and scores.ndim == 2 and scores.shape[1] == 2:
+        return scores[:, 1]  # Бинарная классификация
+    return scores
+
+
+def predict_with_scores(model, features: pd.DataFrame):
+    """
+    Предсказания классов и вероятности (или decision_function) за один
+    проход модели по выборке.
+    """
+    scores = _get_scores(model, features)
+    predictions = None
+    if scores is not None:
+        predictions = _get_labels_from_scores(model, scores)
+    if predictions is None:
+        predictions = model.predict(features)
+    return predictions, format_probabilities(scores)
+
+
+def predict_with_score_method(model, features: pd.DataFrame,
+                              score_method: str):
+    """
+    Предсказания классов и оценки выбранного метода модели (predict_proba
+    или decision_function) за один проход модели по выборке.
+    """
+    scores = np.asarray(getattr(model, score_method)(features))
+    predictions = _get_labels_from_scores(model, scores)
+    if predictions is None:
+        predictions = model.predict(features)
+    return predictions, scores
+
+
+def get_scores_df(features: pd.DataFrame, scores, classes=None
+                  ) -> pd.DataFrame:
+    """Оценки модели во float32 с индексом строк исходного датафрейма."""
+    scores = np.asarray(scores, dtype=np.float32)
+    if scores.ndim == 1:
+        return pd.DataFrame({'score': scores}, index=features.index)
+    if classes is None or len(classes) != scores.shape[1]:
+        classes = range(scores.shape[1])
+    return pd.DataFrame(scores, index=features.index,
+                        columns=[f'score_{class_name}'
+                                 for class_name in classes])
+
+
+def get_n_jobs(model):
+    if isinstance(model, (CatBoostClassifier, CatBoostRegressor)):
+        return model.get_params().get('thread_count')
+    return model.get_params(deep=False).get('n_jobs')
+
+
+def set_n_jobs(model, n_jobs: int):
+    """Задает число потоков модели, если она поддерживает многопоточность."""
+    if isinstance(model, (CatBoostClassifier, CatBoostRegressor)):
+        model.set_params(thread_count=n_jobs)
+    elif 'n_jobs' in model.get_params(deep=False):
+        model.set_params(n_jobs=n_jobs)
+
+
+def get_data_version(features: pd.DataFrame, target=None) -> str:
+    """Хэш содержимого признаков и целевой переменной."""
+    data = features if target is None \
+        else pd.concat([features, target], axis=1)
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    columns = ','.join(map(str, data.columns)).encode()
+    return hashlib.sha1(columns + row_hashes.tobytes()).hexdigest()
+
+
+def create_onnx_session(onnx_model: bytes, n_threads: int = 1):
+    from onnxruntime import InferenceSession, SessionOptions
+
+    options = SessionOptions()
+    options.intra_op_num_threads = n_threads
+    options.log_severity_level = 3
+    return InferenceSession(onnx_model, options,
+                            providers=['CPUExecutionProvider'])
 
 
-def get_predictions_df(features: pd.DataFrame, res_column: pd.Series):
-    predictions_df = pd.concat([features.reset_index(drop=True),
-                                res_column.reset_index(drop=True)], axis=1)
-    return predictions_df
\ No newline at end of file
+def run_onnx_predict(session, features: np.ndarray) -> np.ndarray:
+    """Предсказания ONNX-модели: первый выход - метки или значения."""
+    input_name = session.get_inputs()[0].name
+    outputs = session.run(None, {input_name: features.astype(np.float32)})
+    return np.asarray(outputs[0]).ravel()
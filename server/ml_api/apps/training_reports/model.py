@@ -17,6 +17,8 @@ class Report(Document):
     task_type: AvailableTaskTypes = None
     report_type: ReportTypes = None
     body: Dict = None
+    # метрики завышены: модель видела строки, на которых оценивалась
+    optimistic_bias: bool = False
 
     created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
 
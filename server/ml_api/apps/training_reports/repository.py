@@ -1,6 +1,7 @@
 from typing import List
 
 from bunnet import PydanticObjectId
+from bunnet.operators import In
 
 from ml_api.apps.training_reports.model import Report
 from ml_api.apps.training_reports.errors import ReportNotFoundError
@@ -39,3 +40,8 @@ class TrainingReportCRUD:
         if report is None:
             raise ReportNotFoundError(report)
         return report.delete()
+
+    def delete_by_model_ids(self, model_ids: List[PydanticObjectId]):
+        Report.find(
+            Report.user_id == self.user_id,
+            In(Report.model_id, model_ids)).delete().run()
@@ -99,6 +99,8 @@ def get_report_schema(report_task_type: specs.ReportTaskTypes):
         return schemas.DimensionalityReductionReport.schema()
     elif report_task_type == specs.ReportTaskTypes.OUTLIER_DETECTION:
         return schemas.OutlierDetectionReport.schema()
+    elif report_task_type == specs.ReportTaskTypes.CROSS_VALIDATION:
+        return schemas.CrossValidationReport.schema()
     else:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -34,10 +34,10 @@ class MulticlassClassificationReport(BaseModel):
 
 
 class RegressionReport(BaseModel):
-    mse: List[float]
-    mae: List[float]
-    rmse: List[float]
-    mape: List[float]
+    mse: float
+    mae: float
+    rmse: float
+    mape: float
 
 
 class ClusteringReport(BaseModel):
@@ -56,5 +56,12 @@ class DimensionalityReductionReport(BaseModel):
     explained_variance: List[float]
 
 
+class CrossValidationReport(BaseModel):
+    n_folds: int
+    mean_metrics: Dict[str, float]
+    std_metrics: Dict[str, float]
+    folds: List[Dict[str, Optional[float]]]
+
+
 class ErrorReport(BaseModel):
     error_description: str
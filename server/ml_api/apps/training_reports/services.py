@@ -11,11 +11,26 @@ from sklearn.decomposition import PCA
 import numpy as np
 import pandas as pd
 
+from ml_api import config
 from ml_api.apps.ml_models.specs import AvailableTaskTypes
 from ml_api.apps.training_reports import model, schemas
 from ml_api.apps.training_reports.specs import ReportTypes
 
 
+def sampled_silhouette_score(features, labels) -> float:
+    """
+    Коэффициент силуэта по случайной подвыборке не больше
+    SILHOUETTE_SAMPLE_SIZE строк: полный расчет квадратичен по числу строк.
+    Попарные расстояния sklearn считает по частям, подвыборка фиксирована
+    для воспроизводимости отчетов.
+    """
+    sample_size = config.SILHOUETTE_SAMPLE_SIZE
+    if sample_size is None or len(features) <= sample_size:
+        return float(silhouette_score(features, labels))
+    return float(silhouette_score(features, labels, sample_size=sample_size,
+                                  random_state=0))
+
+
 class ReportCreatorService:
 
     def score_regression(self, target,
@@ -129,7 +144,7 @@ class ReportCreatorService:
         report_type = ReportTypes.TRAIN if is_train else ReportTypes.VALID
 
         body = schemas.ClusteringReport(
-            silhouette_score=silhouette_score(features, labels),
+            silhouette_score=sampled_silhouette_score(features, labels),
             davies_bouldin_score=davies_bouldin_score(features, labels),
             two_dim_representation=self._get_two_dim_representation(
                 features, labels),
@@ -160,6 +175,28 @@ class ReportCreatorService:
                              report_type=report_type,
                              body=body)
 
+    def aggregate_cross_validation(self, task_type: AvailableTaskTypes,
+                                   fold_reports: List[model.Report]
+                                   ) -> model.Report:
+        # Скалярные метрики каждого фолда, кривые (fpr/tpr) не агрегируются
+        folds = [{name: value for name, value in dict(report.body).items()
+                  if isinstance(value, (int, float))
+                  and not isinstance(value, bool)}
+                 for report in fold_reports]
+        metric_names = dict.fromkeys(name for fold in folds for name in fold)
+        mean_metrics, std_metrics = {}, {}
+        for name in metric_names:
+            values = [fold[name] for fold in folds if name in fold]
+            mean_metrics[name] = float(np.mean(values))
+            std_metrics[name] = float(np.std(values))
+        body = schemas.CrossValidationReport(n_folds=len(folds),
+                                             mean_metrics=mean_metrics,
+                                             std_metrics=std_metrics,
+                                             folds=folds)
+        return model.Report(task_type=task_type,
+                            report_type=ReportTypes.CROSS_VALIDATION,
+                            body=body)
+
     def _get_two_dim_representation(self, features, target) -> schemas.TwoDimRepresentation:
         # Двухмерное представление данных для визуализации
         pca = PCA(n_components=2)
@@ -167,7 +204,7 @@ class ReportCreatorService:
             pca.fit_transform(features), columns=['first_dim', 'second_dim'])
         two_dim_representation = pd.concat(
             [two_dim_representation.reset_index(drop=True),
-             target.reset_index(drop=True)], axis=1)
+             target.reset_index(drop=True).rename('target')], axis=1)
         return schemas.TwoDimRepresentation(**two_dim_representation.to_dict('list'))
 
     def _get_cluster_feature_means(self, features, labels
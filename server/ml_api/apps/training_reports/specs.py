@@ -4,6 +4,7 @@ from enum import Enum
 class ReportTypes(Enum):
     TRAIN = 'Train'
     VALID = 'Valid'
+    CROSS_VALIDATION = 'CrossValidation'
     ERROR = 'Error'
 
 
@@ -14,4 +15,5 @@ class ReportTaskTypes(Enum):
     CLUSTERING = 'Clustering'
     DIMENSIONALITY_REDUCTION = 'DimensionalityReduction'
     OUTLIER_DETECTION = 'OutlierDetection'
+    CROSS_VALIDATION = 'CrossValidation'
 
@@ -1,13 +1,12 @@
 from celery import Celery
 from celery.signals import worker_process_init
-from bunnet import init_bunnet
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError
+from threadpoolctl import threadpool_limits
 
 from ml_api import config
+from ml_api.common.database.mongo_client import init_database
 from ml_api.apps.users.model import User
 from ml_api.apps.dataframes.model import DataFrameMetadata
-from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.model import ModelMetadata, ParamsSearchHistory
 from ml_api.apps.training_reports.model import Report
 from ml_api.apps.jobs.model import BackgroundJob
 
@@ -17,15 +16,23 @@ app_celery = Celery(
     backend=config.BACKEND_URI,
     include=["ml_api.common.celery_tasks.celery_tasks"],
 )
+# бэкенд результатов использует тот же размер пула, что и процессы воркера
+app_celery.conf.mongodb_backend_settings = {
+    'options': {
+        'maxPoolSize': config.MONGO_WORKER_MAX_POOL_SIZE,
+        'maxConnecting': config.MONGO_MAX_CONNECTING,
+        'maxIdleTimeMS': config.MONGO_MAX_IDLE_TIME_MS,
+    },
+}
 
 
 @worker_process_init.connect
 def on_worker_init(*args, **kwargs):
-    db = MongoClient(config.MONGO_DATABASE_URI)[config.MONGO_DB_NAME]
-    try:
-        init_bunnet(db,
-            document_models=[User, DataFrameMetadata, ModelMetadata, Report,
-                             BackgroundJob])
-    except ServerSelectionTimeoutError as sste:
-        print(sste)
+    init_database(
+        document_models=[User, DataFrameMetadata, ModelMetadata, Report,
+                         BackgroundJob, ParamsSearchHistory],
+        max_pool_size=config.MONGO_WORKER_MAX_POOL_SIZE)
     print("Bunnet initialized")
+    # BLAS/OpenMP потоки процесса ограничены бюджетом одной задачи: процесс
+    # воркера выполняет задачи по одной
+    threadpool_limits(limits=config.JOB_N_JOBS)
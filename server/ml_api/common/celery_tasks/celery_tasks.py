@@ -5,6 +5,8 @@ from ml_api.apps.dataframes.services.methods_service import \
 from ml_api.apps.jobs.services import BackgroundJobsService
 from ml_api.apps.ml_models.services.fit_predict_service import \
     ModelFitPredictService
+from ml_api.apps.ml_models.specs import PredictionOutputModes, \
+    PredictionScoreTypes
 from ml_api.common.pubsub.client import get_pubsub_client
 from ml_api.celery_worker import app_celery
 from ml_api.apps.dataframes import schemas, specs
@@ -108,6 +110,29 @@ def process_composition_training(self, user_id: str, job_id: str):
     pubsub.publish_to_channel(job_info)
 
 
+@app_celery.task(name="process_model_update", bind=True)
+def process_model_update(self, user_id: str, job_id: str):
+    job_service = BackgroundJobsService(user_id)
+    job = job_service.run_job(job_id)
+    try:
+        model_id = job.object_id
+        dataframe_id = job.input_params["dataframe_id"]
+        n_iterations = job.input_params["n_iterations"]
+        ModelFitPredictService(user_id).update_model(
+            model_id, dataframe_id, n_iterations
+        )
+    except HTTPException as err:
+        message = _process_http_exception(err)
+        job_info = job_service.error_job(job.id, message)
+    except Exception as err:
+        message = _process_exception(err)
+        job_info = job_service.error_job(job.id, message)
+    else:
+        job_info = job_service.complete_job(job.id)
+    pubsub = get_pubsub_client()
+    pubsub.publish_to_channel(job_info)
+
+
 @app_celery.task(name="process_prediction", bind=True)
 def process_prediction(self, user_id: str, job_id: str):
     job_service = BackgroundJobsService(user_id)
@@ -117,8 +142,15 @@ def process_prediction(self, user_id: str, job_id: str):
         dataframe_id = job.input_params["dataframe_id"]
         prediction_name = job.input_params["prediction_name"]
         apply_pipeline = job.input_params["apply_pipeline"]
+        prediction_output = PredictionOutputModes(
+            job.input_params.get("prediction_output",
+                                 PredictionOutputModes.FULL.value))
+        score_type = job.input_params.get("score_type")
+        if score_type is not None:
+            score_type = PredictionScoreTypes(score_type)
         ModelFitPredictService(user_id).predict_on_model(
-            dataframe_id, model_id, prediction_name, apply_pipeline
+            dataframe_id, model_id, prediction_name, apply_pipeline,
+            prediction_output, score_type
         )
     except HTTPException as err:
         message = _process_http_exception(err)
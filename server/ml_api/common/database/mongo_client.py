@@ -0,0 +1,156 @@
+import os
+from collections import Counter
+from threading import Lock
+from typing import Dict, List, Optional
+
+from bunnet import init_bunnet
+from pymongo import MongoClient
+from pymongo import monitoring
+from pymongo.errors import ServerSelectionTimeoutError
+
+from ml_api import config
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Считает события пулов соединений клиента MongoDB по адресам серверов:
+    открытые и закрытые соединения, выдачи соединений из пула, неудачные
+    ожидания свободного соединения и сбросы пула.
+    """
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._lock = Lock()
+
+    def _inc(self, address, *names: str):
+        address = f"{address[0]}:{address[1]}"
+        with self._lock:
+            counter = self._counters.setdefault(address, Counter())
+            for name in names:
+                counter[name] += 1
+
+    def pool_created(self, event):
+        self._inc(event.address, 'pools_created')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._inc(event.address, 'pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._inc(event.address, 'connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._inc(event.address, 'connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._inc(event.address, 'checkouts_failed')
+
+    def connection_checked_out(self, event):
+        self._inc(event.address, 'checkouts')
+
+    def connection_checked_in(self, event):
+        self._inc(event.address, 'checkins')
+
+    def get_metrics(self) -> List[Dict]:
+        with self._lock:
+            counters = {address: dict(counter)
+                        for address, counter in self._counters.items()}
+        metrics = []
+        for address, counter in counters.items():
+            created = counter.get('connections_created', 0)
+            closed = counter.get('connections_closed', 0)
+            checkouts = counter.get('checkouts', 0)
+            checkins = counter.get('checkins', 0)
+            metrics.append({
+                'address': address,
+                'open_connections': created - closed,
+                'in_use_connections': checkouts - checkins,
+                **counter,
+            })
+        return metrics
+
+
+class MongoClientFactory:
+    """
+    Единственный клиент MongoDB процесса (воркера uvicorn или процесса
+    celery) с явно настроенным пулом соединений. Клиент создается лениво
+    и пересоздается в дочернем процессе после fork: клиенты pymongo нельзя
+    разделять между процессами.
+    """
+    def __init__(self, uri: str, db_name: str, pool_options: Dict):
+        self.uri = uri
+        self.db_name = db_name
+        self.pool_options = pool_options
+        self._client: Optional[MongoClient] = None
+        self._pid: Optional[int] = None
+        self._listener: Optional[PoolMetricsListener] = None
+        self._lock = Lock()
+
+    def get_client(self, max_pool_size: Optional[int] = None) -> MongoClient:
+        """Клиент процесса; max_pool_size учитывается при его создании."""
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                pool_options = dict(self.pool_options)
+                if max_pool_size is not None:
+                    pool_options['maxPoolSize'] = max_pool_size
+                self._listener = PoolMetricsListener()
+                self._client = MongoClient(
+                    self.uri, event_listeners=[self._listener],
+                    **pool_options)
+                self._pid = os.getpid()
+            return self._client
+
+    def get_database(self, max_pool_size: Optional[int] = None):
+        return self.get_client(max_pool_size)[self.db_name]
+
+    def get_pool_metrics(self) -> Dict:
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                return {'pid': os.getpid(), 'pools': []}
+            pool_options = self._client.options.pool_options
+            return {
+                'pid': self._pid,
+                'max_pool_size': pool_options.max_pool_size,
+                'min_pool_size': pool_options.min_pool_size,
+                'pools': self._listener.get_metrics(),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+
+mongo_client_factory = MongoClientFactory(
+    config.MONGO_DATABASE_URI, config.MONGO_DB_NAME,
+    pool_options={
+        'maxPoolSize': config.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': config.MONGO_MIN_POOL_SIZE,
+        'maxConnecting': config.MONGO_MAX_CONNECTING,
+        'maxIdleTimeMS': config.MONGO_MAX_IDLE_TIME_MS,
+        'waitQueueTimeoutMS': config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        'connectTimeoutMS': config.MONGO_CONNECT_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    })
+
+
+def init_database(document_models: List, max_pool_size: Optional[int] = None):
+    """Инициализирует bunnet на общем клиенте процесса."""
+    db = mongo_client_factory.get_database(max_pool_size)
+    try:
+        init_bunnet(db, document_models=document_models)
+    except ServerSelectionTimeoutError as sste:
+        print(sste)
+    return db
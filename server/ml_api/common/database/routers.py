@@ -0,0 +1,25 @@
+from typing import Dict
+
+from fastapi import APIRouter, Depends
+
+from ml_api.apps.users.services import current_superuser
+from ml_api.apps.users.model import User
+from ml_api.common.database.mongo_client import mongo_client_factory
+
+database_router = APIRouter(
+    prefix="/database",
+    tags=["Database"],
+)
+
+
+@database_router.get("/pool_metrics",
+                     summary="Получить метрики пула соединений MongoDB")
+def get_pool_metrics(
+        user: User = Depends(current_superuser),
+) -> Dict:
+    """
+        Возвращает настройки и счетчики пула соединений MongoDB процесса,
+        обработавшего запрос (у каждого воркера API свой пул). Доступно
+        только суперпользователям.
+    """
+    return mongo_client_factory.get_pool_metrics()
@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from ml_api import config
+
+
+class HeavyRequestsExecutor:
+    """
+    Выполняет блокирующую работу тяжелых эндпоинтов (pandas, файлы,
+    обучение) в отдельном пуле потоков фиксированного размера. Пул потоков
+    Starlette остается свободным для легких эндпоинтов метаданных, а
+    тяжелые запросы ждут свободный поток в очереди. Одновременно у одного
+    пользователя выполняется не больше per_user_limit тяжелых запросов.
+    Группы запросов (group_limits) ограничиваются у пользователя отдельно
+    от остальных тяжелых запросов со своим лимитом.
+    """
+    def __init__(self, max_workers: int, per_user_limit: int,
+                 group_limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max_workers
+        self.per_user_limit = per_user_limit
+        self.group_limits = group_limits or {}
+        self._executor = None
+        # семафор и число ожидающих/выполняющихся запросов пользователя
+        # в группе; словарь меняется только в потоке цикла событий
+        self._user_slots: Dict[Hashable, List] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='heavy')
+        return self._executor
+
+    async def run(self, user_id: Hashable, func: Callable, *args,
+                  **kwargs) -> Any:
+        return await self.run_in_group(None, user_id, func, *args, **kwargs)
+
+    async def run_in_group(self, group: Optional[str], user_id: Hashable,
+                           func: Callable, *args, **kwargs) -> Any:
+        slot_key = (group, str(user_id))
+        slot = self._user_slots.get(slot_key)
+        if slot is None:
+            limit = self.group_limits.get(group, self.per_user_limit)
+            slot = self._user_slots[slot_key] = [asyncio.Semaphore(limit), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                loop = asyncio.get_running_loop()
+                # контекст запроса (contextvars) доступен в потоке пула
+                context = contextvars.copy_context()
+                return await loop.run_in_executor(
+                    self._get_executor(),
+                    functools.partial(context.run, func, *args, **kwargs))
+        finally:
+            slot[1] -= 1
+            if slot[1] == 0:
+                del self._user_slots[slot_key]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# онлайн-предсказания объединяются в пакеты, только если выполняются
+# одновременно - им нужен свой, более высокий лимит
+ONLINE_PREDICTIONS_GROUP = 'online_predictions'
+
+heavy_executor = HeavyRequestsExecutor(
+    config.HEAVY_EXECUTOR_WORKERS, config.HEAVY_REQUESTS_PER_USER,
+    group_limits={
+        ONLINE_PREDICTIONS_GROUP: config.ONLINE_PREDICTIONS_PER_USER})
@@ -1,9 +1,14 @@
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterable
 
 from fastapi.responses import FileResponse
 from fastapi import HTTPException, status
 
+# Число потоков для пакетного удаления файлов
+DELETE_N_THREADS = 8
+
 
 class FileCRUD:
 
@@ -28,3 +33,9 @@ class FileCRUD:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"CRITICAL: File {path.name} not found"
             )
+
+    def _delete_many(self, paths: Iterable[Path]):
+        """Удаляет файлы параллельно, отсутствующие файлы пропускаются."""
+        with ThreadPoolExecutor(max_workers=DELETE_N_THREADS) as executor:
+            list(executor.map(lambda path: path.unlink(missing_ok=True),
+                              paths))
@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Hashable, Optional, Tuple, Type
+
+from bunnet import Document
+
+# Документы, загруженные в рамках текущего запроса: (класс, id) -> документ.
+# Вне запроса (celery-задачи, скрипты) карта не задана и не используется.
+_identity_map: ContextVar[Optional[Dict[Tuple[Type, Hashable], Document]]] = \
+    ContextVar('identity_map', default=None)
+
+
+@contextmanager
+def identity_map_scope():
+    """Карта документов на время блока: каждый документ читается один раз."""
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+def get_document(document_class: Type[Document], document_id
+                 ) -> Optional[Document]:
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return None
+    document = identity_map.get((document_class, str(document_id)))
+    # вызывающий код может менять полученный документ - отдаем копию
+    return document.copy(deep=True) if document is not None else None
+
+
+def put_document(document: Document):
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        identity_map[(type(document), str(document.id))] = \
+            document.copy(deep=True)
+
+
+def discard_document(document_class: Type[Document], document_id):
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        identity_map.pop((document_class, str(document_id)), None)
+
+
+class IdentityMapMiddleware:
+    """
+    ASGI-middleware: своя карта документов на каждый HTTP-запрос. Карта
+    видна и в потоках, где выполняются синхронные эндпоинты, так как они
+    запускаются с копией контекста запроса.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        with identity_map_scope():
+            await self.app(scope, receive, send)
@@ -1,10 +1,12 @@
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from bunnet import init_bunnet
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError
 
 from ml_api import config
+from ml_api.common.database.mongo_client import init_database, \
+    mongo_client_factory
+from ml_api.common.database.routers import database_router
+from ml_api.common.executor.heavy_executor import heavy_executor
+from ml_api.common.identity_map.identity_map import IdentityMapMiddleware
 from ml_api.apps.users.routers import users_router
 from ml_api.apps.dataframes.routers import (
     dataframes_file_router,
@@ -24,7 +26,7 @@ from ml_api.apps.jobs.routers import (
 
 from ml_api.apps.users.model import User
 from ml_api.apps.dataframes.model import DataFrameMetadata
-from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.model import ModelMetadata, ParamsSearchHistory
 from ml_api.apps.training_reports.model import Report
 from ml_api.apps.jobs.model import BackgroundJob
 
@@ -42,6 +44,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(IdentityMapMiddleware)
 
 
 # @app.exception_handler(ApplyFunctionException)
@@ -55,13 +58,15 @@ app.add_middleware(
 @app.on_event("startup")
 def app_init():
     """Initialize application services"""
-    app.db = MongoClient(config.MONGO_DATABASE_URI)[config.MONGO_DB_NAME]
-    try:
-        init_bunnet(app.db,
-            document_models=[User, DataFrameMetadata, ModelMetadata, Report,
-                             BackgroundJob])
-    except ServerSelectionTimeoutError as sste:
-        print(sste)
+    app.db = init_database(
+        document_models=[User, DataFrameMetadata, ModelMetadata, Report,
+                         BackgroundJob, ParamsSearchHistory])
+
+
+@app.on_event("shutdown")
+def app_shutdown():
+    heavy_executor.shutdown()
+    mongo_client_factory.close()
 
 
 api_router = APIRouter(prefix=config.API_PREFIX)
@@ -79,4 +84,5 @@ api_router.include_router(dataframes_specs_router)
 api_router.include_router(models_specs_router)
 api_router.include_router(reports_specs_router)
 api_router.include_router(jobs_specs_router)
+api_router.include_router(database_router)
 app.include_router(api_router)
@@ -0,0 +1,134 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# пакет ml_api лежит в каталоге server, настройки читаются из окружения
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'server'))
+for name in ('MONGO_USER', 'MONGO_PASSWORD', 'CENTRIFUDO_API_KEY',
+             'CENTRIFUGO_HMAC', 'RABBITMQ_DEFAULT_USER',
+             'RABBITMQ_DEFAULT_PASS', 'USER_SECRET'):
+    os.environ.setdefault(name, 'test')
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """Инициализирует bunnet на базе mongomock."""
+    mongomock = pytest.importorskip('mongomock')
+    from bunnet import init_bunnet
+    from mongomock import collection, filtering
+    from mongomock.database import Database
+
+    from ml_api.apps.users.model import User
+    from ml_api.apps.dataframes.model import DataFrameMetadata
+    from ml_api.apps.ml_models.model import ModelMetadata, \
+        ParamsSearchHistory
+    from ml_api.apps.training_reports.model import Report
+    from ml_api.apps.jobs.model import BackgroundJob
+
+    command = Database.command
+
+    def command_with_build_info(self, cmd, *args, **kwargs):
+        # bunnet проверяет версию сервера при инициализации
+        if isinstance(cmd, dict) and 'buildInfo' in cmd:
+            return {'version': '6.0.0'}
+        return command(self, cmd, *args, **kwargs)
+
+    monkeypatch.setattr(Database, 'command', command_with_build_info)
+
+    filter_applies = filtering.filter_applies
+
+    def as_str_keys(value):
+        # ключи-ExpressionField bunnet сравниваются с операторами фильтра
+        # как выражения, а не как строки
+        if isinstance(value, dict):
+            return {str(key): as_str_keys(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [as_str_keys(item) for item in value]
+        return value
+
+    def filter_applies_by_str_keys(search_filter, document, *args, **kwargs):
+        return filter_applies(as_str_keys(search_filter), document,
+                              *args, **kwargs)
+
+    monkeypatch.setattr(filtering, 'filter_applies',
+                        filter_applies_by_str_keys)
+    monkeypatch.setattr(collection, 'filter_applies',
+                        filter_applies_by_str_keys)
+    db = mongomock.MongoClient().db
+    init_bunnet(db, document_models=[User, DataFrameMetadata, ModelMetadata,
+                                     Report, BackgroundJob,
+                                     ParamsSearchHistory])
+    return db
+
+
+@pytest.fixture
+def root_dir(tmp_path, monkeypatch):
+    """Каталог файлов пользователей во временной папке."""
+    from ml_api.apps.dataframes.repositories import \
+        file_repository as dataframes_file_repository
+    from ml_api.apps.ml_models.repositories import \
+        file_repository as models_file_repository
+
+    monkeypatch.setattr(dataframes_file_repository, 'ROOT_DIR',
+                        str(tmp_path))
+    monkeypatch.setattr(models_file_repository, 'ROOT_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def user_id():
+    from bunnet import PydanticObjectId
+    return PydanticObjectId()
+
+
+@pytest.fixture
+def create_dataframe(mongo_db, root_dir, user_id):
+    """Сохраняет датафрейм пользователя: метаданные и csv-файл."""
+    from ml_api.apps.dataframes.model import DataFrameMetadata
+    from ml_api.apps.dataframes.schemas import ColumnTypes
+    from ml_api.apps.dataframes.repositories.file_repository import \
+        DataFrameFileCRUD
+
+    def create(df, numeric=(), categorical=(), target=None,
+               filename='data', parent_id=None, is_prediction=False):
+        dataframe_meta = DataFrameMetadata(
+            filename=filename, user_id=user_id, parent_id=parent_id,
+            is_prediction=is_prediction,
+            feature_columns_types=ColumnTypes(numeric=list(numeric),
+                                              categorical=list(categorical)),
+            target_feature=target)
+        dataframe_meta.insert()
+        DataFrameFileCRUD(user_id).save_csv(dataframe_meta.id, df)
+        return dataframe_meta
+    return create
+
+
+@pytest.fixture
+def create_model(mongo_db, root_dir, user_id):
+    """Сохраняет обученную модель пользователя: метаданные и файл."""
+    from ml_api.apps.ml_models import specs
+    from ml_api.apps.ml_models.model import ModelMetadata
+    from ml_api.apps.ml_models.schemas import ModelParams
+    from ml_api.apps.ml_models.repositories.repository_manager import \
+        ModelRepositoryManager
+
+    def create(model, dataframe_meta, model_type, task_type, params=None,
+               filename='model'):
+        model_meta = ModelMetadata(
+            filename=filename, user_id=user_id,
+            dataframe_id=dataframe_meta.id, task_type=task_type,
+            model_params=ModelParams(model_type=model_type,
+                                     params=params or {}),
+            params_type=specs.AvailableParamsTypes.DEFAULT,
+            feature_columns=[column for column in
+                             dataframe_meta.feature_columns_types.numeric +
+                             dataframe_meta.feature_columns_types.categorical
+                             if column != dataframe_meta.target_feature],
+            target_column=dataframe_meta.target_feature,
+            status=specs.ModelStatuses.TRAINED)
+        model_meta.insert()
+        ModelRepositoryManager(user_id).save_new_model(model_meta.id, model)
+        return ModelMetadata.get(model_meta.id).run()
+    return create
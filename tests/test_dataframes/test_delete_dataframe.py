@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from ml_api.apps.dataframes.model import DataFrameMetadata
+from ml_api.apps.dataframes.repositories.file_repository import \
+    DataFrameFileCRUD
+from ml_api.apps.dataframes.services.dataframe_service import \
+    DataframeService
+from ml_api.apps.jobs import specs as jobs_specs
+from ml_api.apps.jobs.model import BackgroundJob
+from ml_api.apps.ml_models import specs
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.training_reports.model import Report
+
+
+@pytest.fixture
+def source_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(40, 2)), columns=['a', 'b'])
+    df['y'] = (df.a > 0).astype(int)
+    return df
+
+
+def add_job(user_id, object_type, object_id):
+    return BackgroundJob(user_id=user_id,
+                         type=jobs_specs.AvailableJobTypes.APPLY_METHODS,
+                         object_type=object_type,
+                         object_id=object_id).insert()
+
+
+def test_delete_dataframe_removes_subtree(user_id, source_df,
+                                          create_dataframe, create_model):
+    columns = dict(numeric=['a', 'b'], categorical=['y'], target='y')
+    root = create_dataframe(source_df, **columns)
+    child = create_dataframe(source_df, filename='child', parent_id=root.id,
+                             **columns)
+    grandchild = create_dataframe(source_df, filename='grandchild',
+                                  parent_id=child.id, **columns)
+    other = create_dataframe(source_df, filename='other', **columns)
+    model = LogisticRegression().fit(source_df[['a', 'b']], source_df.y)
+    model_meta = create_model(model, child,
+                              specs.AvailableModelTypes.LOGISTIC_REGRESSION,
+                              specs.AvailableTaskTypes.CLASSIFICATION)
+    other_model_meta = create_model(
+        model, other, specs.AvailableModelTypes.LOGISTIC_REGRESSION,
+        specs.AvailableTaskTypes.CLASSIFICATION, filename='other_model')
+    prediction = create_dataframe(source_df, filename='prediction',
+                                  is_prediction=True)
+    model_meta.update({'$push': {ModelMetadata.model_prediction_ids:
+                                 prediction.id}})
+    Report(user_id=user_id, model_id=model_meta.id,
+           dataframe_id=child.id).insert()
+    Report(user_id=user_id, model_id=other_model_meta.id,
+           dataframe_id=other.id).insert()
+    dataframe_job = jobs_specs.AvailableObjectTypes.DATAFRAME
+    model_job = jobs_specs.AvailableObjectTypes.MODEL
+    for object_id in (root.id, grandchild.id, prediction.id, other.id):
+        add_job(user_id, dataframe_job, object_id)
+    for object_id in (model_meta.id, other_model_meta.id):
+        add_job(user_id, model_job, object_id)
+
+    DataframeService(user_id).delete_dataframe(root.id)
+
+    remaining_dataframes = {dataframe_meta.id for dataframe_meta in
+                            DataFrameMetadata.find_all().run()}
+    assert remaining_dataframes == {other.id}
+    assert [meta.id for meta in ModelMetadata.find_all().run()] == \
+        [other_model_meta.id]
+    assert [report.model_id for report in Report.find_all().run()] == \
+        [other_model_meta.id]
+    assert {job.object_id for job in BackgroundJob.find_all().run()} == \
+        {other.id, other_model_meta.id}
+    file_crud = DataFrameFileCRUD(user_id)
+    for dataframe_meta in (root, child, grandchild, prediction):
+        assert not file_crud._get_csv_path(dataframe_meta.id).exists()
+    assert file_crud._get_csv_path(other.id).exists()
+
+
+def test_prediction_can_not_be_deleted_as_dataframe(user_id, source_df,
+                                                    create_dataframe):
+    from ml_api.apps.dataframes import errors
+
+    prediction = create_dataframe(source_df, is_prediction=True)
+
+    with pytest.raises(errors.DataFrameIsPredictionError):
+        DataframeService(user_id).delete_dataframe(prediction.id)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_api.apps.dataframes import schemas
+from ml_api.apps.dataframes.model import DataFrameMetadata
+from ml_api.apps.dataframes.repositories.file_repository import \
+    DataFrameFileCRUD
+from ml_api.apps.dataframes.repositories.repository_manager import \
+    DataframeRepositoryManager
+from ml_api.apps.dataframes.services.methods_service import \
+    DataframeMethodsService
+from ml_api.apps.dataframes.services.processors.methods_applier import \
+    MethodsApplier, MethodsApplierValidator
+
+CHUNK_SIZE = 50
+
+
+def make_features(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'x': rng.integers(0, 100, n_rows).astype(float),
+        'c': rng.choice(['1', '2', '3'], n_rows),
+    })
+
+
+@pytest.fixture
+def source_meta(user_id, create_dataframe):
+    """Датафрейм с пайплайном, который повторяется для предсказаний."""
+    df = make_features(300, seed=0)
+    df['y'] = (df.x > 50).astype(int)
+    dataframe_meta = DataFrameMetadata(
+        filename='source', user_id=user_id,
+        feature_columns_types=schemas.ColumnTypes(numeric=['x'],
+                                                  categorical=['c', 'y']),
+        target_feature='y')
+    params = MethodsApplierValidator().validate_params([
+        schemas.ApplyMethodParams(method_name='one_hot_encoding',
+                                  columns=['c']),
+        schemas.ApplyMethodParams(method_name='standard_scaler',
+                                  columns=['x']),
+    ])
+    methods_applier = MethodsApplier(df, dataframe_meta, params)
+    methods_applier.apply_methods()
+    dataframe_meta = methods_applier.get_meta()
+    dataframe_meta.insert()
+    DataFrameFileCRUD(user_id).save_csv(dataframe_meta.id,
+                                        methods_applier.get_df())
+    return dataframe_meta
+
+
+def copy_pipeline_by_chunks(user_id, source_meta, target_meta):
+    return pd.concat(
+        DataframeMethodsService(user_id).copy_pipeline_for_prediction_chunks(
+            source_meta.id, target_meta.id, CHUNK_SIZE), ignore_index=True)
+
+
+def test_chunked_pipeline_matches_whole_frame(user_id, create_dataframe,
+                                              source_meta):
+    df = make_features(230, seed=1)
+    # в одной части числовой столбец дробный, в остальных целый
+    df.loc[60:70, 'x'] += 0.5
+    target_meta = create_dataframe(df, numeric=['x'], categorical=['c'],
+                                   filename='target')
+    service = DataframeMethodsService(user_id)
+
+    whole_frame = service.copy_pipeline_for_prediction(source_meta.id,
+                                                       target_meta.id)
+    chunked = copy_pipeline_by_chunks(user_id, source_meta, target_meta)
+
+    pd.testing.assert_frame_equal(chunked, whole_frame)
+
+
+def test_chunks_are_read_with_column_types(user_id, create_dataframe):
+    df = make_features(230, seed=2)
+    # пропуски только в последней части: без заданных типов она читается
+    # как float, и коды категорий становятся '1.0' вместо '1'
+    df.loc[220:, 'c'] = np.nan
+    dataframe_meta = create_dataframe(df, numeric=['x'], categorical=['c'])
+
+    chunks = list(DataframeRepositoryManager(
+        user_id).read_pandas_dataframe_chunks(dataframe_meta.id, CHUNK_SIZE))
+
+    for chunk in chunks:
+        assert chunk.x.dtype == np.float64
+        assert chunk.c.dtype == object
+    codes = pd.concat([chunk.c for chunk in chunks])
+    assert set(codes.dropna()) == {'1', '2', '3'}
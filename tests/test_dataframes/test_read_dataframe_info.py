@@ -1,20 +1,30 @@
+from bunnet import PydanticObjectId
 from fastapi.testclient import TestClient
-from server.ml_api.main import app
-from unittest.mock import patch
+
+from ml_api import config
+from ml_api.main import app
+from ml_api.apps.users.model import User
+from ml_api.apps.users.services import current_active_user
+from ml_api.apps.dataframes.model import DataFrameMetadata
 
 client = TestClient(app)
 
 
-def test_read_dataframe_info():
-    test_dataframe_id = "some_dataframe_id"
-    test_user = {"username": "testuser", "email": "testuser@example.com"}
+def test_read_dataframe_info(mongo_db):
+    test_user = User(id=PydanticObjectId(), email="testuser@example.com",
+                     hashed_password="hashed")
+    dataframe_meta = DataFrameMetadata(filename="data.csv",
+                                       user_id=test_user.id)
+    dataframe_meta.insert()
 
-    with patch("путь_к_модулю_зависимостей.current_active_user",
-               return_value=test_user):
-        response = client.get(
-            f"/dataframe/metadata?dataframe_id={test_dataframe_id}")
+    app.dependency_overrides[current_active_user] = lambda: test_user
+    try:
+        response = client.get(f"{config.API_PREFIX}/dataframe/metadata",
+                              params={"dataframe_id": str(dataframe_meta.id)})
+    finally:
+        app.dependency_overrides.clear()
 
     assert response.status_code == 200
     # Проверяем структуру ответа на соответствие ожидаемой
-    assert "some_key" in response.json()
-    # Другие проверки...
+    assert response.json()["_id"] == str(dataframe_meta.id)
+    assert response.json()["filename"] == "data.csv"
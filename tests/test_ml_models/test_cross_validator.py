@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from ml_api.apps.ml_models import specs
+from ml_api.apps.ml_models.services.processors.cross_validator import \
+    CrossValidationService
+
+
+def test_fold_without_rare_class_is_scored_by_its_classes(mongo_db,
+                                                          monkeypatch):
+    monkeypatch.setattr('ml_api.config.CV_N_JOBS', 1)
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.normal(size=(60, 2)), columns=['a', 'b'])
+    target = pd.Series(np.where(features.a > 0, 'high', 'low'), name='y')
+    # единственная строка редкого класса попадает в валидацию одного фолда
+    target.iloc[0] = 'rare'
+    model_meta = SimpleNamespace(
+        task_type=specs.AvailableTaskTypes.CLASSIFICATION,
+        target_column='y', stratify=False, cv_folds=3, cv_refit=True,
+        prediction_output=
+        specs.PredictionOutputModes.PREDICTIONS_WITH_PROBABILITIES)
+    service = CrossValidationService(model_meta, LogisticRegression())
+    folds = service._get_folds(features, target)
+    fold_results = service._fit_folds(features, target, folds)
+    rare_fold = next(i for i, (_, valid_idx) in enumerate(folds)
+                     if 0 in valid_idx)
+    model, preds, probs = fold_results[rare_fold]
+    assert list(model.classes_) == ['high', 'low']
+
+    report = service._score_fold(model, target,
+                                 target.iloc[folds[rare_fold][1]],
+                                 preds, probs)
+    assert report.body['accuracy'] is not None
+
+    results = service.cross_validate(features, target)
+    _, results_df = results.results[0]
+    assert list(results_df.columns) == ['row_index', 'y']
+
+
+def test_fold_roc_curves_use_model_classes(mongo_db, monkeypatch):
+    monkeypatch.setattr('ml_api.config.CV_N_JOBS', 1)
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.normal(size=(90, 2)), columns=['a', 'b'])
+    target = pd.Series(np.digitize(features.a, [-0.4, 0.4]), name='y')
+    model_meta = SimpleNamespace(
+        task_type=specs.AvailableTaskTypes.CLASSIFICATION,
+        target_column='y', stratify=True, cv_folds=3, cv_refit=True,
+        prediction_output=specs.PredictionOutputModes.FULL)
+    service = CrossValidationService(model_meta, LogisticRegression())
+    folds = service._get_folds(features, target)
+    model, preds, probs = service._fit_folds(features, target, folds)[0]
+
+    report = service._score_fold(model, target, target.iloc[folds[0][1]],
+                                 preds, probs)
+    assert report.body['roc_auc_weighted'] is not None
@@ -0,0 +1,117 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from threading import Event
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml_api.apps.ml_models.services.processors.micro_batcher import \
+    PredictionMicroBatcher
+
+
+def make_rows(start, n_rows):
+    return pd.DataFrame({'x': np.arange(start, start + n_rows)},
+                        index=np.arange(start, start + n_rows) * 10)
+
+
+def predict_concurrently(batcher, predict, frames, key='model'):
+    with ThreadPoolExecutor(len(frames)) as executor:
+        futures = [executor.submit(batcher.predict, key, predict, rows)
+                   for rows in frames]
+        return [future.result() for future in futures]
+
+
+def test_batch_predictions_are_scattered_to_requests():
+    calls = []
+
+    def predict(features):
+        calls.append(len(features))
+        return features.x.to_numpy() * 2
+
+    batcher = PredictionMicroBatcher(max_rows=100, max_wait=0.2)
+    frames = [make_rows(0, 3), make_rows(3, 1), make_rows(4, 5)]
+
+    results = predict_concurrently(batcher, predict, frames)
+
+    assert calls == [9]
+    for rows, predictions in zip(frames, results):
+        assert (predictions == rows.x.to_numpy() * 2).all()
+
+
+def test_failed_batch_falls_back_to_single_requests():
+    def predict(features):
+        if (features.x < 0).any():
+            raise ValueError('bad rows')
+        return features.x.to_numpy()
+
+    batcher = PredictionMicroBatcher(max_rows=100, max_wait=0.2)
+    frames = [make_rows(0, 2), make_rows(-5, 2), make_rows(2, 2)]
+
+    with ThreadPoolExecutor(len(frames)) as executor:
+        futures = [executor.submit(batcher.predict, 'model', predict, rows)
+                   for rows in frames]
+        assert (futures[0].result() == [0, 1]).all()
+        with pytest.raises(ValueError):
+            futures[1].result()
+        assert (futures[2].result() == [2, 3]).all()
+
+
+def test_failed_concat_falls_back_to_single_requests():
+    batcher = PredictionMicroBatcher(max_rows=100, max_wait=0.2)
+    frames = [make_rows(0, 2), make_rows(2, 2).values, make_rows(4, 2)]
+
+    results = predict_concurrently(batcher, lambda rows: np.asarray(rows),
+                                   frames)
+
+    for rows, predictions in zip(frames, results):
+        assert (predictions == np.asarray(rows)).all()
+
+
+def test_queue_is_dropped_after_thread_exit():
+    batcher = PredictionMicroBatcher(max_rows=100, max_wait=0.01,
+                                     idle_timeout=0.05)
+
+    batcher.predict('model', lambda rows: rows.x.to_numpy(), make_rows(0, 1))
+    time.sleep(0.2)
+    assert batcher._queues == {}
+
+
+@pytest.mark.filterwarnings(
+    'ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_queue_is_dropped_after_thread_failure():
+    def crash(batch):
+        raise RuntimeError('crash')
+
+    batcher = PredictionMicroBatcher(max_rows=100, max_wait=0.01,
+                                     result_timeout=0.2)
+    batcher._process = crash
+
+    with pytest.raises(TimeoutError):
+        batcher.predict('model', lambda rows: rows.x.to_numpy(),
+                        make_rows(0, 1))
+    assert batcher._queues == {}
+
+
+def test_timed_out_request_is_not_predicted():
+    release = Event()
+    calls = []
+
+    def slow_predict(features):
+        calls.append(features.x.tolist())
+        release.wait(5)
+        return features.x.to_numpy()
+
+    batcher = PredictionMicroBatcher(max_rows=1, max_wait=0.01,
+                                     result_timeout=0.1)
+    with ThreadPoolExecutor(1) as executor:
+        first = executor.submit(batcher.predict, 'model', slow_predict,
+                                make_rows(0, 1))
+        time.sleep(0.05)
+        with pytest.raises(TimeoutError):
+            batcher.predict('model', slow_predict, make_rows(1, 1))
+        release.set()
+        with pytest.raises(TimeoutError):
+            first.result()
+    time.sleep(0.1)
+    assert calls == [[0]]
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from bunnet import PydanticObjectId
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.neighbors import KNeighborsRegressor
+
+from ml_api import config
+
+from ml_api.apps.ml_models.repositories.file_repository import ModelFileCRUD
+from ml_api.apps.ml_models.repositories.model_cache import ModelCache, \
+    estimate_model_size
+from ml_api.apps.ml_models.repositories.repository_manager import \
+    ModelRepositoryManager
+from ml_api.apps.ml_models.specs import AvailableModelTypes, \
+    AvailableTaskTypes, ModelStorageModes
+
+
+def test_model_size_counts_arrays_in_memory():
+    model = {'weights': np.zeros((1000, 100)), 'name': 'model'}
+
+    assert estimate_model_size(model) >= model['weights'].nbytes
+
+
+def test_compressed_model_is_charged_by_memory_size(root_dir, monkeypatch):
+    cache = ModelCache(max_bytes=1024 * 1024 * 1024)
+    monkeypatch.setattr(
+        'ml_api.apps.ml_models.repositories.file_repository.model_cache',
+        cache)
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(500, 5))
+    model = RandomForestRegressor(n_estimators=20, random_state=0).fit(
+        features, features.sum(axis=1))
+    file_crud = ModelFileCRUD(PydanticObjectId())
+    model_id = PydanticObjectId()
+    file_crud.save_model(model_id, model, ModelStorageModes.COMPRESSED)
+
+    loaded = file_crud.read_model(model_id, ModelStorageModes.COMPRESSED)
+
+    file_size = file_crud._get_joblib_path(model_id).stat().st_size
+    assert cache.current_bytes == estimate_model_size(loaded)
+    assert cache.current_bytes > file_size
+    assert file_crud.read_model(model_id,
+                                ModelStorageModes.COMPRESSED) is loaded
+
+
+def test_mmap_default_only_for_models_with_mapped_arrays(
+        user_id, create_dataframe, create_model, monkeypatch):
+    monkeypatch.setattr(config, 'MODEL_STORAGE_MODE', ModelStorageModes.MMAP)
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 3)), columns=['a', 'b', 'c'])
+    df['y'] = df.sum(axis=1)
+    dataframe_meta = create_dataframe(df, numeric=['a', 'b', 'c', 'y'],
+                                      target='y')
+    features, target = df[['a', 'b', 'c']], df['y']
+
+    forest_meta = create_model(
+        RandomForestRegressor(n_estimators=5, random_state=0).fit(
+            features, target),
+        dataframe_meta, AvailableModelTypes.RANDOM_FOREST_REGRESSOR,
+        AvailableTaskTypes.REGRESSION, filename='forest')
+    knn_meta = create_model(
+        KNeighborsRegressor().fit(features, target), dataframe_meta,
+        AvailableModelTypes.K_NEIGHBORS_REGRESSOR,
+        AvailableTaskTypes.REGRESSION, filename='knn')
+
+    assert forest_meta.storage_mode == ModelStorageModes.DEFAULT
+    assert knn_meta.storage_mode == ModelStorageModes.MMAP
+    knn = ModelRepositoryManager(user_id).load_model(
+        knn_meta.id, knn_meta.storage_mode)
+    assert isinstance(knn._fit_X, np.memmap)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMClassifier
+from sklearn.linear_model import SGDClassifier
+from xgboost import XGBClassifier
+
+from ml_api.apps.ml_models import errors, specs
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.repositories.repository_manager import \
+    ModelRepositoryManager
+from ml_api.apps.ml_models.services.fit_predict_service import \
+    ModelFitPredictService
+from ml_api.apps.training_reports.model import Report
+from ml_api.apps.training_reports.specs import ReportTypes
+
+
+def make_df(classes, n_rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n_rows, 2)), columns=['a', 'b'])
+    df['y'] = rng.choice(classes, n_rows)
+    return df
+
+
+@pytest.fixture
+def trained_model(create_dataframe, create_model):
+    df = make_df([0, 1])
+    dataframe_meta = create_dataframe(df, numeric=['a', 'b'],
+                                      categorical=['y'], target='y')
+    model = SGDClassifier(random_state=0).fit(df[['a', 'b']], df.y)
+    return create_model(model, dataframe_meta,
+                        specs.AvailableModelTypes.SGD_CLASSIFIER,
+                        specs.AvailableTaskTypes.CLASSIFICATION)
+
+
+def test_failed_update_keeps_model_trained(user_id, create_dataframe,
+                                           trained_model):
+    # partial_fit не принимает классы, которых не было при обучении
+    new_classes_meta = create_dataframe(
+        make_df([0, 1, 2], seed=1), numeric=['a', 'b'], categorical=['y'],
+        target='y', filename='new_classes')
+    service = ModelFitPredictService(user_id)
+
+    with pytest.raises(errors.ModelTrainingError):
+        service.update_model(trained_model.id, new_classes_meta.id)
+
+    model_meta = ModelMetadata.get(trained_model.id).run()
+    assert model_meta.status == specs.ModelStatuses.TRAINED
+    report = Report.get(model_meta.metrics_report_ids[-1]).run()
+    assert report.report_type == ReportTypes.ERROR
+
+    # модель по-прежнему можно дообучить
+    same_classes_meta = create_dataframe(
+        make_df([0, 1], seed=2), numeric=['a', 'b'], categorical=['y'],
+        target='y', filename='same_classes')
+    service.check_update_params(model_meta, same_classes_meta.id)
+    model_meta = service.update_model(trained_model.id, same_classes_meta.id)
+    assert model_meta.status == specs.ModelStatuses.TRAINED
+
+
+@pytest.mark.parametrize('model_type', specs.mlp_models)
+def test_update_rejects_mlp_without_partial_fit(user_id, create_dataframe,
+                                                trained_model, model_type):
+    trained_model.model_params.model_type = model_type
+    trained_model.model_params.params = {'solver': 'lbfgs'}
+
+    with pytest.raises(errors.ModelUpdateNotSupportedError):
+        ModelFitPredictService(user_id).check_update_params(
+            trained_model, trained_model.dataframe_id)
+
+
+def test_update_keeps_chosen_storage_mode(user_id, create_dataframe,
+                                          trained_model):
+    ModelRepositoryManager(user_id).change_storage_mode(
+        trained_model.id, specs.ModelStorageModes.COMPRESSED)
+    update_meta = create_dataframe(
+        make_df([0, 1], seed=3), numeric=['a', 'b'], categorical=['y'],
+        target='y', filename='update')
+
+    model_meta = ModelFitPredictService(user_id).update_model(
+        trained_model.id, update_meta.id)
+
+    assert model_meta.storage_mode == specs.ModelStorageModes.COMPRESSED
+
+
+@pytest.mark.parametrize('model, model_type', [
+    (XGBClassifier(n_estimators=10),
+     specs.AvailableModelTypes.XGB_CLASSIFIER),
+    (LGBMClassifier(n_estimators=10, verbose=-1),
+     specs.AvailableModelTypes.LGBM_CLASSIFIER),
+])
+def test_boosting_update_keeps_total_n_estimators(
+        user_id, create_dataframe, create_model, model, model_type):
+    df = make_df([0, 1])
+    dataframe_meta = create_dataframe(df, numeric=['a', 'b'],
+                                      categorical=['y'], target='y')
+    model_meta = create_model(model.fit(df[['a', 'b']], df.y),
+                              dataframe_meta, model_type,
+                              specs.AvailableTaskTypes.CLASSIFICATION)
+
+    model_meta = ModelFitPredictService(user_id).update_model(
+        model_meta.id, n_iterations=5)
+
+    updated = ModelRepositoryManager(user_id).load_model(
+        model_meta.id, model_meta.storage_mode, use_cache=False)
+    assert updated.get_params()['n_estimators'] == 15
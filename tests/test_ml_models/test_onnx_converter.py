@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bunnet import PydanticObjectId
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LogisticRegression
+
+from ml_api.apps.ml_models import utils
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.schemas import ModelParams
+from ml_api.apps.ml_models.services.processors.onnx_converter import \
+    OnnxConverterService
+
+pytest.importorskip('skl2onnx')
+pytest.importorskip('onnxruntime')
+
+
+def make_model_meta(task_type, model_type, feature_columns):
+    return ModelMetadata(
+        filename='model', user_id=PydanticObjectId(),
+        dataframe_id=PydanticObjectId(), task_type=task_type,
+        model_params=ModelParams(model_type=model_type, params={}),
+        params_type='default', feature_columns=feature_columns,
+        target_column='target')
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(200, 4)),
+                        columns=['a', 'b', 'c', 'd'])
+
+
+@pytest.mark.parametrize('task_type, model_type, model, get_target', [
+    ('classification', 'LogisticRegression', LogisticRegression(),
+     lambda features: (features.a + features.b > 0).astype(int)),
+    ('regression', 'RandomForestRegressor',
+     RandomForestRegressor(n_estimators=10, random_state=0),
+     lambda features: features.a * 2 - features.c),
+])
+def test_onnx_predictions_match_sklearn(mongo_db, features, task_type,
+                                        model_type, model, get_target):
+    model.fit(features, get_target(features))
+    model_meta = make_model_meta(task_type, model_type, list(features))
+
+    onnx_model = OnnxConverterService(model_meta).convert(model)
+
+    assert onnx_model is not None
+    session = utils.create_onnx_session(onnx_model)
+    onnx_predictions = utils.run_onnx_predict(session, features.to_numpy())
+    expected = model.predict(features)
+    if task_type == 'classification':
+        assert (onnx_predictions == expected).all()
+    else:
+        np.testing.assert_allclose(onnx_predictions, expected, rtol=1e-4,
+                                   atol=1e-4)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bunnet import PydanticObjectId
+from sklearn.linear_model import SGDClassifier
+
+from ml_api.apps.ml_models import specs, utils
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.schemas import ModelParams
+from ml_api.apps.ml_models.services.processors.out_of_core_trainer import \
+    OutOfCoreTrainerService
+
+
+def make_model_meta(prediction_output):
+    return ModelMetadata(
+        filename='model', user_id=PydanticObjectId(),
+        dataframe_id=PydanticObjectId(),
+        task_type=specs.AvailableTaskTypes.CLASSIFICATION,
+        model_params=ModelParams(
+            model_type=specs.AvailableModelTypes.SGD_CLASSIFIER, params={}),
+        params_type=specs.AvailableParamsTypes.DEFAULT,
+        feature_columns=['a', 'b'], target_column='y', out_of_core=True,
+        prediction_output=prediction_output)
+
+
+@pytest.fixture
+def get_chunks():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(300, 2)), columns=['a', 'b'])
+    df['y'] = (df.a + df.b > 0).astype(int)
+
+    def chunks():
+        # части датафрейма сохраняют индексы строк исходного файла
+        for start in range(0, len(df), 100):
+            chunk = df.iloc[start:start + 100]
+            yield chunk[['a', 'b']], chunk.y
+    return chunks
+
+
+def test_valid_predictions_keep_row_index(mongo_db, get_chunks):
+    model_meta = make_model_meta(
+        specs.PredictionOutputModes.PREDICTIONS_WITH_PROBABILITIES)
+    service = OutOfCoreTrainerService(model_meta, SGDClassifier(
+        loss='log_loss', random_state=0))
+
+    (_, results_df), = service.train_model(get_chunks).results
+
+    # при двух классах сохраняется вероятность положительного класса
+    assert list(results_df.columns) == [utils.ROW_INDEX_COLUMN, 'y',
+                                        'probability']
+    valid_index = pd.concat([features[valid_mask] for features, _, valid_mask
+                             in service._split_chunks(get_chunks)]).index
+    assert list(results_df[utils.ROW_INDEX_COLUMN]) == list(valid_index)
+
+
+def test_full_valid_predictions_include_features(mongo_db, get_chunks):
+    model_meta = make_model_meta(specs.PredictionOutputModes.FULL)
+    service = OutOfCoreTrainerService(model_meta, SGDClassifier(
+        random_state=0))
+
+    (_, results_df), = service.train_model(get_chunks).results
+
+    assert list(results_df.columns) == ['a', 'b', 'y']
+    assert len(results_df) > 0
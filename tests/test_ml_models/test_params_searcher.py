@@ -0,0 +1,50 @@
+from bunnet import PydanticObjectId
+from hyperopt import hp, STATUS_OK
+
+from ml_api import config
+from ml_api.apps.ml_models.repositories.search_history_repository import \
+    ParamsSearchHistoryCRUD
+from ml_api.apps.ml_models.services.processors.params_searcher import \
+    HyperoptService
+from ml_api.apps.ml_models.specs import AvailableModelTypes, \
+    AvailableTaskTypes
+
+
+def test_search_stops_after_early_stop_rounds_without_improvement(
+        user_id, mongo_db, monkeypatch):
+    monkeypatch.setattr(config, 'HYPEROPT_N_JOBS', 1)
+    monkeypatch.setattr(config, 'HYPEROPT_MAX_EVALS', 20)
+    monkeypatch.setattr(config, 'HYPEROPT_EARLY_STOP_ROUNDS', 3)
+    progress = []
+    service = HyperoptService(user_id, PydanticObjectId(),
+                              progress_callback=progress.append)
+    # лучший результат у второго испытания, дальше улучшений нет
+    losses = iter([1.0, 0.0] + [0.5] * 20)
+    monkeypatch.setattr(
+        service, '_evaluate_candidates',
+        lambda *args: [{'loss': next(losses), 'status': STATUS_OK}])
+    monkeypatch.setattr(service, '_get_warm_start_trials', lambda *args: [])
+    monkeypatch.setattr(service, '_save_history', lambda *args: None)
+
+    service._run_trials(AvailableTaskTypes.REGRESSION,
+                        AvailableModelTypes.RIDGE,
+                        {'alpha': hp.uniform('alpha', 0, 1)})
+
+    assert progress[-1]['trials_done'] == 2 + 3
+
+
+def test_latest_history_is_taken_from_dataframe_lineage(user_id, mongo_db):
+    repository = ParamsSearchHistoryCRUD(user_id)
+    parent_id, child_id, other_id = (PydanticObjectId() for _ in range(3))
+    for dataframe_id in (parent_id, child_id, other_id):
+        repository.save(dataframe_id, 'version', AvailableTaskTypes.REGRESSION,
+                        AvailableModelTypes.RIDGE, [])
+
+    history = repository.get_latest([parent_id, child_id],
+                                    AvailableTaskTypes.REGRESSION,
+                                    AvailableModelTypes.RIDGE)
+
+    assert history.dataframe_id == child_id
+    assert repository.get_latest([PydanticObjectId()],
+                                 AvailableTaskTypes.REGRESSION,
+                                 AvailableModelTypes.RIDGE) is None
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from ml_api.apps.dataframes import errors as dataframes_errors
+from ml_api.apps.dataframes import specs as dataframes_specs
+from ml_api.apps.dataframes.schemas import ApplyMethodParams
+from ml_api.apps.ml_models import specs
+from ml_api.apps.ml_models.services.fit_predict_service import \
+    ModelFitPredictService
+
+
+@pytest.fixture
+def source_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(50, 2)), columns=['a', 'b'])
+    df['y'] = (df.a > 0).astype(int)
+    return df
+
+
+def create_model_with_pipeline(source_df, create_dataframe, create_model,
+                               pipeline):
+    dataframe_meta = create_dataframe(source_df, numeric=['a', 'b'],
+                                      categorical=['y'], target='y')
+    dataframe_meta.pipeline = pipeline
+    dataframe_meta.save()
+    model = LogisticRegression().fit(source_df[['a', 'b']], source_df.y)
+    return create_model(model, dataframe_meta,
+                        specs.AvailableModelTypes.LOGISTIC_REGRESSION,
+                        specs.AvailableTaskTypes.CLASSIFICATION), model
+
+
+def test_rows_are_not_filled_by_whole_frame_methods(
+        user_id, source_df, create_dataframe, create_model):
+    model_meta, _ = create_model_with_pipeline(
+        source_df, create_dataframe, create_model,
+        [ApplyMethodParams(
+            method_name=dataframes_specs.AvailableMethods.FILL_MEAN,
+            columns=['a', 'b'])])
+    rows = pd.DataFrame({'a': [np.nan], 'b': [0.5]})
+
+    with pytest.raises(dataframes_errors.PipelineNotApplicableToRowsError):
+        ModelFitPredictService(user_id).predict_online(model_meta.id, rows)
+
+
+def test_rows_are_filled_by_stored_values(user_id, source_df,
+                                          create_dataframe, create_model):
+    model_meta, model = create_model_with_pipeline(
+        source_df, create_dataframe, create_model,
+        [ApplyMethodParams(
+            method_name=dataframes_specs.AvailableMethods.FILL_CUSTOM_VALUE,
+            columns=['a'], params={'values_to_fill': [1.5]})])
+    rows = pd.DataFrame({'a': [np.nan, -2.0], 'b': [0.5, 0.1]})
+
+    results = ModelFitPredictService(user_id).predict_online(model_meta.id,
+                                                             rows)
+
+    expected = model.predict(pd.DataFrame({'a': [1.5, -2.0],
+                                           'b': [0.5, 0.1]}))
+    assert results.predictions == expected.tolist()
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from ml_api import config
+from ml_api.apps.dataframes.model import DataFrameMetadata
+from ml_api.apps.dataframes.repositories.file_repository import \
+    DataFrameFileCRUD, ScoresChunksWriter
+from ml_api.apps.ml_models import specs
+from ml_api.apps.ml_models.services.fit_predict_service import \
+    ModelFitPredictService
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(250, 2)), columns=['a', 'b'])
+
+
+@pytest.fixture
+def trained_model(features, create_dataframe, create_model):
+    df = features.copy()
+    df['y'] = np.where(df.a > 0.5, 2, np.where(df.a + df.b > 0, 1, 0))
+    dataframe_meta = create_dataframe(df, numeric=['a', 'b'],
+                                      categorical=['y'], target='y')
+    model = LogisticRegression().fit(features, df.y)
+    model_meta = create_model(model, dataframe_meta,
+                              specs.AvailableModelTypes.LOGISTIC_REGRESSION,
+                              specs.AvailableTaskTypes.CLASSIFICATION)
+    return model_meta, model
+
+
+def test_scores_writer_concatenates_chunks(tmp_path):
+    rng = np.random.default_rng(0)
+    scores = pd.DataFrame(rng.normal(size=(10, 2)),
+                          columns=['score_0', 'score_1'],
+                          index=np.arange(100, 110))
+
+    with ScoresChunksWriter(tmp_path / 'scores.npz') as scores_writer:
+        for start in range(0, 10, 3):
+            scores_writer.append(scores.iloc[start:start + 3])
+
+    saved = np.load(tmp_path / 'scores.npz')
+    assert saved.files == ['row_index', 'score_0', 'score_1']
+    assert (saved['row_index'] == scores.index).all()
+    assert saved['score_1'].dtype == np.float32
+    assert np.allclose(saved['score_1'], scores.score_1)
+
+
+@pytest.mark.parametrize('score_type, column_prefix', [
+    (specs.PredictionScoreTypes.PREDICT_PROBA, 'probability'),
+    (specs.PredictionScoreTypes.DECISION_FUNCTION, 'score'),
+])
+def test_batch_prediction_saves_scores_by_chunks(
+        user_id, features, create_dataframe, trained_model, monkeypatch,
+        score_type, column_prefix):
+    monkeypatch.setattr(config, 'PREDICTION_CHUNK_SIZE', 60)
+    monkeypatch.setattr(config, 'PREDICTION_N_JOBS', 1)
+    model_meta, model = trained_model
+    source_meta = create_dataframe(features, numeric=['a', 'b'],
+                                   filename='new_data')
+
+    model_meta = ModelFitPredictService(user_id).predict_on_model(
+        source_meta.id, model_meta.id, 'predictions', apply_pipeline=False,
+        prediction_output=
+        specs.PredictionOutputModes.PREDICTIONS_WITH_PROBABILITIES,
+        score_type=score_type)
+
+    prediction_id = model_meta.model_prediction_ids[-1]
+    assert DataFrameMetadata.get(prediction_id).run().has_scores
+    file_crud = DataFrameFileCRUD(user_id)
+    predictions = pd.read_csv(file_crud._get_csv_path(prediction_id))
+    assert list(predictions.columns) == [
+        'row_index', 'y', *(f'{column_prefix}_{class_name}'
+                            for class_name in model.classes_)]
+    saved = np.load(file_crud._get_scores_path(prediction_id))
+    assert (saved['row_index'] == np.arange(len(features))).all()
+    expected = getattr(model, score_type.value)(features)
+    for i, class_name in enumerate(model.classes_):
+        assert np.allclose(saved[f'score_{class_name}'], expected[:, i],
+                           atol=1e-5)
+
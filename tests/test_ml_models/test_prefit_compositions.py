@@ -0,0 +1,169 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from bunnet import PydanticObjectId
+from sklearn.base import clone
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from ml_api import config
+from ml_api.apps.ml_models import specs
+from ml_api.apps.ml_models.model import ModelMetadata
+from ml_api.apps.ml_models.schemas import ModelParams
+from ml_api.apps.ml_models.services.processors.composition_trainer import \
+    CompositionValidationService
+from ml_api.apps.ml_models.services.processors.oof_predictor import \
+    OutOfFoldPredictionsService
+from ml_api.apps.ml_models.services.processors.prefit_compositions import \
+    FittedEstimators, PrefitStackingClassifier, PrefitVotingClassifier, \
+    PrefitVotingRegressor
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.normal(size=(120, 2)), columns=['a', 'b'])
+    target = pd.Series(np.digitize(features.a + features.b, [-0.5, 0.5]),
+                       name='y')
+    return features, target
+
+
+def test_voting_keeps_base_models_fitted(data):
+    features, target = data
+    logistic = LogisticRegression().fit(features, target)
+    tree = DecisionTreeClassifier(max_depth=2, random_state=0).fit(
+        features, target)
+    coef = logistic.coef_.copy()
+    composition = PrefitVotingClassifier(
+        FittedEstimators([('logistic', logistic), ('tree', tree)]),
+        voting='soft')
+
+    # кросс-валидация композиции клонирует ее перед обучением
+    fitted = clone(composition).fit(features.iloc[:30], target.iloc[:30])
+
+    assert fitted.estimators['logistic'] is logistic
+    assert np.array_equal(logistic.coef_, coef)
+    expected = (logistic.predict_proba(features) +
+                tree.predict_proba(features)) / 2
+    assert np.allclose(fitted.predict_proba(features), expected)
+    assert (fitted.predict(features) ==
+            fitted.classes_[expected.argmax(axis=1)]).all()
+
+
+def test_clone_keeps_base_models_out_of_params(data):
+    features, target = data
+    logistic = LogisticRegression(C=0.5).fit(features, target)
+    composition = PrefitStackingClassifier(
+        FittedEstimators([('logistic', logistic)]), LogisticRegression(),
+        oof_predictions=None)
+
+    cloned = clone(composition)
+
+    assert not any(name.startswith('estimators__')
+                   for name in composition.get_params(deep=True))
+    assert cloned.estimators is composition.estimators
+    assert cloned.estimators['logistic'].coef_ is logistic.coef_
+    assert cloned.final_estimator is not composition.final_estimator
+
+
+def test_prefit_composition_report_is_marked_biased(mongo_db, data):
+    features, target = data
+    logistic = LogisticRegression().fit(features, target)
+    composition_meta = ModelMetadata(
+        filename='composition', user_id=PydanticObjectId(),
+        dataframe_id=PydanticObjectId(), is_composition=True,
+        task_type=specs.AvailableTaskTypes.CLASSIFICATION,
+        model_params=ModelParams(
+            model_type=specs.AvailableCompositionTypes.VOTING_CLASSIFIER,
+            params={'voting': 'soft', 'prefit': True}),
+        params_type=specs.AvailableParamsTypes.DEFAULT,
+        feature_columns=['a', 'b'], target_column='y')
+    composition = PrefitVotingClassifier(
+        FittedEstimators([('logistic', logistic)]), voting='soft')
+
+    results = CompositionValidationService(
+        composition_meta, composition).validate_composition(
+        composition_meta, features, target)
+
+    assert all(report.optimistic_bias for report, _ in results.results)
+
+
+def test_voting_aligns_classes_of_base_models(data):
+    features, target = data
+    partial = LogisticRegression().fit(features[target > 0],
+                                       target[target > 0])
+    full = LogisticRegression().fit(features, target)
+    estimators = FittedEstimators([('partial', partial), ('full', full)])
+    composition = PrefitVotingClassifier(estimators, voting='soft').fit(
+        features, target)
+
+    probs = composition.predict_proba(features)
+
+    assert list(composition.classes_) == [0, 1, 2]
+    assert np.allclose(probs[:, 0], full.predict_proba(features)[:, 0] / 2)
+    assert np.allclose(probs.sum(axis=1), 1)
+    hard = PrefitVotingClassifier(estimators).fit(features, target)
+    assert set(hard.predict(features)) <= {0, 1, 2}
+
+
+def test_voting_regressor_averages_base_models(data):
+    features, target = data
+    first = LinearRegression().fit(features, target)
+    second = LinearRegression().fit(features[['a']].assign(b=0), target)
+    composition = PrefitVotingRegressor(
+        FittedEstimators([('first', first), ('second', second)]))
+
+    predictions = clone(composition).fit(features, target).predict(features)
+
+    assert np.allclose(predictions, (first.predict(features) +
+                                     second.predict(features)) / 2)
+
+
+def test_stacking_trains_meta_model_on_oof_predictions(
+        user_id, data, create_dataframe, create_model, monkeypatch):
+    monkeypatch.setattr(config, 'CV_N_JOBS', 1)
+    features, target = data
+    dataframe_meta = create_dataframe(features.assign(y=target),
+                                      numeric=['a', 'b'], categorical=['y'],
+                                      target='y')
+    base_models = {
+        'logistic': LogisticRegression().fit(features, target),
+        'tree': DecisionTreeClassifier(max_depth=2, random_state=0).fit(
+            features, target)}
+    model_metas = [create_model(model, dataframe_meta,
+                                specs.AvailableModelTypes.LOGISTIC_REGRESSION,
+                                specs.AvailableTaskTypes.CLASSIFICATION,
+                                filename=name)
+                   for name, model in base_models.items()]
+    composition_meta = SimpleNamespace(
+        task_type=specs.AvailableTaskTypes.CLASSIFICATION, stratify=True,
+        cv_folds=3)
+    oof_service = OutOfFoldPredictionsService(user_id, composition_meta)
+    model_ids = [model_meta.id for model_meta in model_metas]
+
+    oof_predictions = oof_service.get_oof_predictions(
+        model_ids, list(base_models.items()), features, target)
+
+    assert oof_predictions.shape == (len(features), 6)
+    assert list(oof_predictions.index) == list(features.index)
+    # повторная композиция из тех же моделей берет предсказания из кэша
+    monkeypatch.setattr(oof_service, '_predict_out_of_fold', None)
+    cached = oof_service.get_oof_predictions(
+        model_ids, list(base_models.items()), features, target)
+    pd.testing.assert_frame_equal(cached, oof_predictions)
+
+    composition = PrefitStackingClassifier(
+        FittedEstimators(base_models.items()), LogisticRegression(),
+        oof_predictions)
+    train_index = features.index[:80]
+    fitted = clone(composition).fit(features.loc[train_index],
+                                    target.loc[train_index])
+
+    meta_model = LogisticRegression().fit(
+        oof_predictions.loc[train_index], target.loc[train_index])
+    assert np.allclose(fitted.final_estimator_.coef_, meta_model.coef_)
+    assert fitted.estimators['tree'] is base_models['tree']
+    assert list(fitted.classes_) == [0, 1, 2]
+    assert fitted.predict_proba(features).shape == (len(features), 3)